@@ -1,9 +1,22 @@
+import asyncio
 import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from .base_agent import BaseAgent
-import requests
+from .state_backend import get_state_backend
 import json
 
+# Flux du backend d'état (bornés à state.tracking_max_events entrées)
+TRACKING_PREFIX = "tracking:"
+LOGS_STREAM = "tracking:logs"
+EXECUTION_STREAM = "tracking:execution"
+DEFAULT_MAX_EVENTS = 10000
+
+
+def _request_prefix(step: Dict[str, str]) -> str:
+    """Préfixe "[request_id] " d'une étape tracée pour une requête."""
+    return f"[{step['request_id']}] " if step.get("request_id") else ""
+
+
 class TrackingAgent(BaseAgent):
     """
     Agent de suivi qui analyse les interactions entre agents et génère des insights.
@@ -11,20 +24,62 @@ class TrackingAgent(BaseAgent):
     """
     def __init__(self, name: str = "tracking"):
         super().__init__(name)
-        self._model_config = self._config["model"]
-        self._api_key = self._model_config["api_key"]
-        self._api_url = self._model_config["api_url"]
-        self.logs: List[Dict[str, str]] = []
-        self.execution_sequence: List[Dict[str, str]] = []
+        # Logs et séquence d'exécution dans le backend d'état (section "state") : communs à
+        # toutes les instances du processus, et à tous les workers avec un backend partagé.
+        # Les requêtes concurrentes y écrivent : chaque entrée porte le request_id de sa
+        # requête (voir PipelineContext)
+        self._state = get_state_backend(self._config)
+        self._max_events = self._config.get("state", {}).get("tracking_max_events", DEFAULT_MAX_EVENTS)
+
+    @property
+    def logs(self) -> List[Dict[str, str]]:
+        """Entrées enregistrées par log, de la plus ancienne à la plus récente."""
+        return self._state.read(LOGS_STREAM)
+
+    @property
+    def execution_sequence(self) -> List[Dict[str, str]]:
+        """Étapes enregistrées par log_execution, dans l'ordre."""
+        return self._state.read(EXECUTION_STREAM)
 
-    def log_execution(self, agent_name: str, action: str, status: str = "succès"):
+    def log_execution(self, agent_name: str, action: str, status: str = "succès", request_id: Optional[str] = None):
         """Enregistre une étape d'exécution dans la séquence."""
-        self.execution_sequence.append({
+        step = {
             "timestamp": datetime.datetime.utcnow().isoformat(),
             "agent": agent_name,
             "action": action,
             "status": status
-        })
+        }
+        if request_id is not None:
+            step["request_id"] = request_id
+        self._state.append(EXECUTION_STREAM, step, tag=request_id, max_len=self._max_events)
+
+    @property
+    def blocking(self) -> bool:
+        """Les écritures du suivi font des E/S disque (backend d'état partagé, SQLite)."""
+        return self._state.shared
+
+    async def log_execution_async(self, agent_name: str, action: str, status: str = "succès",
+                                  request_id: Optional[str] = None):
+        """
+        Version de log_execution pour la boucle asyncio : avec un backend partagé,
+        la transaction SQLite est faite dans un thread pour ne pas bloquer les autres requêtes.
+        """
+        if self.blocking:
+            await asyncio.to_thread(self.log_execution, agent_name, action, status, request_id)
+        else:
+            self.log_execution(agent_name, action, status, request_id)
+
+    def get_request_sequence(self, request_id: str) -> List[Dict[str, str]]:
+        """Étapes d'exécution d'une requête, dans l'ordre."""
+        return self._state.read(EXECUTION_STREAM, tag=request_id)
+
+    def snapshot(self) -> Dict[str, List[Dict[str, str]]]:
+        """Copie des logs et de la séquence d'exécution."""
+        return {"logs": self.logs, "execution_sequence": self.execution_sequence}
+
+    def clear(self) -> None:
+        """Efface les logs et la séquence d'exécution."""
+        self._state.delete(TRACKING_PREFIX)
 
     def _get_llm_response(self, prompt: List[Dict[str, str]]) -> str:
         """
@@ -37,112 +92,144 @@ class TrackingAgent(BaseAgent):
             str: La réponse du LLM
         """
         try:
-            headers = {
-                "Authorization": f"Bearer {self._api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": "mistral-tiny",
-                "messages": prompt,
-                "temperature": self._model_config["temperature"],
-                "max_tokens": self._model_config["max_tokens"]
-            }
-            
-            response = requests.post(
-                f"{self._api_url}/chat/completions",
-                headers=headers,
-                json=data
-            )
+            return self._llm.complete(prompt)
+                
+        except Exception as e:
+            print(f"Erreur lors de l'appel à l'API Mistral: {e}")
+            raise
+
+    async def _get_llm_response_async(self, prompt: List[Dict[str, str]]) -> str:
+        """
+        Version asynchrone de _get_llm_response (client HTTP non bloquant).
+        
+        Args:
+            prompt (List[Dict[str, str]]): Le prompt à envoyer au LLM
             
-            if response.status_code == 200:
-                return response.json()["choices"][0]["message"]["content"]
-            else:
-                raise Exception(f"Erreur API Mistral: {response.status_code}")
+        Returns:
+            str: La réponse du LLM
+        """
+        try:
+            return await self._llm.complete_async(prompt)
                 
         except Exception as e:
             print(f"Erreur lors de l'appel à l'API Mistral: {e}")
             raise
 
-    def log(self, agent_name: str, input_data: str, output_data: str):
+    def log(self, agent_name: str, input_data: str, output_data: str, request_id: Optional[str] = None):
         """Ajoute une entrée horodatée pour un agent donné."""
-        self.logs.append({
+        entry = {
             "timestamp": datetime.datetime.utcnow().isoformat(),
             "agent": agent_name,
             "input": input_data,
             "output": output_data
-        })
+        }
+        if request_id is not None:
+            entry["request_id"] = request_id
+        self._state.append(LOGS_STREAM, entry, tag=request_id, max_len=self._max_events)
+
+    async def log_async(self, agent_name: str, input_data: str, output_data: str,
+                        request_id: Optional[str] = None):
+        """Version de log pour la boucle asyncio (voir log_execution_async)."""
+        if self.blocking:
+            await asyncio.to_thread(self.log, agent_name, input_data, output_data, request_id)
+        else:
+            self.log(agent_name, input_data, output_data, request_id)
 
     def analyze_interactions(self) -> Dict[str, Any]:
         """Analyse les interactions avec Mistral et retourne des insights."""
-        if not self.logs:
+        snapshot = self.snapshot()
+        if not snapshot["logs"]:
+            return {"status": "warning", "message": "Aucun log à analyser"}
+        
+        # Analyse avec Mistral
+        try:
+            response = self._get_llm_response(self._build_analysis_prompt(snapshot))
+            return {
+                "status": "success",
+                "analysis": response,
+                "timestamp": datetime.datetime.utcnow().isoformat(),
+                "execution_sequence": snapshot["execution_sequence"][-10:]  # Inclure les 10 dernières étapes
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Erreur lors de l'analyse : {str(e)}"
+            }
+
+    async def analyze_interactions_async(self) -> Dict[str, Any]:
+        """Version asynchrone de analyze_interactions."""
+        snapshot = await asyncio.to_thread(self.snapshot) if self.blocking else self.snapshot()
+        if not snapshot["logs"]:
             return {"status": "warning", "message": "Aucun log à analyser"}
         
+        try:
+            response = await self._get_llm_response_async(self._build_analysis_prompt(snapshot))
+            return {
+                "status": "success",
+                "analysis": response,
+                "timestamp": datetime.datetime.utcnow().isoformat(),
+                "execution_sequence": snapshot["execution_sequence"][-10:]
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Erreur lors de l'analyse : {str(e)}"
+            }
+
+    def _build_analysis_prompt(self, snapshot: Dict[str, List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        """Construit le prompt d'analyse à partir des derniers logs et étapes (voir snapshot)."""
         # Préparation des logs pour l'analyse
         logs_text = "\n".join([
             f"Agent: {log['agent']}\nEntrée: {log['input']}\nSortie: {log['output']}\n"
-            for log in self.logs[-10:]  # Analyse les 10 dernières interactions
+            for log in snapshot["logs"][-10:]  # Analyse les 10 dernières interactions
         ])
 
-        # Préparation de la séquence d'exécution
+        # Préparation de la séquence d'exécution (requêtes concurrentes distinguées par leur ID)
         sequence_text = "\n".join([
-            f"- [{step['agent']}] {step['action']} (Statut: {step['status']})"
-            for step in self.execution_sequence[-10:]  # Dernières 10 étapes
+            f"- {_request_prefix(step)}[{step['agent']}] {step['action']} (Statut: {step['status']})"
+            for step in snapshot["execution_sequence"][-10:]  # Dernières 10 étapes
         ])
         
-        # Analyse avec Mistral
-        try:
-            prompt = [
-                {"role": "system", "content": """Tu es un expert en analyse de systèmes d'agents IA.
-                Analyse les logs d'interaction et fournis des insights pertinents en français sur :
-                1. Les patterns d'interaction entre les agents
-                2. Les points d'amélioration potentiels
-                3. Les problèmes détectés
-                4. Les recommandations d'optimisation
-                
-                Structure ton analyse de la manière suivante :
-                
-                ## Séquence d'Exécution
-                [Liste des étapes d'exécution des agents]
-                
-                ## Patterns d'Interaction
-                [Analyse des patterns observés]
-                
-                ## Points d'Amélioration
-                [Liste des points à améliorer]
-                
-                ## Problèmes Détectés
-                [Description des problèmes identifiés]
-                
-                ## Recommandations
-                [Suggestions d'optimisation]
-                
-                Réponds de manière structurée et concise, en français."""},
-                {"role": "user", "content": f"""Analyse ces informations :
+        prompt = [
+            {"role": "system", "content": """Tu es un expert en analyse de systèmes d'agents IA.
+            Analyse les logs d'interaction et fournis des insights pertinents en français sur :
+            1. Les patterns d'interaction entre les agents
+            2. Les points d'amélioration potentiels
+            3. Les problèmes détectés
+            4. Les recommandations d'optimisation
+            
+            Structure ton analyse de la manière suivante :
+            
+            ## Séquence d'Exécution
+            [Liste des étapes d'exécution des agents]
+            
+            ## Patterns d'Interaction
+            [Analyse des patterns observés]
+            
+            ## Points d'Amélioration
+            [Liste des points à améliorer]
+            
+            ## Problèmes Détectés
+            [Description des problèmes identifiés]
+            
+            ## Recommandations
+            [Suggestions d'optimisation]
+            
+            Réponds de manière structurée et concise, en français."""},
+            {"role": "user", "content": f"""Analyse ces informations :
 
 Séquence d'exécution des agents :
 {sequence_text}
 
 Logs d'interaction :
 {logs_text}"""}
-            ]
-            
-            response = self._get_llm_response(prompt)
-            return {
-                "status": "success",
-                "analysis": response,
-                "timestamp": datetime.datetime.utcnow().isoformat(),
-                "execution_sequence": self.execution_sequence[-10:]  # Inclure les 10 dernières étapes
-            }
-        except Exception as e:
-            return {
-                "status": "error",
-                "message": f"Erreur lors de l'analyse : {str(e)}"
-            }
+        ]
+        return prompt
 
     def write_report(self, filepath: str = "agent_analysis_report.md"):
         """Génère un rapport détaillé incluant les logs et l'analyse."""
         analysis = self.analyze_interactions()
+        snapshot = self.snapshot()
         
         lines = [
             "# Rapport d'Analyse des Agents\n",
@@ -150,8 +237,8 @@ Logs d'interaction :
             "## Séquence d'Exécution\n",
             "```\n",
             "\n".join([
-                f"- [{step['agent']}] {step['action']} (Statut: {step['status']})"
-                for step in self.execution_sequence
+                f"- {_request_prefix(step)}[{step['agent']}] {step['action']} (Statut: {step['status']})"
+                for step in snapshot["execution_sequence"]
             ]),
             "\n```\n",
             "## Analyse des Interactions\n",
@@ -159,7 +246,7 @@ Logs d'interaction :
             "## Logs Détaillés\n"
         ]
         
-        for entry in self.logs:
+        for entry in snapshot["logs"]:
             lines.extend([
                 f"### [{entry['timestamp']}] {entry['agent']}",
                 f"- **Entrée** : `{entry['input']}`",
@@ -1,12 +1,40 @@
-from .base_agent import BaseAgent
-from .emotion_detection_agent import EmotionDetectionAgent
-from .intent_detection_agent import IntentDetectionAgent
-from .interactional_agent import InteractionalAgent
-from .memory_agent import MemoryAgent
-from .orchestrator import AgentOrchestrator
-from .response_generator_agent import ResponseGeneratorAgent
-from .search_agent import SearchAgent
-from .threshold_agent import ThresholdAgent
+"""
+Agents du système touristique.
+
+Les classes sont importées à la demande (``from Agent import MemoryAgent`` ne
+charge que le module concerné) et les agents partagés sont construits au premier
+appel de get_agent : importer le paquet ne charge ni chromadb, ni requests,
+ni la collection de conversations.
+"""
+import importlib
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+# Nom exporté -> module qui le définit
+_LAZY_ATTRIBUTES = {
+    'BaseAgent': 'base_agent',
+    'EmotionDetectionAgent': 'emotion_detection_agent',
+    'IntentDetectionAgent': 'intent_detection_agent',
+    'InteractionalAgent': 'interactional_agent',
+    'MemoryAgent': 'memory_agent',
+    'AgentOrchestrator': 'orchestrator',
+    'ResponseGeneratorAgent': 'response_generator_agent',
+    'SearchAgent': 'search_agent',
+    'ThresholdAgent': 'threshold_agent'
+}
+
+# Clé de la section "agents" de config.json -> (module, classe) de l'agent
+AGENT_CLASSES = {
+    'coordinator': ('orchestrator', 'AgentOrchestrator'),
+    'memory': ('memory_agent', 'MemoryAgent'),
+    'emotion': ('emotion_detection_agent', 'EmotionDetectionAgent'),
+    'intent': ('intent_detection_agent', 'IntentDetectionAgent'),
+    'response': ('response_generator_agent', 'ResponseGeneratorAgent'),
+    'threshold': ('threshold_agent', 'ThresholdAgent'),
+    'search': ('search_agent', 'SearchAgent'),
+    'tracking': ('TrackingAgent', 'TrackingAgent')
+}
 
 __all__ = [
     'BaseAgent',
@@ -17,5 +45,69 @@ __all__ = [
     'AgentOrchestrator',
     'ResponseGeneratorAgent',
     'SearchAgent',
-    'ThresholdAgent'
+    'ThresholdAgent',
+    'get_agent',
+    'warm_up'
 ]
+
+_agents_lock = threading.Lock()
+_agents: Dict[str, Any] = {}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+def get_agent(key: str) -> Any:
+    """
+    Retourne l'agent partagé du processus, construit au premier appel.
+
+    Args:
+        key (str): Clé de l'agent dans la section "agents" de config.json
+
+    Returns:
+        L'instance partagée de l'agent
+    """
+    agent = _agents.get(key)
+    if agent is not None:
+        return agent
+    with _agents_lock:
+        agent = _agents.get(key)
+        if agent is None:
+            if key not in AGENT_CLASSES:
+                raise KeyError(f"Agent inconnu: {key}")
+            module_name, class_name = AGENT_CLASSES[key]
+            agent_class = getattr(importlib.import_module(f".{module_name}", __name__), class_name)
+            agent = agent_class()
+            _agents[key] = agent
+        return agent
+
+
+def warm_up(keys: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """
+    Construit à l'avance les agents partagés (et ce qu'ils chargent : ChromaDB,
+    classifieur local...) pour que la première requête ne paie pas ce coût.
+
+    Args:
+        keys (Iterable[str], optional): Agents à préparer (par défaut l'orchestrateur)
+
+    Returns:
+        Dict[str, float]: Durée de préparation de chaque agent (secondes)
+    """
+    timings = {}
+    for key in keys or ("coordinator",):
+        start = time.perf_counter()
+        agent = get_agent(key)
+        if hasattr(agent, "warm_up"):
+            agent.warm_up()
+        timings[key] = time.perf_counter() - start
+    return timings
@@ -1,33 +1,38 @@
-import json
 from typing import Dict, Any
-import os
+from .config_registry import get_config_registry
+from .llm_client import get_llm_client
 
 class BaseAgent:
     """Classe de base pour un agent IA."""
     
     def __init__(self, name: str):
-        self._config = self._load_config()
+        # Configuration partagée par tous les agents, rechargée si config.json change
+        self._config_registry = get_config_registry()
+        self._agent_key = name
+        self._llm_client = None
+        self._llm_config = None
         self._name = self._config["agents"][name]["name"]
         self._role = self._config["agents"][name]["role"]
         self._goal = self._config["agents"][name]["goal"]
         self._backstory = self._config["agents"][name]["backstory"]
 
+    @property
+    def _config(self) -> Dict[str, Any]:
+        """Configuration courante (lecture seule), partagée via le registre."""
+        return self._config_registry.get()
+
+    @property
+    def _llm(self):
+        """Client Mistral partagé, renouvelé lorsque la configuration est rechargée."""
+        config = self._config
+        if config is not self._llm_config:
+            self._llm_client = get_llm_client(config, agent=self._agent_key)
+            self._llm_config = config
+        return self._llm_client
+
     def _load_config(self) -> Dict[str, Any]:
         """Charge la configuration depuis le fichier config.json"""
-        try:
-            # Obtenir le chemin absolu du répertoire courant
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            # Construire le chemin vers config.json
-            config_path = os.path.join(os.path.dirname(current_dir), "config.json")
-            
-            with open(config_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Le fichier config.json est introuvable à l'emplacement: {config_path}")
-        except json.JSONDecodeError:
-            raise ValueError("Le fichier config.json est mal formaté")
-        except Exception as e:
-            raise Exception(f"Erreur lors du chargement de la configuration: {e}")
+        return self._config_registry.get()
 
     @property
     def name(self) -> str:
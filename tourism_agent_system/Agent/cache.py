@@ -0,0 +1,292 @@
+# cache.py
+"""
+Cache clé/valeur à deux niveaux, partagé par les agents :
+
+- un niveau mémoire LRU avec durée de vie (TTL) ;
+- un niveau disque optionnel (SQLite) qui survit aux redémarrages, borné lui
+  aussi : les entrées expirées sont purgées périodiquement et, au-delà de
+  max_disk_entries, les plus anciennes écritures sont supprimées.
+
+Les valeurs doivent être sérialisables en JSON. Les caches sont partagés au
+niveau du processus : get_cache renvoie toujours la même instance pour un nom donné.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# Les chemins relatifs du niveau disque sont résolus depuis tourism_agent_system/
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_MISSING = object()
+
+# Purge du niveau disque : au plus tard toutes les DEFAULT_PURGE_INTERVAL secondes,
+# ou dès que les écritures depuis la dernière purge dépassent ce ratio du plafond
+DEFAULT_PURGE_INTERVAL = 300.0
+PURGE_WRITE_RATIO = 0.1
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Construit une clé stable (SHA-256) à partir de valeurs sérialisables en JSON."""
+    data = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """
+    Cache LRU avec durée de vie, doublé d'un niveau SQLite optionnel.
+    Thread-safe : un verrou protège le niveau mémoire et la connexion SQLite.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = 3600,
+                 persist_path: Optional[str] = None, max_disk_entries: Optional[int] = None,
+                 purge_interval: float = DEFAULT_PURGE_INTERVAL):
+        """
+        Args:
+            max_entries (int): Nombre maximal d'entrées en mémoire
+            ttl (Optional[float]): Durée de vie des entrées en secondes (None : illimitée)
+            persist_path (Optional[str]): Fichier SQLite du niveau disque (None : mémoire seule)
+            max_disk_entries (Optional[int]): Nombre maximal de lignes sur disque
+                (par défaut 10 fois max_entries)
+            purge_interval (float): Délai maximal entre deux purges du niveau disque (s)
+        """
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._max_disk_entries = max_disk_entries if max_disk_entries is not None else 10 * max_entries
+        self._purge_interval = purge_interval
+        self._last_purge = 0.0
+        self._writes_since_purge = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+            "sets": 0,
+            "disk_purged": 0
+        }
+
+        self._db = None
+        if persist_path:
+            try:
+                os.makedirs(os.path.dirname(persist_path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(persist_path, timeout=5.0, check_same_thread=False)
+                # WAL : le fichier est partagé par les workers uvicorn (un lecteur ne bloque pas un écrivain)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS cache_entries ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Cache disque indisponible ({persist_path}), cache mémoire seul: {e}")
+                self._db = None
+        if self._db is not None:
+            with self._lock:
+                self._purge_disk(time.time())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Retourne la valeur associée à la clé, ou default si elle est absente ou expirée.
+
+        Args:
+            key (str): La clé recherchée
+            default (Any): Valeur retournée en cas d'absence
+
+        Returns:
+            Any: La valeur en cache ou default
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._entries[key]
+                self._stats["expired"] += 1
+
+            value = self._disk_get(key, now)
+            if value is not _MISSING:
+                self._stats["hits"] += 1
+                self._stats["disk_hits"] += 1
+                return value
+
+            self._stats["misses"] += 1
+            return default
+
+    async def get_async(self, key: str, default: Any = None) -> Any:
+        """
+        Version de get pour la boucle asyncio : une entrée valide du niveau mémoire
+        est lue directement, une lecture du niveau disque est faite dans un thread.
+        """
+        if self._db is not None:
+            with self._lock:
+                entry = self._entries.get(key)
+                fresh = entry is not None and (entry[1] is None or entry[1] > time.time())
+            if not fresh:
+                return await asyncio.to_thread(self.get, key, default)
+        return self.get(key, default)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Enregistre une valeur (en mémoire et, si activé, sur disque).
+
+        Args:
+            key (str): La clé
+            value (Any): La valeur, sérialisable en JSON
+            ttl (Optional[float]): Durée de vie spécifique (par défaut celle du cache)
+        """
+        ttl = self._ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._memory_set(key, value, expires_at)
+            self._stats["sets"] += 1
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(value, ensure_ascii=False), expires_at)
+                    )
+                    self._db.commit()
+                    self._writes_since_purge += 1
+                except sqlite3.Error as e:
+                    print(f"Erreur lors de l'écriture du cache disque: {e}")
+                now = time.time()
+                if (now - self._last_purge >= self._purge_interval
+                        or self._writes_since_purge >= max(1, int(self._max_disk_entries * PURGE_WRITE_RATIO))):
+                    self._purge_disk(now)
+
+    async def set_async(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Version de set pour la boucle asyncio : l'écriture sur disque est faite dans un thread."""
+        if self._db is not None:
+            await asyncio.to_thread(self.set, key, value, ttl)
+        else:
+            self.set(key, value, ttl)
+
+    def clear(self) -> None:
+        """Vide les deux niveaux du cache."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache_entries")
+                self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne les compteurs du cache (hits, misses, taux de succès, taille)."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["persistent"] = self._db is not None
+        return stats
+
+    def purge(self) -> int:
+        """
+        Purge le niveau disque : entrées expirées, puis les plus anciennes au-delà de max_disk_entries.
+
+        Returns:
+            int: Nombre de lignes supprimées
+        """
+        with self._lock:
+            return self._purge_disk(time.time())
+
+    def _purge_disk(self, now: float) -> int:
+        """Purge le niveau disque (appelé sous verrou)."""
+        if self._db is None:
+            return 0
+        self._last_purge = now
+        self._writes_since_purge = 0
+        try:
+            removed = self._db.execute(
+                "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            ).rowcount
+            # INSERT OR REPLACE attribue un nouveau rowid : l'ordre des rowid est celui des écritures
+            removed += self._db.execute(
+                "DELETE FROM cache_entries WHERE rowid IN ("
+                "SELECT rowid FROM cache_entries ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+                (self._max_disk_entries,)
+            ).rowcount
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la purge du cache disque: {e}")
+            return 0
+        self._stats["disk_purged"] += removed
+        return removed
+
+    def _memory_set(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float) -> Any:
+        """Lit une entrée sur disque et la remonte en mémoire (appelé sous verrou)."""
+        if self._db is None:
+            return _MISSING
+        try:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            value, expires_at = json.loads(row[0]), row[1]
+            if expires_at is not None and expires_at <= now:
+                self._db.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                self._db.commit()
+                self._stats["expired"] += 1
+                return _MISSING
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            print(f"Erreur lors de la lecture du cache disque: {e}")
+            return _MISSING
+        self._memory_set(key, value, expires_at)
+        return value
+
+
+_registry_lock = threading.Lock()
+_caches: Dict[str, TTLCache] = {}
+
+
+def get_cache(name: str, cache_config: Dict[str, Any]) -> TTLCache:
+    """
+    Retourne le cache partagé `name`, créé à la première demande à partir de
+    sa section de configuration (max_entries, ttl, persist, path, max_disk_entries,
+    purge_interval).
+    """
+    with _registry_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            persist_path = None
+            if cache_config.get("persist", False):
+                persist_path = cache_config.get("path", os.path.join("cache", f"{name}_cache.db"))
+                if not os.path.isabs(persist_path):
+                    persist_path = os.path.join(PACKAGE_DIR, persist_path)
+            cache = TTLCache(
+                max_entries=cache_config.get("max_entries", 1000),
+                ttl=cache_config.get("ttl", 3600),
+                persist_path=persist_path,
+                max_disk_entries=cache_config.get("max_disk_entries"),
+                purge_interval=cache_config.get("purge_interval", DEFAULT_PURGE_INTERVAL)
+            )
+            _caches[name] = cache
+        return cache
+
+
+def get_cache_metrics() -> Dict[str, Dict[str, Any]]:
+    """Retourne les statistiques de tous les caches du processus."""
+    with _registry_lock:
+        caches = dict(_caches)
+    return {name: cache.get_stats() for name, cache in caches.items()}
@@ -0,0 +1,143 @@
+# config_registry.py
+"""
+Registre de configuration partagé par tous les agents du processus.
+
+config.json est lu une seule fois puis partagé sous forme figée (lecture seule).
+Lorsque la date de modification du fichier change, la configuration est relue
+et remplacée atomiquement : les agents voient la nouvelle version à leur
+prochain accès, sans redémarrage d'uvicorn. Une version mal formée est ignorée
+et la précédente reste en place.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+
+# Intervalle minimal entre deux vérifications de la date de modification (secondes)
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+class FrozenDict(dict):
+    """Dictionnaire en lecture seule (reste sérialisable en JSON, contrairement à MappingProxyType)."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("La configuration partagée est en lecture seule")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(value: Any) -> Any:
+    """Fige récursivement une configuration (dict -> FrozenDict, list -> tuple)."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def default_config_path() -> str:
+    """Chemin de config.json, surchargeable via la variable d'environnement TOURISM_AGENT_CONFIG."""
+    return os.environ.get("TOURISM_AGENT_CONFIG", DEFAULT_CONFIG_PATH)
+
+
+class ConfigRegistry:
+    """Configuration chargée une fois, rechargée quand le fichier change."""
+
+    def __init__(self, path: str, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self._path = path
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._config = None
+        self._mtime = None
+        self._version = 0
+        self._next_check = 0.0
+        self._load()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def version(self) -> int:
+        """Numéro incrémenté à chaque rechargement."""
+        return self._version
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Retourne la configuration courante (figée).
+        La date de modification du fichier est vérifiée au plus une fois par check_interval.
+        """
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self._check_interval
+            try:
+                mtime = os.stat(self._path).st_mtime_ns
+            except OSError:
+                mtime = self._mtime
+            if mtime != self._mtime:
+                self.reload()
+        return self._config
+
+    def reload(self) -> bool:
+        """
+        Relit le fichier et remplace la configuration s'il est valide.
+
+        Returns:
+            bool: True si une nouvelle configuration a été chargée
+        """
+        with self._lock:
+            try:
+                self._load()
+                return True
+            except Exception as e:
+                print(f"Configuration non rechargée, la version précédente est conservée: {e}")
+                # Ne pas retenter à chaque accès tant que le fichier n'a pas changé
+                try:
+                    self._mtime = os.stat(self._path).st_mtime_ns
+                except OSError:
+                    pass
+                return False
+
+    def _load(self) -> None:
+        try:
+            mtime = os.stat(self._path).st_mtime_ns
+            with open(self._path, "r", encoding="utf-8") as f:
+                config = freeze(json.load(f))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Le fichier config.json est introuvable à l'emplacement: {self._path}")
+        except json.JSONDecodeError:
+            raise ValueError("Le fichier config.json est mal formaté")
+        # Remplacement atomique : les lecteurs voient l'ancienne ou la nouvelle version, jamais un mélange
+        self._config = config
+        self._mtime = mtime
+        self._version += 1
+
+
+_registry_lock = threading.Lock()
+_registries: Dict[str, ConfigRegistry] = {}
+
+
+def get_config_registry(path: Optional[str] = None) -> ConfigRegistry:
+    """Retourne le registre partagé du fichier de configuration (créé au premier appel)."""
+    path = os.path.abspath(path or default_config_path())
+    with _registry_lock:
+        registry = _registries.get(path)
+        if registry is None:
+            registry = ConfigRegistry(path)
+            _registries[path] = registry
+        return registry
+
+
+def get_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """Raccourci : configuration courante du fichier par défaut (ou de `path`)."""
+    return get_config_registry(path).get()
@@ -0,0 +1,260 @@
+# conversation_schema.py
+"""
+Schéma des métadonnées des échanges stockés dans la collection 'conversations'.
+
+Chaque slot est un champ typé à part ("slot_location", "slot_budget", ...),
+l'intention et l'émotion sont ramenées à un vocabulaire fermé et la date est un
+timestamp epoch numérique ("ts") : les sélections se font dans ChromaDB par un
+filtre `where`, sans relire ni décoder les échanges en Python.
+
+Les échanges enregistrés avant ce schéma (slots en une chaîne JSON, date ISO
+seule, sans session) sont convertis par `upgrade_metadata`
+(commande `python manage.py migrate-memory`).
+"""
+import json
+import re
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .text_utils import fold_accents, normalize_value
+
+SCHEMA_VERSION = 2
+SLOT_PREFIX = "slot_"
+
+# Session des échanges enregistrés sans session explicite
+DEFAULT_SESSION_ID = "default"
+
+UNKNOWN_INTENT = "unknown"
+OTHER_INTENT = "autre"
+INTENTS = frozenset([
+    "recherche_restaurant",
+    "recherche_activite",
+    "reservation_hotel",
+    "salutation",
+    "presentation",
+    "remerciement",
+    "confirmation",
+    "negation",
+    "information_generale",
+    "demande_information",
+    UNKNOWN_INTENT,
+    OTHER_INTENT
+])
+# Variantes fréquentes renvoyées par le LLM (forme normalisée -> intention)
+INTENT_ALIASES = {
+    "recherche_restaurants": "recherche_restaurant",
+    "restaurant": "recherche_restaurant",
+    "recherche_activites": "recherche_activite",
+    "activite": "recherche_activite",
+    "recherche_hotel": "reservation_hotel",
+    "hotel": "reservation_hotel",
+    "reservation": "reservation_hotel",
+    "salutations": "salutation",
+    "remerciements": "remerciement",
+    "information": "information_generale",
+    "demande_informations": "demande_information",
+    "question": "demande_information"
+}
+
+NEUTRAL_EMOTION = "neutre"
+OTHER_EMOTION = "autre"
+EMOTIONS = frozenset([
+    "joie", "gratitude", "enthousiasme", "satisfaction", "soulagement",
+    "tristesse", "colère", "peur", "déception", "frustration", "inquiétude",
+    "surprise", NEUTRAL_EMOTION, OTHER_EMOTION
+])
+# Variantes fréquentes (forme sans accents -> émotion)
+EMOTION_ALIASES = {
+    "heureux": "joie", "content": "joie", "bonheur": "joie", "amusement": "joie",
+    "reconnaissance": "gratitude", "remerciement": "gratitude",
+    "excitation": "enthousiasme", "impatience": "enthousiasme", "curiosite": "enthousiasme",
+    "contentement": "satisfaction", "apaisement": "soulagement",
+    "triste": "tristesse", "melancolie": "tristesse",
+    "colere": "colère", "enerve": "colère", "agacement": "colère", "irritation": "colère",
+    "crainte": "peur", "anxiete": "inquiétude", "stress": "inquiétude", "inquiet": "inquiétude",
+    "decu": "déception", "deception": "déception", "frustre": "frustration",
+    "etonnement": "surprise", "neutral": NEUTRAL_EMOTION, "calme": NEUTRAL_EMOTION
+}
+_EMOTIONS_BY_FOLDED = {fold_accents(emotion): emotion for emotion in EMOTIONS}
+
+_KEY_PATTERN = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize_key(text: str) -> str:
+    """Forme normalisée d'un identifiant : minuscules, sans accents, mots séparés par '_'."""
+    return _KEY_PATTERN.sub("_", fold_accents(str(text).lower())).strip("_")
+
+
+def normalize_intent(intent: Optional[str]) -> str:
+    """
+    Ramène une intention au vocabulaire INTENTS.
+
+    Returns:
+        str: L'intention, "unknown" si elle est vide, "autre" si elle est hors vocabulaire
+    """
+    key = _normalize_key(intent or "")
+    if not key:
+        return UNKNOWN_INTENT
+    if key in INTENTS:
+        return key
+    return INTENT_ALIASES.get(key, OTHER_INTENT)
+
+
+def normalize_emotion(emotion: Optional[str]) -> str:
+    """
+    Ramène une émotion au vocabulaire EMOTIONS.
+
+    Returns:
+        str: L'émotion, "neutre" si elle est vide, "autre" si elle est hors vocabulaire
+    """
+    key = fold_accents((emotion or "").strip().lower())
+    if len(key) < 2:  # Éviter les émotions trop courtes
+        return NEUTRAL_EMOTION
+    return _EMOTIONS_BY_FOLDED.get(key) or EMOTION_ALIASES.get(key, OTHER_EMOTION)
+
+
+def normalize_slot_value(value: Any) -> Any:
+    """
+    Valeur de slot stockée : nombres et booléens gardent leur type, le texte est
+    normalisé (minuscules, sans accents) pour que l'égalité d'un filtre soit fiable.
+
+    Returns:
+        Any: La valeur normalisée, None si elle est vide
+    """
+    if isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        value = ", ".join(str(item) for item in value)
+    normalized = normalize_value(value)
+    return normalized or None
+
+
+def flatten_slots(slots: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convertit des slots en champs de métadonnées typés ("location" -> "slot_location")."""
+    fields = {}
+    for key, value in (slots or {}).items():
+        name = _normalize_key(key)
+        value = normalize_slot_value(value)
+        if name and value is not None:
+            fields[SLOT_PREFIX + name] = value
+    return fields
+
+
+def slots_from_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Slots d'un échange, lus dans les champs "slot_*" (ou la chaîne JSON des anciens échanges)."""
+    slots = {key[len(SLOT_PREFIX):]: value for key, value in metadata.items() if key.startswith(SLOT_PREFIX)}
+    if not slots and metadata.get("slots"):
+        try:
+            slots = {key: value for key, value in json.loads(metadata["slots"]).items() if value is not None}
+        except (TypeError, ValueError):
+            pass
+    return slots
+
+
+def build_metadata(user_message: str, ai_message: str, emotion: Optional[str], intent: Optional[str],
+                   slots: Optional[Dict[str, Any]], session_id: str, ts: float) -> Dict[str, Any]:
+    """
+    Métadonnées d'un échange au format courant.
+
+    Args:
+        user_message (str): Le message utilisateur
+        ai_message (str): La réponse de l'assistant
+        emotion (str, optional): L'émotion détectée
+        intent (str, optional): L'intention détectée
+        slots (Dict[str, Any], optional): Les slots extraits
+        session_id (str): La session de l'échange
+        ts (float): Date de l'échange (timestamp epoch)
+
+    Returns:
+        Dict[str, Any]: Les métadonnées à stocker dans ChromaDB
+    """
+    metadata = {
+        "user_message": user_message,
+        "ai_message": ai_message,
+        "emotion": normalize_emotion(emotion),
+        "intent": normalize_intent(intent),
+        "ts": float(ts),
+        "session_id": session_id,
+        "schema_version": SCHEMA_VERSION
+    }
+    metadata.update(flatten_slots(slots))
+    return metadata
+
+
+def upgrade_metadata(metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Convertit les métadonnées d'un ancien échange au format courant.
+
+    Returns:
+        Optional[Dict[str, Any]]: Champs à mettre à jour (None efface un champ,
+            mise à jour partielle de ChromaDB), None si l'échange est déjà au format courant
+    """
+    if metadata.get("schema_version") == SCHEMA_VERSION:
+        return None
+    update = build_metadata(
+        metadata.get("user_message", ""),
+        metadata.get("ai_message", ""),
+        metadata.get("emotion"),
+        metadata.get("intent"),
+        slots_from_metadata(metadata),
+        metadata.get("session_id") or DEFAULT_SESSION_ID,
+        turn_timestamp(metadata)
+    )
+    # Champs remplacés par le schéma courant
+    update["slots"] = None
+    update["timestamp"] = None
+    return update
+
+
+def build_where(session_id: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+                intent: Optional[str] = None, emotion: Optional[str] = None,
+                slots: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Filtre `where` ChromaDB sur les champs du schéma courant (valeurs normalisées
+    comme à l'écriture).
+
+    Args:
+        session_id (str, optional): Session des échanges
+        since (float, optional): Début de la période (timestamp epoch, inclus)
+        until (float, optional): Fin de la période (timestamp epoch, exclu)
+        intent (str, optional): Intention des échanges
+        emotion (str, optional): Émotion des échanges
+        slots (Dict[str, Any], optional): Valeurs de slots attendues
+
+    Returns:
+        Optional[Dict[str, Any]]: Le filtre, None si aucun critère n'est donné
+    """
+    conditions: List[Dict[str, Any]] = []
+    if session_id is not None:
+        conditions.append({"session_id": session_id})
+    if since is not None:
+        conditions.append({"ts": {"$gte": float(since)}})
+    if until is not None:
+        conditions.append({"ts": {"$lt": float(until)}})
+    if intent:
+        conditions.append({"intent": normalize_intent(intent)})
+    if emotion:
+        conditions.append({"emotion": normalize_emotion(emotion)})
+    conditions.extend({key: value} for key, value in flatten_slots(slots).items())
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def turn_timestamp(metadata: Dict[str, Any]) -> float:
+    """Date d'un échange en timestamp epoch (champ "ts", ou date ISO des anciens échanges ; 0 si absente)."""
+    ts = metadata.get("ts")
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    try:
+        return datetime.fromisoformat(metadata["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def format_timestamp(metadata: Dict[str, Any]) -> str:
+    """Date ISO d'un échange (vide si absente)."""
+    ts = turn_timestamp(metadata)
+    return datetime.fromtimestamp(ts).isoformat() if ts else ""
@@ -0,0 +1,275 @@
+# embeddings.py
+"""
+Fonctions d'embedding de la collection 'conversations'.
+
+Trois backends, choisis par memory.embedding.backend dans config.json :
+
+- "default" : le modèle de phrases ONNX de ChromaDB (chargé au premier appel) ;
+- "hashed" : n-grammes de caractères hachés dans un vecteur de taille fixe,
+  sans modèle à charger (quelques dizaines de µs par texte sur CPU) ;
+- "precomputed" : vecteurs calculés à l'avance (fichier .npz indexé par empreinte
+  du texte, voir save_precomputed), les textes absents sont confiés au backend
+  memory.embedding.fallback.
+
+Tous passent par CachedEmbedder : les textes sont dédoublonnés, les vecteurs
+mémorisés par empreinte (SHA-256) du contenu et les textes restants calculés
+par lots de batch_size.
+"""
+import hashlib
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from .cache import PACKAGE_DIR, TTLCache, make_cache_key
+from .text_utils import tokenize
+
+DEFAULT_DIMENSION = 256
+DEFAULT_NGRAM_RANGE = (3, 5)
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_CACHE_SIZE = 10000
+
+
+def content_hash(text: str) -> str:
+    """Empreinte (SHA-256) du contenu d'un texte, clé des vecteurs mémorisés."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class Embedder:
+    """Interface commune : calcule les vecteurs d'une liste de textes."""
+
+    # Identifie l'espace des vecteurs : deux backends de même nom sont interchangeables
+    name = "embedder"
+
+    def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        raise NotImplementedError
+
+
+class DefaultEmbedder(Embedder):
+    """Modèle de phrases par défaut de ChromaDB (all-MiniLM-L6-v2, ONNX)."""
+
+    name = "default"
+
+    def __init__(self):
+        self._function = None
+        self._lock = threading.Lock()
+
+    def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        with self._lock:
+            if self._function is None:
+                # Import et chargement du modèle différés jusqu'au premier texte
+                from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+                self._function = DefaultEmbeddingFunction()
+        return [np.asarray(vector, dtype=np.float32) for vector in self._function(list(texts))]
+
+
+class HashedNgramEmbedder(Embedder):
+    """
+    Sac de mots et de n-grammes de caractères (texte en minuscules, sans accents),
+    projetés par hachage (CRC32, signe aléatoire) dans `dimension` composantes
+    puis normalisés (norme L2 = 1, adaptée à la distance cosinus).
+    """
+
+    def __init__(self, dimension: int = DEFAULT_DIMENSION, ngram_range: Sequence[int] = DEFAULT_NGRAM_RANGE):
+        """
+        Args:
+            dimension (int): Taille des vecteurs
+            ngram_range (Sequence[int]): Tailles minimale et maximale des n-grammes de caractères
+        """
+        self._dimension = dimension
+        self._ngram_range = (ngram_range[0], ngram_range[1])
+        self.name = f"hashed-{dimension}"
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        low, high = self._ngram_range
+        for token in tokenize(text):
+            features.append(token)
+            padded = f"<{token}>"
+            for n in range(low, high + 1):
+                features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        # Texte sans mot (ponctuation seule) : vecteur non nul, la distance cosinus reste définie
+        return features or [text]
+
+    def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        vectors = []
+        for text in texts:
+            hashes = np.fromiter(
+                (zlib.crc32(feature.encode("utf-8")) for feature in self._features(text)), dtype=np.uint32
+            )
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+            vector = np.bincount(hashes % self._dimension, weights=signs, minlength=self._dimension).astype(np.float32)
+            norm = np.linalg.norm(vector)
+            vectors.append(vector / norm if norm else vector)
+        return vectors
+
+
+class PrecomputedEmbedder(Embedder):
+    """Vecteurs lus dans un fichier .npz ; les textes absents sont calculés par le backend de repli."""
+
+    def __init__(self, path: str, fallback: Embedder):
+        """
+        Args:
+            path (str): Fichier écrit par save_precomputed (vecteurs de l'espace de `fallback`)
+            fallback (Embedder): Backend des textes absents du fichier
+        """
+        data = np.load(path)
+        self._index = {key: i for i, key in enumerate(data["keys"].tolist())}
+        self._vectors = data["vectors"].astype(np.float32)
+        self._fallback = fallback
+        self.name = fallback.name
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        vectors: List[Optional[np.ndarray]] = []
+        missing = []
+        for i, text in enumerate(texts):
+            row = self._index.get(content_hash(text))
+            vectors.append(None if row is None else self._vectors[row])
+            if row is None:
+                missing.append(i)
+        if missing:
+            for i, vector in zip(missing, self._fallback.embed([texts[i] for i in missing])):
+                vectors[i] = vector
+        return vectors
+
+
+def save_precomputed(path: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+    """Enregistre des vecteurs calculés à l'avance, indexés par empreinte du texte (.npz)."""
+    np.savez(path, keys=np.array([content_hash(text) for text in texts]),
+             vectors=np.asarray(vectors, dtype=np.float32))
+
+
+class CachedEmbedder(Embedder):
+    """Mémorisation par empreinte du contenu et calcul par lots autour d'un backend."""
+
+    def __init__(self, backend: Embedder, batch_size: int = DEFAULT_BATCH_SIZE,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            backend (Embedder): Le backend qui calcule les vecteurs
+            batch_size (int): Nombre maximal de textes par appel au backend
+            cache_size (int): Nombre de vecteurs mémorisés (0 : pas de mémorisation)
+        """
+        self._backend = backend
+        self._batch_size = max(1, batch_size)
+        self._cache = TTLCache(max_entries=cache_size, ttl=None) if cache_size > 0 else None
+        self._lock = threading.Lock()
+        self._stats = {
+            "texts": 0,
+            "computed": 0,
+            "batches": 0,
+            "embed_time_total": 0.0
+        }
+        self.name = backend.name
+
+    def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """
+        Args:
+            texts (Sequence[str]): Les textes
+
+        Returns:
+            List[np.ndarray]: Un vecteur par texte, dans l'ordre
+        """
+        keys = [content_hash(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        if self._cache is not None:
+            for key in set(keys):
+                vector = self._cache.get(key)
+                if vector is not None:
+                    found[key] = vector
+
+        # Textes à calculer, sans doublons
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                pending.setdefault(key, text)
+        pending_keys = list(pending)
+
+        start = time.perf_counter()
+        batches = 0
+        for first in range(0, len(pending_keys), self._batch_size):
+            batch = pending_keys[first:first + self._batch_size]
+            for key, vector in zip(batch, self._backend.embed([pending[key] for key in batch])):
+                found[key] = vector
+                if self._cache is not None:
+                    self._cache.set(key, vector)
+            batches += 1
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._stats["texts"] += len(texts)
+            self._stats["computed"] += len(pending_keys)
+            self._stats["batches"] += batches
+            self._stats["embed_time_total"] += elapsed
+        return [found[key] for key in keys]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Textes demandés, textes calculés, taux de réutilisation et durée des calculs."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["backend"] = self.name
+        stats["reuse_rate"] = 1 - stats["computed"] / stats["texts"] if stats["texts"] else 0.0
+        stats["embed_time_avg"] = stats["embed_time_total"] / stats["computed"] if stats["computed"] else 0.0
+        return stats
+
+
+def create_backend(embedding_config: Dict[str, Any], backend: Optional[str] = None) -> Embedder:
+    """
+    Construit le backend décrit par la section memory.embedding.
+
+    Args:
+        embedding_config (Dict[str, Any]): La section de configuration
+        backend (str, optional): Backend à construire (par défaut embedding_config["backend"])
+    """
+    backend = backend or embedding_config.get("backend", "default")
+    if backend == "default":
+        return DefaultEmbedder()
+    if backend == "hashed":
+        return HashedNgramEmbedder(
+            dimension=embedding_config.get("dimension", DEFAULT_DIMENSION),
+            ngram_range=embedding_config.get("ngram_range", DEFAULT_NGRAM_RANGE)
+        )
+    if backend == "precomputed":
+        fallback = embedding_config.get("fallback", "default")
+        if fallback == "precomputed":
+            raise ValueError("memory.embedding.fallback ne peut pas être 'precomputed'")
+        path = embedding_config["precomputed_path"]
+        if not os.path.isabs(path):
+            path = os.path.join(PACKAGE_DIR, path)
+        return PrecomputedEmbedder(path, create_backend(embedding_config, fallback))
+    raise ValueError(f"Backend d'embedding inconnu: {backend}")
+
+
+_registry_lock = threading.Lock()
+_embedders: Dict[str, CachedEmbedder] = {}
+
+
+def get_embedder(embedding_config: Dict[str, Any]) -> CachedEmbedder:
+    """
+    Retourne l'embedder partagé du processus pour cette configuration
+    (les vecteurs mémorisés profitent à tous les agents).
+    """
+    key = make_cache_key(embedding_config)
+    with _registry_lock:
+        embedder = _embedders.get(key)
+        if embedder is None:
+            embedder = CachedEmbedder(
+                create_backend(embedding_config),
+                batch_size=embedding_config.get("batch_size", DEFAULT_BATCH_SIZE),
+                cache_size=embedding_config.get("cache_size", DEFAULT_CACHE_SIZE)
+            )
+            _embedders[key] = embedder
+        return embedder
+
+
+def get_embedding_metrics() -> Dict[str, Dict[str, Any]]:
+    """Statistiques des embedders du processus, par backend."""
+    with _registry_lock:
+        embedders = list(_embedders.values())
+    return {embedder.name: embedder.get_stats() for embedder in embedders}
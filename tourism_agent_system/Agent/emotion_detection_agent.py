@@ -1,6 +1,7 @@
 # emotion_detection_agent.py
 from .base_agent import BaseAgent
-import requests
+from .emotion_lexicon import classify_emotion, is_confident
+from .llm_client import RateLimitError
 from typing import Dict, Any, List, Optional
 import json
 import re
@@ -8,14 +9,17 @@ import re
 class EmotionDetectionAgent(BaseAgent):
     """
     Agent spécialisé dans la détection des émotions dans les messages.
-    Utilise Mistral pour analyser le sentiment et l'émotion de manière dynamique.
+    Utilise Mistral pour analyser le sentiment et l'émotion de manière dynamique,
+    après un premier étage local à base de lexique (emotion_lexicon).
     """
     
     def __init__(self, name: str = "emotion"):
         super().__init__(name)
-        self._model_config = self._config["model"]
-        self._api_key = self._model_config["api_key"]
-        self._api_url = self._model_config["api_url"]
+
+    @property
+    def _emotion_config(self) -> Dict[str, Any]:
+        """Paramètres du premier étage local (section "emotion", rechargée à chaud)."""
+        return self._config.get("emotion", {})
         
     def run(self, message: str) -> List[str]:
         """
@@ -36,31 +40,30 @@ class EmotionDetectionAgent(BaseAgent):
             str: La réponse du LLM
         """
         try:
-            headers = {
-                "Authorization": f"Bearer {self._api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": "mistral-tiny",
-                "messages": prompt,
-                "temperature": self._model_config["temperature"],
-                "max_tokens": self._model_config["max_tokens"]
-            }
-            
-            response = requests.post(
-                f"{self._api_url}/chat/completions",
-                headers=headers,
-                json=data
-            )
+            return self._llm.complete(prompt)
+                
+        except RateLimitError:
+            # Quota dépassé : l'orchestrateur réessaie l'étape
+            raise
+        except Exception as e:
+            print(f"Erreur lors de l'appel à l'API Mistral: {e}")
+            return "neutre"  # Retourner une émotion neutre en cas d'erreur
+
+    async def _get_llm_response_async(self, prompt: List[Dict[str, str]]) -> str:
+        """
+        Version asynchrone de _get_llm_response (client HTTP non bloquant).
+        
+        Args:
+            prompt (List[Dict[str, str]]): Le prompt à envoyer au LLM
             
-            if response.status_code == 200:
-                return response.json()["choices"][0]["message"]["content"]
-            elif response.status_code == 429:  # Rate limit
-                return "neutre"  # Retourner une émotion neutre en cas de rate limit
-            else:
-                raise Exception(f"Erreur API Mistral: {response.status_code}")
+        Returns:
+            str: La réponse du LLM
+        """
+        try:
+            return await self._llm.complete_async(prompt)
                 
+        except RateLimitError:
+            raise
         except Exception as e:
             print(f"Erreur lors de l'appel à l'API Mistral: {e}")
             return "neutre"  # Retourner une émotion neutre en cas d'erreur
@@ -75,38 +78,43 @@ class EmotionDetectionAgent(BaseAgent):
         Returns:
             Dict[str, str]: Dictionnaire contenant l'émotion détectée et sa confiance
         """
+        local_result = self._detect_locally(message)
+        if local_result is not None:
+            return local_result
+
         try:
-            prompt = [
-                {"role": "system", "content": """Tu es un expert en analyse émotionnelle.
-                Analyse le message et détermine l'émotion principale exprimée.
-                Tu peux identifier n'importe quelle émotion humaine, pas seulement une liste prédéfinie.
-                
-                Réponds au format JSON avec deux champs :
-                {
-                    "emotion": "nom de l'émotion en minuscules",
-                    "confidence": "high/medium/low"
-                }
-                
-                L'émotion doit être un mot simple et clair en français."""},
-                {"role": "user", "content": message}
-            ]
+            response = self._get_llm_response(self._build_detection_prompt(message)).strip()
+            return self._parse_emotion_response(response)
             
-            response = self._get_llm_response(prompt).strip()
+        except RateLimitError:
+            raise
+        except Exception as e:
+            print(f"Erreur lors de la détection d'émotion: {e}")
+            return {
+                "emotion": "neutre",
+                "confidence": "low"
+            }
+
+    async def detect_emotion_async(self, message: str) -> Dict[str, str]:
+        """
+        Version asynchrone de detect_emotion.
+        
+        Args:
+            message (str): Le message à analyser
             
-            try:
-                result = json.loads(response)
-                return {
-                    "emotion": result.get("emotion", "neutre").lower(),
-                    "confidence": result.get("confidence", "medium")
-                }
-            except json.JSONDecodeError:
-                # Si le format JSON n'est pas respecté, on extrait l'émotion du texte brut
-                emotion = response.lower().strip()
-                return {
-                    "emotion": emotion if emotion else "neutre",
-                    "confidence": "medium"
-                }
+        Returns:
+            Dict[str, str]: Dictionnaire contenant l'émotion détectée et sa confiance
+        """
+        local_result = self._detect_locally(message)
+        if local_result is not None:
+            return local_result
+
+        try:
+            response = (await self._get_llm_response_async(self._build_detection_prompt(message))).strip()
+            return self._parse_emotion_response(response)
             
+        except RateLimitError:
+            raise
         except Exception as e:
             print(f"Erreur lors de la détection d'émotion: {e}")
             return {
@@ -114,6 +122,77 @@ class EmotionDetectionAgent(BaseAgent):
                 "confidence": "low"
             }
 
+    def _detect_locally(self, message: str) -> Optional[Dict[str, str]]:
+        """
+        Classe le message avec le lexique local.
+        
+        Args:
+            message (str): Le message à analyser
+            
+        Returns:
+            Optional[Dict[str, str]]: Le résultat si la confiance locale est suffisante,
+            None si le message doit être envoyé au LLM
+        """
+        # Premier étage local : seuls les messages sous ce niveau de confiance vont au LLM
+        if not self._emotion_config.get("fast_path", True):
+            return None
+        result = classify_emotion(message)
+        if not is_confident(result, self._emotion_config.get("min_confidence", "medium")):
+            return None
+        return {
+            "emotion": result["emotion"],
+            "confidence": result["confidence"]
+        }
+
+    def _build_detection_prompt(self, message: str) -> List[Dict[str, str]]:
+        """
+        Construit le prompt utilisé par detect_emotion.
+        
+        Args:
+            message (str): Le message à analyser
+            
+        Returns:
+            List[Dict[str, str]]: Le prompt formaté
+        """
+        return [
+            {"role": "system", "content": """Tu es un expert en analyse émotionnelle.
+            Analyse le message et détermine l'émotion principale exprimée.
+            Tu peux identifier n'importe quelle émotion humaine, pas seulement une liste prédéfinie.
+            
+            Réponds au format JSON avec deux champs :
+            {
+                "emotion": "nom de l'émotion en minuscules",
+                "confidence": "high/medium/low"
+            }
+            
+            L'émotion doit être un mot simple et clair en français."""},
+            {"role": "user", "content": message}
+        ]
+
+    def _parse_emotion_response(self, response: str) -> Dict[str, str]:
+        """
+        Parse la réponse du LLM pour extraire l'émotion et sa confiance.
+        
+        Args:
+            response (str): Réponse brute du LLM
+            
+        Returns:
+            Dict[str, str]: Dictionnaire contenant l'émotion détectée et sa confiance
+        """
+        try:
+            result = json.loads(response)
+            return {
+                "emotion": result.get("emotion", "neutre").lower(),
+                "confidence": result.get("confidence", "medium")
+            }
+        except json.JSONDecodeError:
+            # Si le format JSON n'est pas respecté, on extrait l'émotion du texte brut
+            emotion = response.lower().strip()
+            return {
+                "emotion": emotion if emotion else "neutre",
+                "confidence": "medium"
+            }
+
     def _build_prompt(self, message: str) -> List[Dict[str, str]]:
         """
         Construit le prompt pour la détection d'émotion.
@@ -0,0 +1,221 @@
+# emotion_lexicon.py
+"""
+Classifieur d'émotions local, à base de lexique français.
+
+Il sert de premier étage à EmotionDetectionAgent : les messages courants
+("merci", "bonjour", "c'est nul !") sont classés en quelques microsecondes,
+et seuls les messages où la confiance locale est insuffisante sont envoyés au LLM.
+
+Signaux pris en compte :
+- mots du lexique (formes fléchies via des radicaux), sans accents ni casse ;
+- négation ("pas content", "jamais satisfait") qui inverse ou annule le signal,
+  limitée à la proposition courante (elle s'arrête à ",;.!?" et à "mais") et
+  sans effet sur les remerciements ("Pas de souci, merci !") ;
+- intensifieurs et atténuateurs ("très", "vraiment", "un peu") ;
+- ponctuation ("!", "?!", "..."), majuscules et émojis / émoticônes.
+"""
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from .text_utils import tokenize
+
+POSITIVE_EMOTIONS = frozenset(["joie", "gratitude", "enthousiasme", "satisfaction", "soulagement"])
+NEGATIVE_EMOTIONS = frozenset(["tristesse", "colère", "peur", "déception", "frustration", "inquiétude"])
+
+# Émotion obtenue lorsqu'une émotion positive est niée ("pas content")
+NEGATED_POSITIVE = "déception"
+
+# Radicaux (sans accents) -> (émotion, poids). Un mot correspond si il commence par le radical.
+STEMS: Dict[str, Tuple[str, float]] = {
+    # joie / satisfaction
+    "content": ("joie", 1.0), "heureu": ("joie", 1.2), "ravi": ("joie", 1.2), "joie": ("joie", 1.0),
+    "joyeu": ("joie", 1.0), "super": ("joie", 0.8), "genial": ("joie", 1.2), "excellent": ("joie", 1.0),
+    "parfait": ("satisfaction", 1.0), "magnifique": ("joie", 1.0), "formidable": ("joie", 1.0),
+    "merveill": ("joie", 1.0), "adore": ("enthousiasme", 1.2), "aime": ("joie", 0.7),
+    "satisf": ("satisfaction", 1.0), "impatien": ("enthousiasme", 1.0), "hate": ("enthousiasme", 0.6),
+    "enthousias": ("enthousiasme", 1.2), "excit": ("enthousiasme", 1.0), "cool": ("joie", 0.7),
+    "chouette": ("joie", 0.8), "sympa": ("joie", 0.6), "soulag": ("soulagement", 1.2),
+    # gratitude
+    "merci": ("gratitude", 1.2), "remerci": ("gratitude", 1.2), "reconnaiss": ("gratitude", 1.0),
+    # tristesse
+    "triste": ("tristesse", 1.2), "tristesse": ("tristesse", 1.2), "malheureu": ("tristesse", 1.2),
+    "deprim": ("tristesse", 1.2), "pleur": ("tristesse", 1.0), "seul": ("tristesse", 0.5),
+    "dommage": ("déception", 0.8),
+    # déception
+    "decu": ("déception", 1.2), "decevant": ("déception", 1.2), "deception": ("déception", 1.2),
+    "mediocre": ("déception", 1.0), "bof": ("déception", 0.6),
+    # colère / frustration
+    "colere": ("colère", 1.2), "furieu": ("colère", 1.5), "enerv": ("colère", 1.2),
+    "agace": ("frustration", 1.0), "agacant": ("frustration", 1.0), "inadmissible": ("colère", 1.5),
+    "inacceptable": ("colère", 1.5), "scandal": ("colère", 1.5), "honte": ("colère", 1.0),
+    "marre": ("frustration", 1.2), "frustr": ("frustration", 1.2), "rassur": ("soulagement", 1.0),
+    "penible": ("frustration", 1.0), "insupport": ("colère", 1.2), "horrible": ("colère", 1.0),
+    "deteste": ("colère", 1.2), "sale": ("déception", 0.8),
+    # peur / inquiétude
+    "peur": ("peur", 1.2), "effray": ("peur", 1.2), "terrifi": ("peur", 1.5), "panique": ("peur", 1.2),
+    "angoiss": ("inquiétude", 1.2), "inquiet": ("inquiétude", 1.2), "stress": ("inquiétude", 1.0),
+    "crain": ("peur", 1.0), "anxi": ("inquiétude", 1.2), "rater": ("inquiétude", 0.6),
+    "urgent": ("inquiétude", 0.8), "perdu": ("inquiétude", 0.8),
+}
+
+# Mots courts ou ambigus, reconnus uniquement à l'identique
+EXACT_WORDS: Dict[str, Tuple[str, float]] = {
+    "top": ("joie", 0.8), "bravo": ("joie", 1.0), "yes": ("joie", 0.8), "ouf": ("soulagement", 1.0),
+    "zut": ("frustration", 0.8), "mince": ("frustration", 0.6), "grr": ("colère", 1.0),
+    "beurk": ("déception", 1.0), "helas": ("tristesse", 1.0), "wow": ("joie", 1.0),
+    # "nulle" et "nullement" sont exclus : "nulle part", "je ne suis nullement déçu"
+    "nul": ("déception", 1.0), "nuls": ("déception", 1.0), "nulles": ("déception", 1.0),
+}
+
+# Mots qui commencent par un radical du lexique sans en partager le sens
+EXCLUDED_WORDS = frozenset([
+    "aimerais", "aimerait", "aimerions", "aimeriez", "aimeraient", "seulement",
+    "supermarche", "supermarches", "superficie", "tresor", "plusieurs"
+])
+
+# Messages sans charge émotionnelle reconnus avec certitude (salutations, accusés de réception)
+NEUTRAL_WORDS = frozenset(["bonjour", "bonsoir", "salut", "hello", "coucou", "ok", "okay", "accord", "oui", "non", "d"])
+
+NEGATORS = frozenset(["pas", "jamais", "plus", "aucun", "aucune", "rien", "sans", "ni", "guere"])
+INTENSIFIERS = {
+    "tres": 1.5, "vraiment": 1.5, "trop": 1.4, "tellement": 1.6, "si": 1.3, "extremement": 1.8,
+    "vachement": 1.5, "hyper": 1.5, "ultra": 1.5, "completement": 1.6, "totalement": 1.6,
+    "absolument": 1.5, "tout": 1.2, "bien": 1.2
+}
+COMPARATIVES = frozenset(["aussi", "autant", "si", "tellement"])
+ATTENUATORS = {"peu": 0.5, "assez": 0.7, "plutot": 0.7, "legerement": 0.5, "moyennement": 0.5}
+
+EMOJIS: Dict[str, Tuple[str, float]] = {
+    "😀": ("joie", 1.2), "😃": ("joie", 1.2), "😄": ("joie", 1.2), "😁": ("joie", 1.2),
+    "😊": ("joie", 1.2), "🙂": ("joie", 0.8), "😍": ("enthousiasme", 1.5), "🤩": ("enthousiasme", 1.5),
+    "🥰": ("joie", 1.5), "👍": ("satisfaction", 1.0), "🙏": ("gratitude", 1.2), "❤": ("joie", 1.0),
+    "😢": ("tristesse", 1.5), "😭": ("tristesse", 1.5), "😞": ("déception", 1.2), "😔": ("tristesse", 1.2),
+    "😡": ("colère", 1.5), "😠": ("colère", 1.5), "🤬": ("colère", 1.8), "👎": ("déception", 1.0),
+    "😱": ("peur", 1.5), "😨": ("peur", 1.5), "😰": ("inquiétude", 1.5), "😟": ("inquiétude", 1.2),
+    "😮": ("surprise", 1.2), "😲": ("surprise", 1.2), "🤯": ("surprise", 1.5),
+}
+EMOTICONS: List[Tuple[re.Pattern, str, float]] = [
+    (re.compile(r"[:;]-?[)D]|\^\^|\^_\^"), "joie", 1.0),
+    (re.compile(r":-?\(|:'\("), "tristesse", 1.2),
+    (re.compile(r">:-?\(|:-?@"), "colère", 1.2),
+    (re.compile(r":-?[oO0]\b"), "surprise", 1.0),
+]
+
+# Fenêtre (en mots) dans laquelle un négateur ou un intensifieur s'applique au mot suivant
+MODIFIER_WINDOW = 3
+# Limites de proposition : un négateur ou un intensifieur ne les traverse pas
+CLAUSE_BOUNDARY = re.compile(r"[,;.!?]+|\bmais\b", re.IGNORECASE)
+# Émotions qu'une négation ne modifie pas ("Sans problème, merci", "pas de quoi, merci")
+NEGATION_IMMUNE = frozenset(["gratitude"])
+
+CONFIDENCE_LEVELS = {"low": 0, "medium": 1, "high": 2}
+
+
+def _lookup(token: str) -> Optional[Tuple[str, float]]:
+    """Cherche un mot dans le lexique (mot exact, puis radicaux du plus long au plus court)."""
+    if token in EXCLUDED_WORDS:
+        return None
+    entry = EXACT_WORDS.get(token)
+    if entry is not None:
+        return entry
+    for end in range(len(token), 2, -1):
+        entry = STEMS.get(token[:end])
+        if entry is not None:
+            return entry
+    return None
+
+
+def classify_emotion(message: str) -> Dict[str, Any]:
+    """
+    Classe l'émotion principale d'un message à partir du lexique.
+
+    Args:
+        message (str): Le message à analyser
+
+    Returns:
+        Dict[str, Any]: {"emotion", "confidence" ("high"/"medium"/"low"), "score"}
+    """
+    clauses = [tokenize(clause) for clause in CLAUSE_BOUNDARY.split(message)]
+    tokens = [token for clause in clauses for token in clause]
+    scores: Dict[str, float] = {}
+
+    for clause in clauses:
+        for i, token in enumerate(clause):
+            entry = _lookup(token)
+            if entry is None:
+                continue
+            emotion, weight = entry
+            negated = False
+            window = clause[max(0, i - MODIFIER_WINDOW):i]
+            for previous in window:
+                if previous in NEGATORS:
+                    negated = True
+                elif negated and previous in COMPARATIVES:
+                    # "jamais été aussi content" : tournure emphatique, pas une négation
+                    negated = False
+                weight *= INTENSIFIERS.get(previous, 1.0) * ATTENUATORS.get(previous, 1.0)
+            # "ne ... pas" encadre le verbe ("je ne l'aime pas") : négateur juste après le mot
+            if ("ne" in window or "n" in window) and i + 1 < len(clause) and clause[i + 1] in NEGATORS:
+                negated = True
+
+            if negated and emotion not in NEGATION_IMMUNE:
+                if emotion in POSITIVE_EMOTIONS:
+                    emotion = NEGATED_POSITIVE
+                else:
+                    # "pas inquiet", "plus peur" : le signal négatif est annulé, le LLM tranchera
+                    continue
+            scores[emotion] = scores.get(emotion, 0.0) + weight
+
+    for char in message:
+        entry = EMOJIS.get(char)
+        if entry is not None:
+            scores[entry[0]] = scores.get(entry[0], 0.0) + entry[1]
+    for pattern, emotion, weight in EMOTICONS:
+        if pattern.search(message):
+            scores[emotion] = scores.get(emotion, 0.0) + weight
+
+    if not scores:
+        return _neutral_result(tokens, message)
+
+    emotion, top = max(scores.items(), key=lambda item: item[1])
+
+    # Ponctuation et majuscules amplifient l'émotion dominante
+    exclamations = min(message.count("!"), 3)
+    top *= 1 + 0.15 * exclamations
+    letters = [c for c in message if c.isalpha()]
+    if len(letters) >= 6 and sum(c.isupper() for c in letters) / len(letters) > 0.7:
+        top *= 1.3
+
+    total = top + sum(score for name, score in scores.items() if name != emotion)
+    share = top / total
+    if top >= 1.5 and share >= 0.75:
+        confidence = "high"
+    elif top >= 0.9 and share >= 0.6:
+        confidence = "medium"
+    else:
+        confidence = "low"
+
+    return {"emotion": emotion, "confidence": confidence, "score": round(top, 3)}
+
+
+def _neutral_result(tokens: List[str], message: str) -> Dict[str, Any]:
+    """
+    Résultat lorsqu'aucun signal émotionnel n'a été trouvé.
+
+    Seuls les messages faits de salutations ou d'accusés de réception sont tranchés
+    localement ; sinon (négation, aucun mot reconnu) la confiance est faible et
+    le message est confié au LLM.
+    """
+    if "?!" in message or "!?" in message or message.count("!") >= 2:
+        # Ponctuation expressive sans mot du lexique : surprise ou émotion non reconnue
+        return {"emotion": "surprise", "confidence": "low", "score": 0.0}
+    if tokens and all(token in NEUTRAL_WORDS for token in tokens):
+        confidence = "high"
+    else:
+        confidence = "low"
+    return {"emotion": "neutre", "confidence": confidence, "score": 0.0}
+
+
+def is_confident(result: Dict[str, Any], min_confidence: str = "medium") -> bool:
+    """Indique si la confiance d'un résultat atteint le niveau minimal demandé."""
+    return CONFIDENCE_LEVELS.get(result.get("confidence"), 0) >= CONFIDENCE_LEVELS.get(min_confidence, 1)
@@ -0,0 +1,252 @@
+# intent_classifier.py
+"""
+Classifieur d'intentions local : TF-IDF (mots et bigrammes) + régression
+logistique multinomiale, entièrement en NumPy.
+
+Il sert de premier étage à IntentDetectionAgent : les intentions fréquentes
+("salutation", "remerciement", "confirmation"...) sont reconnues sans appel
+réseau lorsque la probabilité dépasse le seuil du ThresholdAgent.
+
+Le modèle est sérialisé dans un unique fichier .npz (vocabulaire, idf, poids,
+biais et libellés), chargé en quelques millisecondes sans pickle.
+"""
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .text_utils import tokenize
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODEL_PATH = os.path.join(PACKAGE_DIR, "models", "intent_classifier.npz")
+DEFAULT_EXAMPLES_PATH = os.path.join(PACKAGE_DIR, "data", "intent_examples.jsonl")
+
+
+def extract_terms(text: str) -> List[str]:
+    """Termes d'un message : mots (sans accents, minuscules) et bigrammes de mots."""
+    tokens = tokenize(text)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def load_examples(path: str = DEFAULT_EXAMPLES_PATH) -> List[Tuple[str, str]]:
+    """
+    Charge des exemples annotés au format JSON Lines ({"text": ..., "intent": ...}).
+
+    Returns:
+        List[Tuple[str, str]]: Liste de couples (message, intention)
+    """
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                examples.append((record["text"], record["intent"]))
+    return examples
+
+
+class IntentClassifier:
+    """Régression logistique multinomiale sur des vecteurs TF-IDF."""
+
+    def __init__(self, vocabulary: Dict[str, int], idf: np.ndarray, weights: np.ndarray,
+                 bias: np.ndarray, labels: List[str]):
+        self._vocabulary = vocabulary
+        self._idf = idf
+        self._weights = weights  # (taille du vocabulaire, nombre d'intentions)
+        self._bias = bias
+        self._labels = labels
+
+    @property
+    def labels(self) -> List[str]:
+        return list(self._labels)
+
+    @classmethod
+    def train(cls, texts: List[str], labels: List[str], epochs: int = 300,
+              learning_rate: float = 5.0, l2: float = 1e-4, min_df: int = 1) -> "IntentClassifier":
+        """
+        Entraîne un classifieur sur des messages annotés (descente de gradient sur lot complet).
+
+        Args:
+            texts (List[str]): Les messages
+            labels (List[str]): L'intention de chaque message
+            epochs (int): Nombre d'itérations
+            learning_rate (float): Pas d'apprentissage
+            l2 (float): Régularisation L2 des poids
+            min_df (int): Nombre minimal de messages contenant un terme pour l'inclure
+
+        Returns:
+            IntentClassifier: Le classifieur entraîné
+        """
+        documents = [extract_terms(text) for text in texts]
+        document_frequency: Dict[str, int] = {}
+        for terms in documents:
+            for term in set(terms):
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        terms_kept = sorted(term for term, count in document_frequency.items() if count >= min_df)
+        vocabulary = {term: i for i, term in enumerate(terms_kept)}
+        n_documents = len(documents)
+        idf = np.array(
+            [np.log((1 + n_documents) / (1 + document_frequency[term])) + 1 for term in terms_kept],
+            dtype=np.float32
+        )
+
+        classifier = cls(vocabulary, idf, np.zeros((len(vocabulary), 0), dtype=np.float32),
+                         np.zeros(0, dtype=np.float32), sorted(set(labels)))
+        features = np.vstack([classifier._vectorize(terms) for terms in documents])
+        label_index = {label: i for i, label in enumerate(classifier._labels)}
+        targets = np.zeros((n_documents, len(classifier._labels)), dtype=np.float32)
+        targets[np.arange(n_documents), [label_index[label] for label in labels]] = 1.0
+
+        weights = np.zeros((len(vocabulary), len(classifier._labels)), dtype=np.float32)
+        bias = np.zeros(len(classifier._labels), dtype=np.float32)
+        for _ in range(epochs):
+            probabilities = _softmax(features @ weights + bias)
+            error = (probabilities - targets) / n_documents
+            weights -= learning_rate * (features.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+
+        classifier._weights = weights
+        classifier._bias = bias
+        return classifier
+
+    def _vectorize(self, terms: List[str]) -> np.ndarray:
+        """Vecteur TF-IDF dense (tf sous-linéaire, normalisé L2) d'une liste de termes."""
+        vector = np.zeros(len(self._vocabulary), dtype=np.float32)
+        counts: Dict[int, int] = {}
+        for term in terms:
+            index = self._vocabulary.get(term)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+        if counts:
+            indices = np.fromiter(counts.keys(), dtype=np.int64)
+            tf = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32))
+            vector[indices] = tf * self._idf[indices]
+            vector /= np.linalg.norm(vector)
+        return vector
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        """
+        Probabilité de chaque intention pour un message.
+        Seules les lignes de poids des termes présents sont lues (coût indépendant du vocabulaire).
+        """
+        counts: Dict[int, int] = {}
+        for term in extract_terms(text):
+            index = self._vocabulary.get(term)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+
+        scores = self._bias.copy()
+        if counts:
+            indices = np.fromiter(counts.keys(), dtype=np.int64)
+            values = (1 + np.log(np.fromiter(counts.values(), dtype=np.float32))) * self._idf[indices]
+            values /= np.linalg.norm(values)
+            scores = scores + values @ self._weights[indices]
+        probabilities = _softmax(scores[np.newaxis, :])[0]
+        return {label: float(p) for label, p in zip(self._labels, probabilities)}
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """
+        Prédit l'intention d'un message.
+
+        Returns:
+            Tuple[str, float]: L'intention la plus probable et sa probabilité
+        """
+        probabilities = self.predict_proba(text)
+        label = max(probabilities, key=probabilities.get)
+        return label, probabilities[label]
+
+    def save(self, path: str = DEFAULT_MODEL_PATH) -> None:
+        """Sérialise le modèle au format .npz (tableaux NumPy, sans pickle)."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        terms = sorted(self._vocabulary, key=self._vocabulary.get)
+        np.savez_compressed(
+            path,
+            terms=np.array(terms, dtype=str),
+            idf=self._idf,
+            weights=self._weights,
+            bias=self._bias,
+            labels=np.array(self._labels, dtype=str)
+        )
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> "IntentClassifier":
+        """Charge un modèle sérialisé par save."""
+        with np.load(path, allow_pickle=False) as data:
+            vocabulary = {str(term): i for i, term in enumerate(data["terms"])}
+            return cls(vocabulary, data["idf"], data["weights"], data["bias"], [str(label) for label in data["labels"]])
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    exponentials = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return exponentials / exponentials.sum(axis=1, keepdims=True)
+
+
+def load_classifier(path: Optional[str] = None, train_if_missing: bool = True) -> Optional[IntentClassifier]:
+    """
+    Charge le classifieur sérialisé. S'il n'existe pas encore, il est entraîné
+    sur les exemples annotés de data/ puis enregistré (entraînement complet :
+    python manage.py train-intent).
+
+    Returns:
+        Optional[IntentClassifier]: Le classifieur, ou None s'il est indisponible
+    """
+    path = path or DEFAULT_MODEL_PATH
+    if not os.path.isabs(path):
+        path = os.path.join(PACKAGE_DIR, path)
+    try:
+        if os.path.exists(path):
+            return IntentClassifier.load(path)
+        if not train_if_missing or not os.path.exists(DEFAULT_EXAMPLES_PATH):
+            print(f"Classifieur d'intentions introuvable ({path}) : lancez 'python manage.py train-intent'")
+            return None
+        examples = load_examples()
+        classifier = IntentClassifier.train([text for text, _ in examples], [intent for _, intent in examples])
+        classifier.save(path)
+        return classifier
+    except Exception as e:
+        print(f"Erreur lors du chargement du classifieur d'intentions: {e}")
+        return None
+
+
+def evaluate(classifier: IntentClassifier, examples: List[Tuple[str, str]],
+             threshold: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Exactitude et latence de prédiction d'un classifieur sur des exemples annotés.
+
+    Args:
+        classifier (IntentClassifier): Le classifieur à évaluer
+        examples (List[Tuple[str, str]]): Couples (message, intention attendue)
+        threshold (Optional[float]): Seuil de probabilité ; si fourni, calcule aussi la
+            couverture (part des messages traités localement) et la précision au-dessus du seuil
+
+    Returns:
+        Dict[str, Any]: accuracy, coverage, precision, latence moyenne/max (secondes) et erreurs
+    """
+    correct = 0
+    covered = 0
+    covered_correct = 0
+    timings = []
+    errors = []
+    for text, expected in examples:
+        start = time.perf_counter()
+        predicted, probability = classifier.predict(text)
+        timings.append(time.perf_counter() - start)
+        if predicted == expected:
+            correct += 1
+        else:
+            errors.append({"text": text, "expected": expected, "predicted": predicted, "probability": probability})
+        if threshold is not None and probability >= threshold:
+            covered += 1
+            covered_correct += predicted == expected
+    report = {
+        "accuracy": correct / len(examples) if examples else 0.0,
+        "latency_avg": sum(timings) / len(timings) if timings else 0.0,
+        "latency_max": max(timings) if timings else 0.0,
+        "errors": errors
+    }
+    if threshold is not None:
+        report["coverage"] = covered / len(examples) if examples else 0.0
+        report["precision"] = covered_correct / covered if covered else 0.0
+    return report
@@ -1,22 +1,41 @@
 # intent_detection_agent.py
 from .base_agent import BaseAgent
-import requests
-from typing import Dict, Any, List, Optional
+from .intent_classifier import load_classifier
+from .slot_extractor import get_slot_extractor, merge_slots
+from .threshold_agent import ThresholdAgent
+from .llm_client import RateLimitError
+from typing import Dict, Any, List, Optional, Tuple
 import re
 import json
 
 class IntentDetectionAgent(BaseAgent):
     """
     Agent responsable de la détection des intentions et des slots dans les messages utilisateur.
-    Utilise le LLM pour une détection dynamique des intentions et des slots.
+    Utilise le LLM pour une détection dynamique des intentions et des slots,
+    après un classifieur local (intent_classifier) et un extracteur de slots local
+    (slot_extractor) qui permettent de répondre sans appel réseau.
     """
 
     def __init__(self, name: str = "intent"):
         super().__init__(name)
-        self._model_config = self._config["model"]
-        self._api_key = self._model_config["api_key"]
-        self._api_url = self._model_config["api_url"]
-        self._intent_config = self._config.get("intent", {})
+
+        # Classifieur local : répond sans appel réseau si la probabilité dépasse
+        # le seuil "intent_classifier" du ThresholdAgent
+        classifier_config = self._intent_config.get("classifier", {})
+        self._classifier = None
+        if classifier_config.get("enabled", False):
+            self._classifier = load_classifier(classifier_config.get("model_path"))
+        self._threshold_agent = ThresholdAgent()
+
+        # Extraction locale de location, food_type, budget et time (gazetteer)
+        self._slot_extractor = None
+        if self._intent_config.get("slot_extractor", {}).get("enabled", True):
+            self._slot_extractor = get_slot_extractor()
+
+    @property
+    def _intent_config(self) -> Dict[str, Any]:
+        """Section "intent" courante (rechargée à chaud)."""
+        return self._config.get("intent", {})
 
     def run(self, message: str) -> Dict[str, Any]:
         """
@@ -28,6 +47,11 @@ class IntentDetectionAgent(BaseAgent):
         Returns:
             Dict[str, Any]: Dictionnaire contenant l'intention, les slots et la confiance
         """
+        local_slots = self._extract_local_slots(message)
+        local_result = self._classify_locally(message, local_slots)
+        if local_result is not None:
+            return local_result
+
         try:
             prompt = self._build_prompt(message)
             response = self._get_llm_response(prompt)
@@ -35,18 +59,146 @@ class IntentDetectionAgent(BaseAgent):
             
             return {
                 "intent": result.get("intent", "unknown"),
-                "slots": result.get("slots", {}),
+                "slots": merge_slots(result.get("slots", {}), local_slots),
                 "confidence": result.get("confidence", "medium")
             }
             
+        except RateLimitError:
+            # Quota dépassé : l'orchestrateur réessaie l'étape
+            raise
         except Exception as e:
             print(f"Erreur lors de la détection d'intention: {e}")
             return {
                 "intent": "unknown",
-                "slots": {},
+                "slots": local_slots,
                 "confidence": "low"
             }
 
+    async def run_async(self, message: str) -> Dict[str, Any]:
+        """
+        Version asynchrone de run.
+
+        Args:
+            message (str): Le message à analyser
+
+        Returns:
+            Dict[str, Any]: Dictionnaire contenant l'intention, les slots et la confiance
+        """
+        local_slots = self._extract_local_slots(message)
+        local_result = self._classify_locally(message, local_slots)
+        if local_result is not None:
+            return local_result
+
+        try:
+            prompt = self._build_prompt(message)
+            response = await self._get_llm_response_async(prompt)
+            result = self._parse_response(response)
+
+            return {
+                "intent": result.get("intent", "unknown"),
+                "slots": merge_slots(result.get("slots", {}), local_slots),
+                "confidence": result.get("confidence", "medium")
+            }
+
+        except RateLimitError:
+            raise
+        except Exception as e:
+            print(f"Erreur lors de la détection d'intention: {e}")
+            return {
+                "intent": "unknown",
+                "slots": local_slots,
+                "confidence": "low"
+            }
+
+    def run_joint(self, message: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Analyse conjointe : intention, slots et émotion en un seul appel au LLM.
+
+        Args:
+            message (str): Le message à analyser
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, str]]: Le résultat d'intention (même format
+            que run) et le résultat d'émotion (même format que detect_emotion)
+        """
+        try:
+            response = self._get_llm_response(self._build_joint_prompt(message))
+            intent_result, emotion = self._parse_joint_response(response)
+            intent_result["slots"] = merge_slots(intent_result["slots"], self._extract_local_slots(message))
+            return intent_result, emotion
+        except RateLimitError:
+            raise
+        except Exception as e:
+            print(f"Erreur lors de l'analyse conjointe: {e}")
+            return self._joint_fallback()
+
+    async def run_joint_async(self, message: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Version asynchrone de run_joint.
+
+        Args:
+            message (str): Le message à analyser
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, str]]: Résultats d'intention et d'émotion
+        """
+        try:
+            response = await self._get_llm_response_async(self._build_joint_prompt(message))
+            intent_result, emotion = self._parse_joint_response(response)
+            intent_result["slots"] = merge_slots(intent_result["slots"], self._extract_local_slots(message))
+            return intent_result, emotion
+        except RateLimitError:
+            raise
+        except Exception as e:
+            print(f"Erreur lors de l'analyse conjointe: {e}")
+            return self._joint_fallback()
+
+    def _extract_local_slots(self, message: str) -> Dict[str, str]:
+        """Slots trouvés par l'extracteur local (gazetteer), vide s'il est désactivé."""
+        if self._slot_extractor is None:
+            return {}
+        try:
+            return self._slot_extractor.extract(message)
+        except Exception as e:
+            print(f"Erreur de l'extraction locale des slots: {e}")
+            return {}
+
+    def _classify_locally(self, message: str, local_slots: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Détecte l'intention avec le classifieur local.
+        Sont tranchées localement les intentions sans slots (intent.classifier.local_intents)
+        et les intentions de intent.classifier.slot_intents dont tous les slots requis
+        ont été trouvés par l'extracteur local ; les autres passent par le LLM.
+
+        Args:
+            message (str): Le message à analyser
+            local_slots (Optional[Dict[str, str]]): Slots extraits localement
+
+        Returns:
+            Optional[Dict[str, Any]]: Le résultat au format de run, ou None pour passer au LLM
+        """
+        local_slots = local_slots or {}
+        if self._classifier is None:
+            return None
+        try:
+            intent, probability = self._classifier.predict(message)
+        except Exception as e:
+            print(f"Erreur du classifieur d'intentions local: {e}")
+            return None
+        if not self._threshold_agent.check_threshold(probability, "intent_classifier"):
+            return None
+        classifier_config = self._intent_config.get("classifier", {})
+        if intent not in classifier_config.get("local_intents", ()):
+            # Intentions à slots tranchées localement si les slots requis sont trouvés localement
+            required_slots = classifier_config.get("slot_intents", {}).get(intent)
+            if required_slots is None or any(not local_slots.get(slot) for slot in required_slots):
+                return None
+        return {
+            "intent": intent,
+            "slots": local_slots,
+            "confidence": "high" if probability >= 0.9 else "medium"
+        }
+
     def _build_prompt(self, message: str) -> List[Dict[str, str]]:
         """
         Construit le prompt pour l'analyse d'intention et de slots.
@@ -95,6 +247,45 @@ Important :
 - Les slots doivent être pertinents au contexte
 - Utilisez des valeurs vides ("") pour les slots non détectés
 - La confiance doit refléter votre certitude dans l'analyse
+"""
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Message à analyser : {message}"}
+        ]
+
+    def _build_joint_prompt(self, message: str) -> List[Dict[str, str]]:
+        """
+        Construit le prompt de l'analyse conjointe (intention, slots et émotion).
+
+        Args:
+            message (str): Le message à analyser
+
+        Returns:
+            List[Dict[str, str]]: Prompt formaté
+        """
+        system_prompt = """Vous êtes un expert en analyse du langage naturel et en analyse émotionnelle. Analysez le message utilisateur et extrayez en une seule fois :
+1. L'intention principale de l'utilisateur
+2. Les informations pertinentes (slots) mentionnées dans le message
+3. L'émotion principale exprimée
+
+Répondez uniquement au format JSON suivant :
+{
+    "intent": "intention principale en minuscules",
+    "confidence": "high/medium/low",
+    "slots": {
+        "slot1": "valeur1",
+        ...
+    },
+    "emotion": "émotion principale en un mot français, en minuscules",
+    "emotion_confidence": "high/medium/low"
+}
+
+Exemples de slots possibles (mais non limités) : location, date, price, type, preferences, quantity, time, person.
+
+Important :
+- L'intention doit être un mot simple et clair
+- Utilisez des valeurs vides ("") pour les slots non détectés
+- Les confiances doivent refléter votre certitude dans l'analyse
 """
         return [
             {"role": "system", "content": system_prompt},
@@ -112,29 +303,33 @@ Important :
             str: Réponse du LLM
         """
         try:
-            headers = {
-                "Authorization": f"Bearer {self._api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": "mistral-tiny",
-                "messages": prompt,
-                "temperature": self._model_config["temperature"],
-                "max_tokens": self._model_config["max_tokens"]
-            }
-            
-            response = requests.post(
-                f"{self._api_url}/chat/completions",
-                headers=headers,
-                json=data
-            )
+            return self._llm.complete(prompt)
+                
+        except RateLimitError:
+            raise
+        except Exception as e:
+            print(f"Erreur lors de l'appel à l'API Mistral: {e}")
+            return json.dumps({
+                "intent": "unknown",
+                "confidence": "low",
+                "slots": {}
+            })
+
+    async def _get_llm_response_async(self, prompt: List[Dict[str, str]]) -> str:
+        """
+        Version asynchrone de _get_llm_response (client HTTP non bloquant).
+        
+        Args:
+            prompt (List[Dict[str, str]]): Le prompt à envoyer au LLM
             
-            if response.status_code == 200:
-                return response.json()["choices"][0]["message"]["content"]
-            else:
-                raise Exception(f"Erreur API Mistral: {response.status_code}")
+        Returns:
+            str: La réponse du LLM
+        """
+        try:
+            return await self._llm.complete_async(prompt)
                 
+        except RateLimitError:
+            raise
         except Exception as e:
             print(f"Erreur lors de l'appel à l'API Mistral: {e}")
             return json.dumps({
@@ -188,4 +383,47 @@ Important :
                 "intent": intent,
                 "confidence": "medium",
                 "slots": slots
-            }
\ No newline at end of file
+            }
+
+    def _parse_joint_response(self, response: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Parse la réponse de l'analyse conjointe vers les formats de run et de
+        EmotionDetectionAgent.detect_emotion.
+
+        Args:
+            response (str): Réponse du LLM
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, str]]: Résultats d'intention et d'émotion
+        """
+        intent_result = self._parse_response(response)
+        intent_result["slots"].pop("emotion", None)
+        intent_result["slots"].pop("emotion_confidence", None)
+
+        try:
+            result = json.loads(response)
+            emotion = result.get("emotion") or "neutre"
+            emotion_confidence = result.get("emotion_confidence", "medium")
+        except (json.JSONDecodeError, AttributeError):
+            emotion_match = re.search(r'"emotion"\s*:\s*"([^"]+)"', response)
+            emotion = emotion_match.group(1) if emotion_match else "neutre"
+            emotion_confidence = "medium" if emotion_match else "low"
+
+        return (
+            {
+                "intent": intent_result.get("intent", "unknown"),
+                "slots": intent_result.get("slots", {}),
+                "confidence": intent_result.get("confidence", "medium")
+            },
+            {
+                "emotion": emotion.lower().strip(),
+                "confidence": emotion_confidence
+            }
+        )
+
+    def _joint_fallback(self) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Résultats par défaut de l'analyse conjointe en cas d'erreur."""
+        return (
+            {"intent": "unknown", "slots": {}, "confidence": "low"},
+            {"emotion": "neutre", "confidence": "low"}
+        )
@@ -0,0 +1,351 @@
+# llm_client.py
+"""
+Client HTTP partagé par tous les agents.
+
+- HTTPTransport : sessions poolées (requests.Session en synchrone, aiohttp en
+  asynchrone) avec connexions keep-alive, timeouts, retries et métriques.
+- LLMClient : appels /chat/completions de l'API Mistral au-dessus du transport.
+- CachedLLMClient : LLMClient précédé du cache de réponses "llm" (cache exact,
+  activable agent par agent dans la section "cache" de config.json).
+
+Les instances sont partagées au niveau du processus : get_llm_client et
+get_http_transport renvoient toujours le même objet pour une configuration donnée.
+"""
+import asyncio
+import json
+import threading
+import time
+import weakref
+from typing import Dict, Any, List, Optional, Tuple
+
+from .cache import TTLCache, get_cache, make_cache_key
+
+DEFAULT_MODEL = "mistral-tiny"
+
+
+class LLMAPIError(Exception):
+    """Erreur renvoyée par l'API Mistral (le code HTTP est conservé dans le message)."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Erreur API Mistral: {status_code}")
+        self.status_code = status_code
+
+
+class RateLimitError(LLMAPIError):
+    """
+    Quota d'une API dépassé (HTTP 429). Contrairement aux autres erreurs, les agents
+    ne la remplacent pas par un résultat de secours : l'orchestrateur réessaie
+    l'étape concernée après une attente.
+    """
+
+    def __init__(self, service: str = "mistral"):
+        super().__init__(429)
+        self.service = service
+        self.args = (f"Erreur API {service}: 429 (rate limit)",)
+
+
+class HTTPTransport:
+    """
+    Transport HTTP poolé, partagé par les agents.
+    Un seul endroit pour la taille des pools, les timeouts, les retries et les métriques.
+    """
+
+    def __init__(self, http_config: Optional[Dict[str, Any]] = None):
+        http_config = http_config or {}
+        self._pool_size = http_config.get("pool_size", 20)
+        self._connect_timeout = http_config.get("connect_timeout", 5)
+        self._read_timeout = http_config.get("read_timeout", 60)
+        self._max_retries = http_config.get("max_retries", 2)
+        self._retry_statuses = tuple(http_config.get("retry_statuses", [502, 503, 504]))
+        self._backoff_factor = http_config.get("backoff_factor", 0.5)
+        self._max_concurrent = http_config.get("max_concurrent_requests", 64)
+
+        # Imports différés : requests et urllib3 ne sont chargés qu'à la création du transport
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # Session synchrone : connexions keep-alive réutilisées entre threads
+        retry = Retry(
+            total=self._max_retries,
+            connect=self._max_retries,
+            read=0,
+            status=self._max_retries,
+            status_forcelist=self._retry_statuses,
+            allowed_methods=frozenset(["POST"]),
+            backoff_factor=self._backoff_factor,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self._pool_size, max_retries=retry)
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._request_errors = requests.RequestException
+
+        # Sessions asynchrones : une par boucle d'événements, avec le sémaphore
+        # qui borne le nombre d'appels sortants simultanés
+        self._async_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+
+        self._metrics_lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+
+    def post_json(self, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None,
+                  timeout: Optional[float] = None, service: str = "http") -> Tuple[int, Any]:
+        """
+        Envoie une requête POST JSON via la session poolée.
+
+        Returns:
+            Tuple[int, Any]: Le code HTTP et le corps JSON de la réponse (None si erreur)
+        """
+        start = time.perf_counter()
+        try:
+            response = self._session.post(
+                url,
+                json=payload,
+                headers=headers,
+                timeout=(self._connect_timeout, timeout or self._read_timeout)
+            )
+        except self._request_errors:
+            self._record(service, None, time.perf_counter() - start)
+            raise
+        body = response.json() if response.status_code == 200 else None
+        self._record(service, response.status_code, time.perf_counter() - start, body)
+        return response.status_code, body
+
+    async def post_json_async(self, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None,
+                              timeout: Optional[float] = None, service: str = "http") -> Tuple[int, Any]:
+        """
+        Version asynchrone de post_json. Au-delà de http.max_concurrent_requests
+        appels simultanés, les appels attendent leur tour sur le sémaphore.
+        """
+        import aiohttp
+
+        session, semaphore = self._get_async_session()
+        client_timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=self._connect_timeout,
+            sock_read=timeout or self._read_timeout
+        )
+        async with semaphore:
+            for attempt in range(self._max_retries + 1):
+                start = time.perf_counter()
+                last_attempt = attempt == self._max_retries
+                try:
+                    async with session.post(url, json=payload, headers=headers, timeout=client_timeout) as response:
+                        status = response.status
+                        body = await response.json(content_type=None) if status == 200 else None
+                except aiohttp.ClientConnectionError:
+                    self._record(service, None, time.perf_counter() - start)
+                    if last_attempt:
+                        raise
+                else:
+                    self._record(service, status, time.perf_counter() - start, body)
+                    if status not in self._retry_statuses or last_attempt:
+                        return status, body
+                await asyncio.sleep(self._backoff_factor * (2 ** attempt))
+
+    def _get_async_session(self) -> tuple:
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        entry = self._async_sessions.get(loop)
+        if entry is None or entry[0].closed:
+            entry = (
+                aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self._max_concurrent)),
+                asyncio.Semaphore(self._max_concurrent)
+            )
+            self._async_sessions[loop] = entry
+        return entry
+
+    def _record(self, service: str, status: Optional[int], elapsed: float, body: Any = None) -> None:
+        """Met à jour les métriques d'un service (latence, codes HTTP, tokens consommés)."""
+        with self._metrics_lock:
+            metrics = self._metrics.setdefault(service, {
+                "requests": 0,
+                "errors": 0,
+                "status": {},
+                "latency_total": 0.0,
+                "latency_max": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0
+            })
+            metrics["requests"] += 1
+            metrics["latency_total"] += elapsed
+            metrics["latency_max"] = max(metrics["latency_max"], elapsed)
+            key = str(status) if status is not None else "connection_error"
+            metrics["status"][key] = metrics["status"].get(key, 0) + 1
+            if status != 200:
+                metrics["errors"] += 1
+            usage = body.get("usage") if isinstance(body, dict) else None
+            if usage:
+                metrics["prompt_tokens"] += usage.get("prompt_tokens", 0)
+                metrics["completion_tokens"] += usage.get("completion_tokens", 0)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Retourne une copie des métriques par service, avec la latence moyenne."""
+        with self._metrics_lock:
+            snapshot = {}
+            for service, metrics in self._metrics.items():
+                snapshot[service] = dict(metrics, status=dict(metrics["status"]))
+                snapshot[service]["latency_avg"] = metrics["latency_total"] / metrics["requests"]
+            return snapshot
+
+
+class LLMClient:
+    """Client de l'API Mistral (chat/completions) au-dessus du transport partagé."""
+
+    def __init__(self, model_config: Dict[str, Any], transport: HTTPTransport):
+        self._model_config = model_config
+        self._transport = transport
+        self._url = f"{model_config['api_url']}/chat/completions"
+        self._headers = {
+            "Authorization": f"Bearer {model_config['api_key']}",
+            "Content-Type": "application/json"
+        }
+
+    def _build_payload(self, messages: List[Dict[str, str]], temperature: Optional[float],
+                       max_tokens: Optional[int]) -> Dict[str, Any]:
+        return {
+            "model": DEFAULT_MODEL,
+            "messages": messages,
+            "temperature": self._model_config["temperature"] if temperature is None else temperature,
+            "max_tokens": self._model_config["max_tokens"] if max_tokens is None else max_tokens
+        }
+
+    def cache_key(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                  max_tokens: Optional[int] = None) -> str:
+        """Clé de cache d'un appel : hash du modèle, des paramètres et de tous les messages."""
+        payload = self._build_payload(messages, temperature, max_tokens)
+        return make_cache_key(payload["model"], payload["temperature"], payload["max_tokens"], messages)
+
+    def complete(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None) -> str:
+        """
+        Envoie une conversation à l'API Mistral et retourne le contenu de la réponse.
+
+        Raises:
+            RateLimitError: si l'API répond 429 (quota dépassé)
+            LLMAPIError: si l'API répond avec un autre code différent de 200
+        """
+        status, body = self._transport.post_json(
+            self._url,
+            self._build_payload(messages, temperature, max_tokens),
+            headers=self._headers,
+            service="mistral"
+        )
+        if status == 429:
+            raise RateLimitError()
+        if status != 200:
+            raise LLMAPIError(status)
+        return body["choices"][0]["message"]["content"]
+
+    async def complete_async(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                             max_tokens: Optional[int] = None) -> str:
+        """Version asynchrone de complete."""
+        status, body = await self._transport.post_json_async(
+            self._url,
+            self._build_payload(messages, temperature, max_tokens),
+            headers=self._headers,
+            service="mistral"
+        )
+        if status == 429:
+            raise RateLimitError()
+        if status != 200:
+            raise LLMAPIError(status)
+        return body["choices"][0]["message"]["content"]
+
+
+class CachedLLMClient:
+    """
+    LLMClient précédé d'un cache exact : deux appels avec le même modèle, les mêmes
+    paramètres et les mêmes messages ne sollicitent l'API qu'une fois (tant que
+    l'entrée n'a pas expiré). Les erreurs ne sont jamais mises en cache.
+    """
+
+    def __init__(self, client: LLMClient, cache: TTLCache):
+        self._client = client
+        self._cache = cache
+
+    def complete(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None) -> str:
+        """Version mise en cache de LLMClient.complete."""
+        key = self._client.cache_key(messages, temperature, max_tokens)
+        content = self._cache.get(key)
+        if content is None:
+            content = self._client.complete(messages, temperature, max_tokens)
+            self._cache.set(key, content)
+        return content
+
+    async def complete_async(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                             max_tokens: Optional[int] = None) -> str:
+        """Version mise en cache de LLMClient.complete_async (niveau disque lu hors de la boucle)."""
+        key = self._client.cache_key(messages, temperature, max_tokens)
+        content = await self._cache.get_async(key)
+        if content is None:
+            content = await self._client.complete_async(messages, temperature, max_tokens)
+            await self._cache.set_async(key, content)
+        return content
+
+
+_registry_lock = threading.Lock()
+_transports: Dict[str, HTTPTransport] = {}
+_llm_clients: Dict[str, LLMClient] = {}
+
+
+def get_http_transport(config: Dict[str, Any]) -> HTTPTransport:
+    """Retourne le transport partagé correspondant à la section "http" de la configuration."""
+    http_config = config.get("http", {})
+    key = json.dumps(http_config, sort_keys=True)
+    with _registry_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = HTTPTransport(http_config)
+            _transports[key] = transport
+        return transport
+
+
+def get_llm_client(config: Dict[str, Any], agent: Optional[str] = None) -> LLMClient:
+    """
+    Retourne le client Mistral partagé correspondant aux sections "model" et "http".
+
+    Args:
+        config (Dict[str, Any]): La configuration chargée depuis config.json
+        agent (Optional[str]): Nom de l'agent appelant ; si le cache "llm" est activé
+            pour cet agent (cache.llm.agents), le client retourné passe par le cache
+
+    Returns:
+        LLMClient: Le client partagé, éventuellement enveloppé dans un CachedLLMClient
+    """
+    key = json.dumps([config["model"], config.get("http", {})], sort_keys=True)
+    with _registry_lock:
+        client = _llm_clients.get(key)
+    if client is None:
+        transport = get_http_transport(config)
+        with _registry_lock:
+            client = _llm_clients.setdefault(key, LLMClient(config["model"], transport))
+
+    cache_config = config.get("cache", {}).get("llm", {})
+    if agent and cache_config.get("enabled", False) and cache_config.get("agents", {}).get(agent, False):
+        return CachedLLMClient(client, get_cache("llm", cache_config))
+    return client
+
+
+def get_http_metrics() -> Dict[str, Dict[str, Any]]:
+    """Agrège les métriques de tous les transports du processus."""
+    with _registry_lock:
+        transports = list(_transports.values())
+    merged: Dict[str, Dict[str, Any]] = {}
+    for transport in transports:
+        for service, metrics in transport.get_metrics().items():
+            merged[service] = metrics if service not in merged else _merge_metrics(merged[service], metrics)
+    return merged
+
+
+def _merge_metrics(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    merged = {key: a[key] + b[key] for key in ("requests", "errors", "latency_total", "prompt_tokens", "completion_tokens")}
+    merged["latency_max"] = max(a["latency_max"], b["latency_max"])
+    merged["latency_avg"] = merged["latency_total"] / merged["requests"]
+    merged["status"] = dict(a["status"])
+    for code, count in b["status"].items():
+        merged["status"][code] = merged["status"].get(code, 0) + count
+    return merged
@@ -1,51 +1,243 @@
 from .base_agent import BaseAgent
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import sys
 import os
-import chromadb
-from datetime import datetime
 import json
-import requests
 import uuid
 import hashlib
 import logging
+import threading
+import time
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import make_cache_key
+from .conversation_schema import (
+    DEFAULT_SESSION_ID, SCHEMA_VERSION, build_metadata, build_where, format_timestamp,
+    slots_from_metadata, turn_timestamp, upgrade_metadata
+)
+from .embeddings import get_embedder
+from .partitions import get_partitioned_store
+from .short_term_memory import Message, SharedShortTermMemory, ShortTermMemory
+from .state_backend import get_state_backend
+from .write_behind import DEFAULT_FLUSH_INTERVAL, DEFAULT_MAX_BATCH, WriteBehindQueue
 
 # Ajouter le répertoire parent au chemin Python
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Lecture des échanges récents par fenêtres de temps (voir MemoryAgent._recent_turns) :
+# largeur initiale et largeur minimale (s)
+RECENT_TURNS_WINDOW = 3600.0
+MIN_TURNS_WINDOW = 1.0
+
+
+def _new_semantic_stats() -> Dict[str, Any]:
+    """Compteurs initiaux du cache sémantique."""
+    return {
+        "lookups": 0,
+        "hits": 0,
+        "misses": 0,
+        "errors": 0,
+        "stores": 0,
+        "lookup_latency_total": 0.0,
+        "lookup_latency_max": 0.0
+    }
+
+
+def _summarize_semantic_stats(stats: Dict[str, Any], enabled: bool) -> Dict[str, Any]:
+    """Ajoute aux compteurs du cache sémantique le taux de succès et la latence moyenne."""
+    stats["enabled"] = enabled
+    stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+    stats["lookup_latency_avg"] = stats["lookup_latency_total"] / stats["lookups"] if stats["lookups"] else 0.0
+    return stats
+
+
+class _SharedResources:
+    """
+    Ressources d'une base ChromaDB communes aux agents de mémoire de toutes les
+    sessions : un agent par session ne coûte que sa fenêtre de messages.
+    """
+
+    def __init__(self, persist_directory: str, memory_config: Dict[str, Any], semantic_config: Dict[str, Any],
+                 state=None):
+        """
+        Args:
+            persist_directory (str): Répertoire de la base ChromaDB
+            memory_config (Dict[str, Any]): Section memory de config.json (lue à la construction)
+            semantic_config (Dict[str, Any]): Section cache.semantic (collection ouverte si "enabled")
+            state (StateBackend, optional): État partagé des workers (maintenance des partitions)
+        """
+        self.persist_directory = persist_directory
+        # Import différé : chromadb n'est chargé qu'à la construction du premier agent
+        import chromadb
+        logging.getLogger('chromadb').setLevel(logging.WARNING)
+        self.client = chromadb.PersistentClient(path=persist_directory)
+        # Les vecteurs des échanges sont calculés ici (backend memory.embedding, par lots et mémorisés)
+        # puis fournis à ChromaDB
+        self.embedder = get_embedder(memory_config.get("embedding", {}))
+        # Collection des échanges (préfixe des partitions) : une par espace de vecteurs, les
+        # dimensions des backends n'étant pas compatibles ("conversations" pour le modèle par défaut)
+        collection_name = "conversations"
+        if self.embedder.name != "default":
+            collection_name = f"conversations_{self.embedder.name}"
+        # Échanges partitionnés par semaine (memory.partitions) ; expiration et compactage en tâche de fond
+        partitions_config = memory_config.get("partitions", {})
+        self.store = get_partitioned_store(
+            self.client, persist_directory, collection_name, partitions_config.get("enabled", False), state
+        )
+
+        # Cache sémantique : seconde collection de réponses déjà générées, commune à toutes les sessions
+        self.semantic_cache = None
+        maintenance_tasks = []
+        if semantic_config.get("enabled", False):
+            self.semantic_cache = self.client.get_or_create_collection(
+                name="semantic_cache",
+                metadata={"hnsw:space": "cosine"}
+            )
+            # Les réponses expirées ne sont qu'ignorées à la lecture : la maintenance les supprime
+            maintenance_tasks.append(functools.partial(
+                purge_expired_responses, self.semantic_cache, semantic_config.get("ttl", 86400)
+            ))
+
+        if self.store.enabled or maintenance_tasks:
+            self.store.start_maintenance(
+                persist_directory,
+                partitions_config.get("retention_weeks") if self.store.enabled else None,
+                partitions_config.get("compaction_interval", 86400),
+                maintenance_tasks
+            )
+        self.semantic_lock = threading.Lock()
+        self.semantic_stats = _new_semantic_stats()
+
+        # Écriture différée : les échanges terminés sont ajoutés à ChromaDB par lots, hors du chemin de la requête
+        write_behind_config = memory_config.get("write_behind", {})
+        self.write_queue = None
+        if write_behind_config.get("enabled", False):
+            self.write_queue = WriteBehindQueue(
+                "conversations",
+                functools.partial(self.store.upsert, embed=self.embedder.embed),
+                max_batch=write_behind_config.get("max_batch", DEFAULT_MAX_BATCH),
+                flush_interval=write_behind_config.get("flush_interval", DEFAULT_FLUSH_INTERVAL)
+            )
+
+        # Résumés glissants des sessions (un seul à la fois par session, voir _schedule_summary)
+        self.summary_executor = ThreadPoolExecutor(
+            max_workers=memory_config.get("summary_workers", 2), thread_name_prefix="memory-summary"
+        )
+
+
+def purge_expired_responses(collection, ttl: float, now: Optional[float] = None) -> int:
+    """
+    Supprime du cache sémantique les réponses enregistrées il y a plus de `ttl` secondes.
+
+    Returns:
+        int: Nombre de réponses supprimées
+    """
+    horizon = (now if now is not None else time.time()) - ttl
+    expired = collection.get(where={"created_at": {"$lt": horizon}}, include=[])["ids"]
+    if expired:
+        collection.delete(ids=expired)
+    return len(expired)
+
+
+_shared_lock = threading.Lock()
+_shared: Dict[tuple, _SharedResources] = {}
+
+
+def _shared_location(config: Dict[str, Any]) -> Tuple[str, tuple]:
+    """Répertoire de la base ChromaDB décrite par la configuration et clé de ses ressources partagées."""
+    memory_config = config.get("memory", {})
+    # Créer le chemin absolu pour ChromaDB dans tourism_agent_system
+    # (surchargeable via memory.persist_directory dans config.json)
+    base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    persist_directory = memory_config.get("persist_directory") or os.path.join(
+        base_path, "tourism_agent_system", "chroma_db"
+    )
+    return persist_directory, (os.path.abspath(persist_directory), make_cache_key(memory_config.get("embedding", {})))
+
+
+def _get_shared_resources(config: Dict[str, Any]) -> _SharedResources:
+    """Retourne les ressources partagées de la base ChromaDB décrite par la configuration."""
+    memory_config = config.get("memory", {})
+    persist_directory, key = _shared_location(config)
+    with _shared_lock:
+        shared = _shared.get(key)
+        if shared is None:
+            os.makedirs(persist_directory, exist_ok=True)
+            shared = _SharedResources(
+                persist_directory, memory_config, config.get("cache", {}).get("semantic", {}),
+                get_state_backend(config)
+            )
+            _shared[key] = shared
+        return shared
+
+
+def get_semantic_cache_stats(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compteurs du cache sémantique de la base décrite par la configuration, communs à
+    toutes les sessions. Ne construit ni agent de mémoire ni client ChromaDB : avant
+    le premier agent, les compteurs sont nuls.
+    """
+    with _shared_lock:
+        shared = _shared.get(_shared_location(config)[1])
+    if shared is None:
+        enabled = config.get("cache", {}).get("semantic", {}).get("enabled", False)
+        return _summarize_semantic_stats(_new_semantic_stats(), enabled)
+    with shared.semantic_lock:
+        stats = dict(shared.semantic_stats)
+    return _summarize_semantic_stats(stats, shared.semantic_cache is not None)
+
+
+# Slots suivis pour une session (valeurs non vides des échanges précédents)
+DEFAULT_SLOTS = {
+    "location": "",
+    "food_type": "",
+    "budget": "",
+    "time": "",
+}
+
+
 class MemoryAgent(BaseAgent):
     """
     Agent qui gère la mémoire des messages avec le chat.
     """
     
-    def __init__(self, name: str = "memory"):
+    def __init__(self, name: str = "memory", session_id: str = DEFAULT_SESSION_ID):
         super().__init__(name)
+        self._session_id = session_id
         self._model_config = self._config["model"]
-        self._api_key = self._model_config["api_key"]
-        self._api_url = self._model_config["api_url"]
-        self._messages = []
-        self._current_slots = {
-            "location": "",
-            "food_type": "",
-            "budget": "",
-            "time": "",
-        }
+        # Fenêtre, résumé et slots de la session : dans le processus, ou dans le backend
+        # d'état partagé entre workers (section "state")
+        self._state = get_state_backend(self._config)
+        self._state_namespace = f"session:{session_id}"
+        self._current_slots = dict(DEFAULT_SLOTS)
         
-        # Créer le chemin absolu pour ChromaDB dans tourism_agent_system
-        base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        chroma_db_path = os.path.join(base_path, "tourism_agent_system", "chroma_db")
-        os.makedirs(chroma_db_path, exist_ok=True)
-            
-        # Initialiser ChromaDB avec le chemin absolu et désactiver les logs
-        logging.getLogger('chromadb').setLevel(logging.WARNING)
-        self._chroma_client = chromadb.PersistentClient(path=chroma_db_path)
-        self._collection = self._chroma_client.get_or_create_collection(
-            name="conversations",
-            metadata={"hnsw:space": "cosine"}
-        )
+        # Client ChromaDB, embedder, partitions, cache sémantique et écriture différée
+        # sont communs à toutes les sessions (voir _get_shared_resources)
+        shared = _get_shared_resources(self._config)
+        self._persist_directory = shared.persist_directory
+        self._chroma_client = shared.client
+        self._embedder = shared.embedder
+        self._store = shared.store
+        self._semantic_cache = shared.semantic_cache
+        self._semantic_lock = shared.semantic_lock
+        self._semantic_stats = shared.semantic_stats
+        self._write_queue = shared.write_queue
+        self._summary_executor = shared.summary_executor
         
         # Initialiser les attributs
-        self._messages = []
+        # Mémoire à court terme : les history_window derniers échanges (taille fixée au démarrage),
+        # les messages sortis de la fenêtre sont résumés en tâche de fond
+        history_window = self._history_window
+        capacity = 2 * history_window if history_window else None
+        if self._state.shared:
+            self._short_term = SharedShortTermMemory(self._state, self._state_namespace, capacity)
+        else:
+            self._short_term = ShortTermMemory(capacity)
+        self._summary_lock = threading.Lock()
+        self._summary_running = False
+        # Protège la fenêtre et l'échange en cours (add_message) contre les requêtes concurrentes
+        self._turn_lock = threading.Lock()
         self._current_conversation = {
             "user_message": None,
             "ai_message": None,
@@ -55,58 +247,201 @@ class MemoryAgent(BaseAgent):
         }
         self._load_messages_from_chromadb()
         
+    @property
+    def persist_directory(self) -> str:
+        """Répertoire de la base ChromaDB."""
+        return self._persist_directory
+
+    @property
+    def session_id(self) -> str:
+        """Session dont l'agent garde la mémoire."""
+        return self._session_id
+
+    @property
+    def _history_window(self) -> Optional[int]:
+        """Nombre d'échanges récents gardés en mémoire vive (None : tout l'historique)."""
+        return self._config.get("memory", {}).get("history_window", 20)
+
+    def _fetch_turns(self, skip: int, limit: Optional[int]) -> List[Dict[str, Any]]:
+        """
+        Lit une page d'échanges de la session en partant des plus récents.
+        ChromaDB ne trie pas : les partitions sont parcourues de la plus récente à la
+        plus ancienne et, dans chacune, les échanges sont sélectionnés par fenêtres de
+        temps successives (filtre "ts" borné et `limit`) en remontant le temps, jusqu'à
+        en avoir skip + limit. Le résultat est trié sur "ts".
+        
+        Args:
+            skip (int): Nombre d'échanges récents à sauter
+            limit (int, optional): Taille de la page (None : jusqu'au plus ancien)
+            
+        Returns:
+            List[Dict[str, Any]]: Métadonnées des échanges, du plus ancien au plus récent
+        """
+        needed = None if limit is None else skip + limit
+        metadatas = []
+        for partition in self._store.partitions():
+            metadatas.extend(self._recent_turns(
+                self._store.collection(partition.name), partition.start, partition.end,
+                None if needed is None else needed - len(metadatas)
+            ))
+            if needed is not None and len(metadatas) >= needed:
+                break
+        metadatas.sort(key=turn_timestamp, reverse=True)
+        page = metadatas[skip:] if limit is None else metadatas[skip:skip + limit]
+        page.reverse()
+        return page
+
+    def _recent_turns(self, collection, start: Optional[float], end: Optional[float],
+                      needed: Optional[int]) -> List[Dict[str, Any]]:
+        """
+        Échanges de la session dans une partition, des plus récents aux plus anciens,
+        par fenêtres de temps : une fenêtre qui atteint memory.page_size échanges est
+        réduite de moitié, une fenêtre peu remplie est doublée ; après une fenêtre vide,
+        une lecture d'un seul échange antérieur indique s'il faut continuer et jusqu'où.
+        
+        Args:
+            collection: Collection de la partition
+            start (float, optional): Début de la partition (None : inconnu)
+            end (float, optional): Fin de la partition (None : maintenant)
+            needed (int, optional): Nombre d'échanges souhaités (None : tous)
+            
+        Returns:
+            List[Dict[str, Any]]: Métadonnées lues (au moins `needed` s'il y en a assez)
+        """
+        page_size = self._config.get("memory", {}).get("page_size", 1000)
+        found = []
+        upper = end if end is not None else time.time() + 1.0
+        span = RECENT_TURNS_WINDOW
+        while needed is None or len(found) < needed:
+            lower = upper - span if start is None else max(start, upper - span)
+            results = collection.get(
+                where=build_where(session_id=self._session_id, since=lower, until=upper),
+                limit=page_size, include=["metadatas"]
+            )
+            batch = [metadata for metadata in results.get("metadatas") or [] if metadata]
+            if len(batch) >= page_size and upper - lower > MIN_TURNS_WINDOW:
+                span = (upper - lower) / 2
+                continue
+            found.extend(batch)
+            if start is not None and lower <= start:
+                break
+            if batch:
+                span = span * 2 if len(batch) < page_size // 4 else span
+            else:
+                older = collection.get(
+                    where=build_where(session_id=self._session_id, until=lower), limit=1, include=["metadatas"]
+                ).get("metadatas") or []
+                if not older:
+                    break
+                # Fenêtre suivante : jusqu'à l'échange antérieur trouvé, au moins
+                span = max(span * 2, lower - turn_timestamp(older[0]) + MIN_TURNS_WINDOW)
+            upper = lower
+        return found
+
+    def _iter_metadata_pages(self, collection, start: int, end: int):
+        """
+        Parcourt les métadonnées des documents [start, end) d'une partition par pages de
+        memory.page_size (une lecture sans limite échoue au-delà de quelques dizaines de
+        milliers de documents).
+        """
+        page_size = self._config.get("memory", {}).get("page_size", 1000)
+        for offset in range(start, end, page_size):
+            results = collection.get(limit=min(page_size, end - offset), offset=offset, include=["metadatas"])
+            yield [metadata for metadata in results.get("metadatas") or [] if metadata]
+
+    @staticmethod
+    def _turn_to_messages(metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convertit les métadonnées d'un échange en messages utilisateur / assistant."""
+        if "user_message" not in metadata or "ai_message" not in metadata:
+            return []
+        message = {
+            "role": "assistant",
+            "content": metadata["ai_message"]
+        }
+        if "emotion" in metadata:
+            message["emotion"] = metadata["emotion"]
+        if "intent" in metadata:
+            message["intent"] = metadata["intent"]
+        return [{"role": "user", "content": metadata["user_message"]}, message]
+
     def _load_messages_from_chromadb(self) -> None:
         """
-        Charge les messages depuis ChromaDB.
+        Charge les derniers échanges de la session depuis ChromaDB (fenêtre memory.history_window).
+        Les échanges plus anciens restent dans la collection et sont lus à la
+        demande via get_history. Avec un backend d'état partagé, la fenêtre déjà
+        ouverte par un autre worker est reprise telle quelle.
         """
+        if self._state.shared and len(self._short_term):
+            return
         try:
-            # Récupérer tous les documents
-            results = self._collection.get()
-            
-            if not results or "metadatas" not in results:
-                return
+            # Échanges de la session encore en attente d'écriture (session évincée puis rouverte)
+            self.flush()
+            metadatas = self._fetch_turns(0, self._history_window)
             
             # Parcourir les métadonnées pour charger les messages et les slots
-            for i, metadata in enumerate(results["metadatas"]):
+            messages = []
+            slots = {}
+            for i, metadata in enumerate(metadatas):
                 try:
-                    # Charger les slots si présents
-                    if "slots" in metadata and metadata["slots"]:
-                        try:
-                            slots = json.loads(metadata["slots"])
-                            
-                            # Mettre à jour les slots actuels avec les nouvelles valeurs non-nulles
-                            for key, value in slots.items():
-                                if value is not None:
-                                    self._current_slots[key] = value
-                        except json.JSONDecodeError:
-                            continue
+                    # Mettre à jour les slots actuels avec les valeurs non-nulles de l'échange
+                    slots.update(slots_from_metadata(metadata))
 
                     # Charger le message
-                    if "user_message" in metadata and "ai_message" in metadata:
-                        message = {
-                            "role": "user",
-                            "content": metadata["user_message"]
-                        }
-                        self._messages.append(message)
-
-                        message = {
-                            "role": "assistant",
-                            "content": metadata["ai_message"]
-                        }
-                        if "emotion" in metadata:
-                            message["emotion"] = metadata["emotion"]
-                        if "intent" in metadata:
-                            message["intent"] = metadata["intent"]
-                        self._messages.append(message)
+                    messages.extend(Message(**message) for message in self._turn_to_messages(metadata))
 
                 except Exception as e:
                     print(f"Erreur lors du chargement du message {i+1}: {e}")
                     continue
+            self._short_term.load(messages)
+            self._update_slots(slots)
 
         except Exception as e:
             print(f"Erreur lors du chargement des messages depuis ChromaDB: {e}")
+
+    def _update_slots(self, slots: Optional[Dict[str, Any]]) -> None:
+        """Retient les valeurs non vides des slots d'un échange."""
+        values = {k: v for k, v in (slots or {}).items() if v}
+        if not values:
+            return
+        if self._state.shared:
+            self._state.merge(f"{self._state_namespace}:slots", values)
+        else:
+            with self._turn_lock:
+                self._current_slots.update(values)
+
+    def get_slots(self) -> Dict[str, Any]:
+        """Slots connus de la session (dernières valeurs non vides de ses échanges)."""
+        if self._state.shared:
+            return dict(DEFAULT_SLOTS, **self._state.get(f"{self._state_namespace}:slots", {}))
+        with self._turn_lock:
+            return dict(self._current_slots)
+
+    def get_history(self, limit: int = 50, skip: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Lit à la demande des échanges de la session plus anciens que ceux gardés en mémoire vive.
+        
+        Args:
+            limit (int): Nombre d'échanges à lire
+            skip (int, optional): Nombre d'échanges récents à sauter
+                (par défaut : ceux déjà en mémoire vive)
             
-    def _extract_intent_and_slots(self, message: str) -> tuple[str, Dict[str, Any]]:
+        Returns:
+            List[Dict[str, Any]]: Les messages, du plus ancien au plus récent
+        """
+        if skip is None:
+            skip = self._short_term.count("assistant")
+        try:
+            # Les échanges en attente d'écriture comptent dans la fenêtre : les écrire d'abord
+            self.flush()
+            messages = []
+            for metadata in self._fetch_turns(skip, limit):
+                messages.extend(self._turn_to_messages(metadata))
+            return messages
+        except Exception as e:
+            print(f"Erreur lors de la lecture de l'historique: {e}")
+            return []
+            
+    def _extract_intent_and_slots(self, message: str) -> Tuple[str, Dict[str, Any]]:
         """
         Extrait l'intent et les slots d'un message en utilisant le LLM.
         
@@ -114,7 +449,7 @@ class MemoryAgent(BaseAgent):
             message (str): Le message à analyser
             
         Returns:
-            tuple[str, Dict[str, Any]]: L'intent et les slots extraits
+            Tuple[str, Dict[str, Any]]: L'intent et les slots extraits
         """
         try:
             prompt = [
@@ -148,21 +483,76 @@ class MemoryAgent(BaseAgent):
                 {"role": "user", "content": f"Message à analyser : {message}"}
             ]
             
-            response = self._llm.chat(
-                model=self._model_config["name"],
-                messages=prompt,
-                options={"temperature": 0.1, "max_tokens": 200}
-            )
+            response = self._llm.complete(prompt, temperature=0.1, max_tokens=200)
             
-            result = json.loads(response["message"]["content"])
+            result = json.loads(response)
             return result.get("intent", ""), result.get("slots", {})
             
         except Exception as e:
             return "", {}
 
+    def _complete_intent_and_slots(self, message: str, intent: Optional[str],
+                                   slots: Optional[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        """Complète par le LLM l'intention et les slots d'un message utilisateur s'ils manquent."""
+        if not intent or not slots:
+            extracted_intent, extracted_slots = self._extract_intent_and_slots(message)
+            intent = intent or extracted_intent
+            if not slots:
+                slots = extracted_slots
+            else:
+                slots.update(extracted_slots)
+        return intent, slots
+
+    def prepare_turn(self, message: str, emotion: str = None, slots: Dict[str, Any] = None,
+                     intent: str = None) -> Dict[str, Any]:
+        """
+        Prépare l'échange d'une requête (intention et slots complétés si besoin).
+        Rien n'est modifié dans l'agent : l'échange n'est ajouté à la mémoire qu'avec
+        sa réponse (commit_turn), et des requêtes concurrentes de la même session ne
+        peuvent pas échanger leurs réponses.
+        
+        Args:
+            message (str): Le message utilisateur
+            emotion (str, optional): L'émotion détectée
+            slots (Dict[str, Any], optional): Les slots extraits
+            intent (str, optional): L'intention détectée
+            
+        Returns:
+            Dict[str, Any]: L'échange en cours ({"user_message", "emotion", "intent", "slots"})
+        """
+        intent, slots = self._complete_intent_and_slots(message, intent, slots)
+        return {
+            "user_message": message,
+            "emotion": emotion,
+            "intent": intent,
+            "slots": {k: v for k, v in (slots or {}).items() if v}
+        }
+
+    def commit_turn(self, turn: Dict[str, Any], ai_message: str) -> None:
+        """
+        Ajoute un échange préparé par prepare_turn et sa réponse : les deux messages
+        entrent ensemble dans la fenêtre, puis l'échange est enregistré.
+        
+        Args:
+            turn (Dict[str, Any]): L'échange retourné par prepare_turn
+            ai_message (str): La réponse de l'assistant
+        """
+        try:
+            emotion, intent = turn.get("emotion") or "", turn.get("intent") or ""
+            with self._turn_lock:
+                self._short_term.append(Message("user", turn["user_message"], emotion, intent))
+                self._short_term.append(Message("assistant", ai_message, emotion, intent))
+            self._update_slots(turn.get("slots"))
+            self._schedule_summary()
+            self._save_turn(turn["user_message"], ai_message, turn.get("emotion"), turn.get("intent"), turn.get("slots"))
+        except Exception as e:
+            raise Exception(f"Erreur lors de l'ajout de l'échange: {str(e)}")
+
     def add_message(self, role: str, content: str, emotion: str = None, slots: Dict[str, Any] = None, intent: str = None) -> None:
         """
-        Ajoute un message à la mémoire.
+        Ajoute un message à la mémoire ; un message utilisateur est enregistré avec
+        la réponse d'assistant qui le suit. Pour des requêtes concurrentes sur la même
+        session, utiliser prepare_turn puis commit_turn.
         
         Args:
             role (str): Le rôle de l'émetteur du message ('user' ou 'assistant')
@@ -173,72 +563,54 @@ class MemoryAgent(BaseAgent):
         """
         try:
             # Si c'est un message utilisateur, extraire l'intent et les slots
-            if role == "user" and (not intent or not slots):
-                extracted_intent, extracted_slots = self._extract_intent_and_slots(content)
-                intent = intent or extracted_intent
-                if not slots:
-                    slots = extracted_slots
-                else:
-                    slots.update(extracted_slots)
-
-            message = {
-                "role": role,
-                "content": content,
-                "emotion": emotion or "",
-                "intent": intent or ""
-            }
-            self._messages.append(message)
-            
             if role == "user":
-                self._current_conversation["user_message"] = content
-                self._current_conversation["emotion"] = emotion
-                self._current_conversation["intent"] = intent
-                if slots:
-                    # Mettre à jour les slots dynamiquement
-                    if not self._current_conversation["slots"]:
-                        self._current_conversation["slots"] = {}
-                    self._current_conversation["slots"].update({k: v for k, v in slots.items() if v})
-            elif role == "assistant":
-                self._current_conversation["ai_message"] = content
-            
-            # Sauvegarder la conversation si nous avons à la fois le message utilisateur et la réponse de l'assistant
-            if self._current_conversation["user_message"] and self._current_conversation["ai_message"]:
-                self._save_conversation()
-                # Réinitialiser la conversation courante après la sauvegarde
-                self._current_conversation = {
-                    "user_message": None,
-                    "ai_message": None,
-                    "emotion": None,
-                    "intent": None,
-                    "slots": {}
-                }
+                intent, slots = self._complete_intent_and_slots(content, intent, slots)
+                self._update_slots(slots)
+
+            with self._turn_lock:
+                self._short_term.append(Message(role, content, emotion or "", intent or ""))
+                
+                if role == "user":
+                    self._current_conversation["user_message"] = content
+                    self._current_conversation["emotion"] = emotion
+                    self._current_conversation["intent"] = intent
+                    if slots:
+                        # Mettre à jour les slots dynamiquement
+                        if not self._current_conversation["slots"]:
+                            self._current_conversation["slots"] = {}
+                        self._current_conversation["slots"].update({k: v for k, v in slots.items() if v})
+                elif role == "assistant":
+                    self._current_conversation["ai_message"] = content
+                
+                # Sauvegarder la conversation si nous avons à la fois le message utilisateur et la réponse de l'assistant
+                completed = None
+                if self._current_conversation["user_message"] and self._current_conversation["ai_message"]:
+                    completed = self._current_conversation
+                    # Réinitialiser la conversation courante
+                    self._current_conversation = {
+                        "user_message": None,
+                        "ai_message": None,
+                        "emotion": None,
+                        "intent": None,
+                        "slots": {}
+                    }
+            self._schedule_summary()
+            if completed is not None:
+                self._save_turn(completed["user_message"], completed["ai_message"], completed.get("emotion"),
+                                completed.get("intent"), completed.get("slots"))
                 
         except Exception as e:
             raise Exception(f"Erreur lors de l'ajout du message: {str(e)}")
             
-    def _save_conversation(self) -> None:
+    def _save_turn(self, user_message: str, ai_message: str, emotion: Optional[str], intent: Optional[str],
+                   slots: Optional[Dict[str, Any]]) -> None:
         """
-        Sauvegarde la conversation courante dans ChromaDB.
+        Sauvegarde un échange terminé dans ChromaDB.
         """
         try:
-            # Vérifier que nous avons les messages nécessaires
-            if not self._current_conversation.get("user_message") or not self._current_conversation.get("ai_message"):
-                return
-
-            # Vérifier et nettoyer l'émotion
-            emotion = self._current_conversation.get("emotion", "")
-            if not emotion or len(emotion) < 2:  # Éviter les émotions trop courtes
-                emotion = "neutre"
-
-            # Préparer les métadonnées
-            metadata = {
-                "user_message": self._current_conversation["user_message"],
-                "ai_message": self._current_conversation["ai_message"],
-                "emotion": str(emotion),
-                "intent": str(self._current_conversation.get("intent", "")),
-                "slots": json.dumps(self._current_conversation.get("slots", {}), ensure_ascii=False),
-                "timestamp": datetime.now().isoformat()
-            }
+            # Préparer les métadonnées (slots en champs typés, intention et émotion normalisées)
+            slots = slots or {}
+            metadata = build_metadata(user_message, ai_message, emotion, intent, slots, self._session_id, time.time())
 
             # Créer le document avec les métadonnées incluses
             document = (
@@ -246,75 +618,494 @@ class MemoryAgent(BaseAgent):
                 f"Assistant: {metadata['ai_message']}\n"
                 f"Émotion: {metadata['emotion']}\n"
                 f"Intention: {metadata['intent']}\n"
-                f"Slots: {metadata['slots']}"
+                f"Slots: {json.dumps(slots, ensure_ascii=False)}"
             )
 
-            # Générer un ID unique basé sur le timestamp et un UUID
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
-            unique_id = f"conv_{timestamp}_{uuid.uuid4().hex[:8]}"
+            # ID déterminé par le contenu : un échange rejoué (nouvel essai du client) remplace le précédent
+            turn_id = self._turn_id(self._session_id, metadata["user_message"], metadata["ai_message"])
             
-            # Ajouter le document à la collection
-            try:
-                self._collection.add(
-                    ids=[unique_id],
-                    documents=[document],
-                    metadatas=[metadata]
-                )
-            except Exception as e:
-                raise Exception(f"Erreur lors de l'ajout du document: {str(e)}")
-            
-            # Réinitialiser la conversation courante seulement après une sauvegarde réussie
-            self._current_conversation = {
-                "user_message": None,
-                "ai_message": None,
-                "emotion": None,
-                "intent": None,
-                "slots": {}  # Slots dynamiques
-            }
+            # Ajouter le document à la collection (par lots en tâche de fond si l'écriture différée est active)
+            if self._write_queue is not None:
+                self._write_queue.put((turn_id, document, metadata))
+            else:
+                try:
+                    self._write_turns([(turn_id, document, metadata)])
+                except Exception as e:
+                    raise Exception(f"Erreur lors de l'ajout du document: {str(e)}")
 
         except Exception as e:
             raise Exception(f"Erreur lors de la sauvegarde de la conversation: {str(e)}")
             
+    @staticmethod
+    def _turn_id(session_id: str, user_message: str, ai_message: str) -> str:
+        """ID d'un échange, dérivé de son contenu (session, message utilisateur, réponse)."""
+        content = json.dumps([session_id, user_message, ai_message], ensure_ascii=False)
+        return f"conv_{hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]}"
+
+    def _write_turns(self, turns: List[tuple]) -> None:
+        """Écrit des échanges (id, document, métadonnées) dans la partition de leur semaine (upsert)."""
+        self._store.upsert(turns, self._embedder.embed)
+
+    def flush(self) -> None:
+        """Écrit immédiatement les échanges en attente d'écriture différée."""
+        if self._write_queue is not None:
+            self._write_queue.flush()
+
+    @property
+    def _semantic_config(self) -> Dict[str, Any]:
+        """Paramètres courants du cache sémantique (distance, durée de vie), rechargés à chaud."""
+        return self._config.get("cache", {}).get("semantic", {})
+
+    @property
+    def semantic_cache_enabled(self) -> bool:
+        return self._semantic_cache is not None
+
+    @staticmethod
+    def _slots_key(slots: Dict[str, Any]) -> str:
+        """
+        Forme canonique des slots renseignés (valeurs normalisées, clés triées).
+        Deux messages ne partagent une réponse en cache que si cette clé est identique.
+        """
+        normalized = {
+            key: str(value).strip().lower()
+            for key, value in (slots or {}).items()
+            if value not in (None, "") and str(value).strip()
+        }
+        return json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+    def _semantic_where(self, intent: str, slots_key: str, emotion: str) -> Dict[str, Any]:
+        """Filtre ChromaDB : même intention, mêmes slots, entrée non expirée."""
+        conditions = [
+            {"intent": intent},
+            {"slots_key": slots_key},
+            {"created_at": {"$gte": time.time() - self._semantic_config.get("ttl", 86400)}}
+        ]
+        if self._semantic_config.get("match_emotion", True):
+            conditions.append({"emotion": emotion or "neutre"})
+        return {"$and": conditions}
+
+    def lookup_cached_response(self, message: str, intent: str, slots: Dict[str, Any],
+                               emotion: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Cherche une réponse déjà générée pour un message proche (distance cosinus
+        inférieure à cache.semantic.max_distance) ayant la même intention et les mêmes slots.
+
+        Args:
+            message (str): Le message utilisateur
+            intent (str): L'intention détectée
+            slots (Dict[str, Any]): Les slots détectés
+            emotion (str, optional): L'émotion détectée
+
+        Returns:
+            Optional[Dict[str, Any]]: {"response", "cached_message", "distance"} ou None
+        """
+        if self._semantic_cache is None or not intent or intent == "unknown":
+            return None
+
+        start = time.perf_counter()
+        slots_key = self._slots_key(slots)
+        result = None
+        try:
+            matches = self._semantic_cache.query(
+                query_texts=[message],
+                n_results=1,
+                where=self._semantic_where(intent, slots_key, emotion)
+            )
+            if matches["ids"] and matches["ids"][0]:
+                metadata = matches["metadatas"][0][0]
+                distance = matches["distances"][0][0]
+                # Garde-fou : on revérifie les slots, le filtre ne doit jamais laisser passer
+                # une réponse préparée pour une autre ville ou un autre budget
+                if distance <= self._semantic_config.get("max_distance", 0.1) and metadata.get("slots_key") == slots_key:
+                    result = {
+                        "response": metadata["ai_message"],
+                        "cached_message": metadata["user_message"],
+                        "distance": distance
+                    }
+        except Exception as e:
+            print(f"Erreur lors de la recherche dans le cache sémantique: {e}")
+            with self._semantic_lock:
+                self._semantic_stats["errors"] += 1
+
+        elapsed = time.perf_counter() - start
+        with self._semantic_lock:
+            self._semantic_stats["lookups"] += 1
+            self._semantic_stats["hits" if result else "misses"] += 1
+            self._semantic_stats["lookup_latency_total"] += elapsed
+            self._semantic_stats["lookup_latency_max"] = max(self._semantic_stats["lookup_latency_max"], elapsed)
+        return result
+
+    def store_cached_response(self, message: str, intent: str, slots: Dict[str, Any],
+                              response: str, emotion: str = None) -> None:
+        """
+        Enregistre une réponse générée dans le cache sémantique.
+
+        Args:
+            message (str): Le message utilisateur
+            intent (str): L'intention détectée
+            slots (Dict[str, Any]): Les slots détectés
+            response (str): La réponse générée
+            emotion (str, optional): L'émotion détectée
+        """
+        if self._semantic_cache is None or not intent or intent == "unknown":
+            return
+        try:
+            self._semantic_cache.add(
+                ids=[f"cache_{uuid.uuid4().hex}"],
+                documents=[message],
+                metadatas=[{
+                    "user_message": message,
+                    "ai_message": response,
+                    "intent": intent,
+                    "emotion": emotion or "neutre",
+                    "slots_key": self._slots_key(slots),
+                    "created_at": time.time()
+                }]
+            )
+            with self._semantic_lock:
+                self._semantic_stats["stores"] += 1
+        except Exception as e:
+            print(f"Erreur lors de l'écriture dans le cache sémantique: {e}")
+
+    def purge_semantic_cache(self, now: Optional[float] = None) -> int:
+        """
+        Supprime les réponses expirées du cache sémantique (cache.semantic.ttl).
+
+        Returns:
+            int: Nombre de réponses supprimées
+        """
+        if self._semantic_cache is None:
+            return 0
+        return purge_expired_responses(self._semantic_cache, self._semantic_config.get("ttl", 86400), now)
+
+    def get_semantic_cache_stats(self) -> Dict[str, Any]:
+        """Retourne les compteurs du cache sémantique (taux de succès, latence des recherches)."""
+        with self._semantic_lock:
+            stats = dict(self._semantic_stats)
+        return _summarize_semantic_stats(stats, self._semantic_cache is not None)
+
+    def get_labelled_turns(self) -> List[tuple]:
+        """
+        Retourne les messages utilisateur stockés avec l'intention détectée,
+        utilisés comme exemples d'entraînement du classifieur d'intentions.
+        
+        Returns:
+            List[tuple]: Liste de couples (message utilisateur, intention)
+        """
+        turns = []
+        try:
+            self.flush()
+            for partition in self._store.partitions():
+                collection = self._store.collection(partition.name)
+                for page in self._iter_metadata_pages(collection, 0, collection.count()):
+                    turns.extend(
+                        (metadata["user_message"], metadata["intent"])
+                        for metadata in page
+                        if metadata.get("user_message") and metadata.get("intent")
+                    )
+        except Exception as e:
+            print(f"Erreur lors de la lecture des conversations: {e}")
+        return turns
+
+    def find_turns(self, limit: Optional[int] = None, session_id: Optional[str] = None,
+                   since: Optional[float] = None, until: Optional[float] = None,
+                   intent: Optional[str] = None, emotion: Optional[str] = None,
+                   slots: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Sélectionne des échanges stockés par leurs métadonnées ; le filtre est
+        appliqué par ChromaDB (les échanges non migrés ne sont pas concernés) et
+        seules les partitions de la période sont lues.
+
+        Args:
+            limit (int, optional): Nombre maximal d'échanges retournés, lus en partant
+                de la partition la plus récente
+            session_id (str, optional): Session des échanges
+            since (float, optional): Début de la période (timestamp epoch, inclus)
+            until (float, optional): Fin de la période (timestamp epoch, exclu)
+            intent (str, optional): Intention des échanges
+            emotion (str, optional): Émotion des échanges
+            slots (Dict[str, Any], optional): Valeurs de slots attendues ({"location": "Dijon"})
+
+        Returns:
+            List[Dict[str, Any]]: Métadonnées des échanges, du plus ancien au plus récent
+        """
+        where = build_where(session_id=session_id, since=since, until=until,
+                            intent=intent, emotion=emotion, slots=slots)
+        try:
+            self.flush()
+            metadatas = []
+            for partition in self._store.partitions(since, until):
+                results = self._store.collection(partition.name).get(
+                    where=where, limit=None if limit is None else limit - len(metadatas), include=["metadatas"]
+                )
+                metadatas.extend(metadata for metadata in results.get("metadatas") or [] if metadata)
+                if limit is not None and len(metadatas) >= limit:
+                    break
+            metadatas.sort(key=turn_timestamp)
+            return metadatas
+        except Exception as e:
+            print(f"Erreur lors de la sélection des échanges: {e}")
+            return []
+
+    def migrate_metadata(self) -> int:
+        """
+        Convertit les échanges enregistrés avec un ancien schéma de métadonnées
+        (slots en chaîne JSON, date ISO, sans session) au schéma courant.
+        Les échanges déjà migrés ne sont pas relus : la commande peut être relancée.
+
+        Returns:
+            int: Nombre d'échanges convertis
+        """
+        self.flush()
+        page_size = self._config.get("memory", {}).get("page_size", 1000)
+        migrated = 0
+        for partition in self._store.partitions():
+            collection = self._store.collection(partition.name)
+            while True:
+                # Les échanges migrés sortent du filtre : on relit toujours la première page
+                results = collection.get(
+                    where={"schema_version": {"$ne": SCHEMA_VERSION}}, limit=page_size, include=["metadatas"]
+                )
+                ids, updates = [], []
+                for turn_id, metadata in zip(results["ids"], results["metadatas"]):
+                    update = upgrade_metadata(metadata or {})
+                    if update is not None:
+                        ids.append(turn_id)
+                        updates.append(update)
+                if not ids:
+                    break
+                collection.update(ids=ids, metadatas=updates)
+                migrated += len(ids)
+        return migrated
+
+    def deduplicate(self) -> Dict[str, int]:
+        """
+        Compacte le stockage : supprime les échanges en double (même session,
+        même message, même réponse ; le plus récent est gardé), donne aux
+        échanges enregistrés avec un ID aléatoire leur ID dérivé du contenu et
+        range chaque échange dans la partition de sa semaine (échanges de
+        l'ancienne collection non partitionnée compris).
+
+        ChromaDB ne renomme ni ne déplace un document : ces échanges sont réécrits
+        avec leurs vecteurs. Dans ce cas tous les échanges sont réécrits du plus
+        ancien au plus récent, pour que l'ordre d'insertion (qui sert au chargement
+        de la fenêtre récente) reste chronologique.
+
+        Returns:
+            Dict[str, int]: {"scanned", "duplicates", "moved"}
+        """
+        self.flush()
+        page_size = self._config.get("memory", {}).get("page_size", 1000)
+
+        # 1. Un passage sur les métadonnées : ID de contenu de chaque échange
+        kept: Dict[str, tuple] = {}  # ID de contenu -> (partition, ID actuel, date)
+        duplicates: Dict[str, List[str]] = {}  # partition -> IDs à supprimer
+        scanned = 0
+        for partition in self._store.partitions():
+            collection = self._store.collection(partition.name)
+            for offset in range(0, collection.count(), page_size):
+                results = collection.get(limit=page_size, offset=offset, include=["metadatas"])
+                for current_id, metadata in zip(results["ids"], results["metadatas"]):
+                    scanned += 1
+                    metadata = metadata or {}
+                    if "user_message" not in metadata or "ai_message" not in metadata:
+                        continue
+                    content_id = self._turn_id(metadata.get("session_id") or DEFAULT_SESSION_ID,
+                                               metadata["user_message"], metadata["ai_message"])
+                    record = (partition.name, current_id, turn_timestamp(metadata))
+                    previous = kept.get(content_id)
+                    if previous is None:
+                        kept[content_id] = record
+                        continue
+                    if record[2] > previous[2]:
+                        kept[content_id], record = record, previous
+                    duplicates.setdefault(record[0], []).append(record[1])
+
+        # 2. Suppression des doublons
+        for name, ids in duplicates.items():
+            collection = self._store.collection(name)
+            for first in range(0, len(ids), page_size):
+                self._delete_ids(collection, ids[first:first + page_size])
+
+        # 3. Réécriture dans l'ordre chronologique si des échanges sont mal nommés ou mal rangés
+        moved = sum(
+            1 for content_id, (name, current_id, ts) in kept.items()
+            if content_id != current_id or name != self._store.partition_name(ts)
+        )
+        if moved:
+            ordered = sorted(kept.items(), key=lambda item: item[1][2])
+            for first in range(0, len(ordered), page_size):
+                self._rewrite_turns(ordered[first:first + page_size])
+            # L'ancienne collection non partitionnée est vide une fois ses échanges répartis
+            legacy = [partition.name for partition in self._store.partitions() if partition.start is None]
+            if self._store.enabled and legacy and self._store.collection(legacy[0]).count() == 0:
+                self._store.drop(legacy)
+
+        return {"scanned": scanned, "duplicates": sum(len(ids) for ids in duplicates.values()), "moved": moved}
+
+    def _rewrite_turns(self, batch: List[tuple]) -> None:
+        """
+        Réécrit un lot d'échanges (ID de contenu, (partition, ID actuel, date)) sous leur
+        ID de contenu, dans la partition de leur semaine, avec leurs vecteurs.
+        """
+        records = {}
+        by_source: Dict[str, List[str]] = {}
+        for _, (name, current_id, _) in batch:
+            by_source.setdefault(name, []).append(current_id)
+        for name, ids in by_source.items():
+            results = self._store.collection(name).get(ids=ids, include=["documents", "metadatas", "embeddings"])
+            for record_id, document, metadata, embedding in zip(
+                results["ids"], results["documents"], results["metadatas"], results["embeddings"]
+            ):
+                records[(name, record_id)] = (document, metadata, embedding)
+
+        targets: Dict[str, List[tuple]] = {}
+        for content_id, (name, current_id, ts) in batch:
+            targets.setdefault(self._store.partition_name(ts), []).append((content_id, name, current_id))
+        for target, items in targets.items():
+            collection = self._store.collection(target)
+            # Les échanges déjà bien nommés et bien rangés sont supprimés avant d'être réécrits,
+            # les autres après (l'ancien document reste lisible jusqu'à l'ajout)
+            self._delete_ids(collection, [cid for cid, name, cur in items if cid == cur and name == target])
+            collection.add(
+                ids=[cid for cid, _, _ in items],
+                documents=[records[(name, cur)][0] for _, name, cur in items],
+                metadatas=[records[(name, cur)][1] for _, name, cur in items],
+                embeddings=[records[(name, cur)][2] for _, name, cur in items]
+            )
+        for content_id, (name, current_id, ts) in batch:
+            if content_id != current_id or name != self._store.partition_name(ts):
+                self._delete_ids(self._store.collection(name), [current_id])
+
+    @staticmethod
+    def _delete_ids(collection, ids: List[str]) -> None:
+        """Supprime des documents par ID (ChromaDB refuse une liste vide)."""
+        if ids:
+            collection.delete(ids=ids)
+
     def get_messages(self) -> List[Dict[str, Any]]:
         """
-        Récupère tous les messages.
+        Récupère les messages de la fenêtre à court terme.
         
         Returns:
             List[Dict[str, Any]]: Liste des messages avec leur rôle et contenu
         """
-        return self._messages.copy()
+        return self._short_term.messages()
+
+    def memory_usage(self) -> int:
+        """Taille approximative (octets) de la mémoire vive de la session (fenêtre, résumé, échange en cours)."""
+        pending = [value for value in self._current_conversation.values() if isinstance(value, str)]
+        return self._short_term.memory_usage() + sum(sys.getsizeof(value) for value in pending)
+
+    def get_summary(self) -> str:
+        """Résumé glissant des messages sortis de la fenêtre à court terme."""
+        return self._short_term.summary
+
+    def get_prompt_context(self, last: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Contexte de conversation pour un prompt : résumé glissant puis derniers messages.
+        Sa taille est bornée quelle que soit la longueur de la conversation.
+        
+        Args:
+            last (int, optional): Nombre de messages récents inclus (par défaut toute la fenêtre)
             
-    def clear_memory(self) -> None:
+        Returns:
+            List[Dict[str, str]]: Messages au format de l'API de chat
         """
-        Efface la mémoire et réinitialise ChromaDB.
+        return self._short_term.prompt_context(last)
+
+    def _schedule_summary(self) -> None:
+        """Lance le résumé en tâche de fond dès que memory.summary_batch messages sont sortis de la fenêtre."""
+        if self._short_term.pending_count < self._config.get("memory", {}).get("summary_batch", 8):
+            return
+        with self._summary_lock:
+            # Un seul résumé à la fois : les messages sortis entre-temps rejoignent le lot suivant
+            if self._summary_running:
+                return
+            self._summary_running = True
+        self._summary_executor.submit(self._refresh_summary)
+
+    def _refresh_summary(self) -> None:
+        """Tâche de fond : met à jour le résumé puis autorise le résumé suivant."""
+        try:
+            self._summarize_pending()
+        finally:
+            with self._summary_lock:
+                self._summary_running = False
+
+    def _summarize_pending(self) -> None:
+        """Intègre les messages sortis de la fenêtre au résumé glissant (un appel LLM)."""
+        pending = self._short_term.take_pending()
+        if not pending:
+            return
+        transcript = "\n".join(
+            f"{'Utilisateur' if message.role == 'user' else 'Assistant'}: {message.content}" for message in pending
+        )
+        prompt = [
+            {"role": "system", "content": """Vous tenez à jour le résumé d'une conversation entre un utilisateur et un assistant touristique.
+            Intégrez les nouveaux échanges au résumé actuel en conservant les informations utiles pour la suite
+            (destination, type de cuisine, budget, dates, préférences, demandes en cours).
+            Répondez uniquement avec le nouveau résumé, en quelques phrases."""},
+            {"role": "user", "content": f"Résumé actuel:\n{self._short_term.summary or '(vide)'}\n\nNouveaux échanges:\n{transcript}"}
+        ]
+        try:
+            summary = self._llm.complete(prompt, max_tokens=self._config.get("memory", {}).get("summary_max_tokens", 200))
+            self._short_term.set_summary(summary.strip())
+        except Exception as e:
+            print(f"Erreur lors de la mise à jour du résumé de conversation: {e}")
+            # Réessayer au prochain lot (la file d'attente reste bornée)
+            self._short_term.restore_pending(pending)
+            
+    def clear_memory(self, session_id: Optional[str] = None, since: Optional[float] = None,
+                     until: Optional[float] = None) -> None:
+        """
+        Efface la mémoire.
+        
+        Sans argument, les partitions sont supprimées : le coût ne dépend pas du
+        nombre d'échanges stockés. Avec une session et/ou une période, seuls les
+        échanges correspondants sont supprimés : partitions entières quand toute
+        leur semaine est dans la période, sinon sélection par ChromaDB via un filtre
+        `where` (les échanges enregistrés sans session ni "ts" ne sont pas concernés).
+        
+        Args:
+            session_id (str, optional): Session dont les échanges sont effacés
+            since (float, optional): Début de la période (timestamp epoch, inclus)
+            until (float, optional): Fin de la période (timestamp epoch, exclu)
         """
         try:
-            # Supprimer la collection existante
-            if self._collection:
-                try:
-                    # Récupérer tous les IDs de la collection
-                    results = self._collection.get()
-                    if results and "ids" in results and results["ids"]:
-                        # Supprimer tous les documents de la collection
-                        self._collection.delete(ids=results["ids"])
-                        
-                        # Vérifier que la collection est bien vide
-                        remaining = self._collection.get()
-                        if remaining and "ids" in remaining and remaining["ids"]:
-                            # Essayer de supprimer à nouveau
-                            self._collection.delete(ids=remaining["ids"])
-                except Exception as e:
-                    raise Exception(f"Erreur lors de la suppression des documents: {str(e)}")
+            # Écrire d'abord les échanges en attente pour qu'ils soient effacés aussi
+            self.flush()
             
-            # Réinitialiser les attributs
-            self._messages = []
-            self._current_conversation = {
-                "user_message": None,
-                "ai_message": None,
-                "emotion": None,
-                "intent": None,
-                "slots": {}  # Slots dynamiques
-            }
+            where = build_where(session_id=session_id, since=since, until=until)
+            
+            try:
+                if where is None:
+                    self._store.drop_all()
+                else:
+                    for partition in self._store.partitions(since, until):
+                        if session_id is None and partition.within(since, until):
+                            self._store.drop([partition.name])
+                        else:
+                            self._store.collection(partition.name).delete(where=where)
+            except Exception as e:
+                raise Exception(f"Erreur lors de la suppression des documents: {str(e)}")
+            
+            # Les fenêtres, résumés et slots des sessions concernées sont oubliés pour être rechargés
+            # depuis ChromaDB (dans un backend partagé, ceux des sessions ouvertes par les autres workers aussi)
+            self._state.delete("session:" if session_id is None else f"session:{session_id}:")
+            
+            # Réinitialiser les attributs si toute la conversation courante est effacée
+            if where is None or (session_id == self._session_id and since is None and until is None):
+                with self._turn_lock:
+                    self._short_term.clear()
+                    self._current_slots = dict(DEFAULT_SLOTS)
+                    self._current_conversation = {
+                        "user_message": None,
+                        "ai_message": None,
+                        "emotion": None,
+                        "intent": None,
+                        "slots": {}  # Slots dynamiques
+                    }
             
         except Exception as e:
             raise Exception(f"Erreur lors de l'effacement de la mémoire: {str(e)}")
@@ -332,35 +1123,98 @@ class MemoryAgent(BaseAgent):
         self.add_message("user", prompt)
         return f"{self._name}: Message enregistré"
 
-    def search_in_conversations(self, query: str) -> Dict[str, Any]:
+
+    def _find_relevant_turns(self, query: str, intent: Optional[str] = None, emotion: Optional[str] = None,
+                             slots: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
-        Recherche des informations dans les conversations précédentes.
+        Recherche vectorielle des échanges passés de la session les plus proches de
+        la requête, dans les memory.partitions.search_weeks partitions les plus récentes.
         
         Args:
             query (str): La requête de recherche
+            intent (str, optional): Ne garder que les échanges de cette intention
+            emotion (str, optional): Ne garder que les échanges de cette émotion
+            slots (Dict[str, Any], optional): Ne garder que les échanges ayant ces valeurs de slots
+            
+        Returns:
+            List[Dict[str, Any]]: Échanges retenus ({"document", "metadata", "distance"}),
+                du plus proche au plus éloigné, sous le seuil memory.search.max_distance
+        """
+        search_config = self._config.get("memory", {}).get("search", {})
+        top_k = search_config.get("top_k", 5)
+        max_distance = search_config.get("max_distance", 0.6)
+        where = build_where(session_id=self._session_id, intent=intent, emotion=emotion, slots=slots)
+        partitions = self._store.partitions()
+        search_weeks = self._config.get("memory", {}).get("partitions", {}).get("search_weeks")
+        if self._store.enabled and search_weeks:
+            partitions = partitions[:search_weeks]
+
+        # Les top_k de chaque partition, puis les top_k de l'ensemble
+        query_embeddings = self._embedder.embed([query])
+        turns = []
+        for partition in partitions:
+            try:
+                matches = self._store.collection(partition.name).query(
+                    query_embeddings=query_embeddings,
+                    n_results=top_k,
+                    where=where,
+                    include=["documents", "metadatas", "distances"]
+                )
+            except Exception as e:
+                # Partition supprimée par un autre processus (clear-memory, compact-memory)
+                print(f"Erreur lors de la recherche dans la partition {partition.name}: {e}")
+                self._store.refresh()
+                continue
+            if not matches["ids"] or not matches["ids"][0]:
+                continue
+            turns.extend(
+                {"document": document, "metadata": metadata, "distance": distance}
+                for document, metadata, distance in zip(matches["documents"][0], matches["metadatas"][0], matches["distances"][0])
+                if distance <= max_distance
+            )
+        turns.sort(key=lambda turn: turn["distance"])
+        return turns[:top_k]
+
+    def search_in_conversations(self, query: str, intent: Optional[str] = None, emotion: Optional[str] = None,
+                                slots: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Recherche des informations dans les conversations précédentes de la session.
+        Seuls les memory.search.top_k échanges les plus proches sont envoyés au LLM ;
+        si aucun n'est assez proche, le LLM n'est pas appelé.
+        
+        Args:
+            query (str): La requête de recherche
+            intent (str, optional): Filtre sur l'intention des échanges
+            emotion (str, optional): Filtre sur l'émotion des échanges
+            slots (Dict[str, Any], optional): Filtre sur les valeurs de slots des échanges
             
         Returns:
             Dict[str, Any]: Les informations trouvées
         """
+        not_found = {"found": False, "confidence": "low", "information": ""}
         try:
-            if not self._messages:
-                return {"found": False, "confidence": "low", "information": ""}
-                
+            turns = self._find_relevant_turns(query, intent, emotion, slots)
+            if not turns:
+                return not_found
+            
+            excerpts = "\n\n".join(
+                f"[{format_timestamp(turn['metadata'])}]\n{turn['document']}" for turn in turns
+            )
             prompt = [
-                {"role": "system", "content": """Analysez l'historique des conversations pour trouver des informations pertinentes.
+                {"role": "system", "content": """Analysez les extraits de conversations passées pour trouver des informations pertinentes.
                 Répondez au format JSON:
                 {
                     "found": true/false,
                     "confidence": "high"/"medium"/"low",
                     "information": "information trouvée"
                 }"""},
-                {"role": "user", "content": f"Recherchez dans l'historique: {query}\n\nHistorique:\n{json.dumps(self._messages, indent=2)}"}
+                {"role": "user", "content": f"Recherchez dans l'historique: {query}\n\nExtraits pertinents:\n{excerpts}"}
             ]
             
             response = self._get_llm_response(prompt)
             return json.loads(response)
         except Exception:
-            return {"found": False, "confidence": "low", "information": ""}
+            return not_found
 
     def _get_llm_response(self, prompt: List[Dict[str, str]]) -> str:
         """
@@ -373,29 +1227,25 @@ class MemoryAgent(BaseAgent):
             str: La réponse du LLM
         """
         try:
-            headers = {
-                "Authorization": f"Bearer {self._api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": "mistral-tiny",
-                "messages": prompt,
-                "temperature": self._model_config["temperature"],
-                "max_tokens": self._model_config["max_tokens"]
-            }
-            
-            response = requests.post(
-                f"{self._api_url}/chat/completions",
-                headers=headers,
-                json=data
-            )
+            return self._llm.complete(prompt)
+                
+        except Exception as e:
+            print(f"Erreur lors de l'appel à l'API Mistral: {e}")
+            raise
+
+    async def _get_llm_response_async(self, prompt: List[Dict[str, str]]) -> str:
+        """
+        Version asynchrone de _get_llm_response (client HTTP non bloquant).
+        
+        Args:
+            prompt (List[Dict[str, str]]): Le prompt à envoyer au LLM
             
-            if response.status_code == 200:
-                return response.json()["choices"][0]["message"]["content"]
-            else:
-                raise Exception(f"Erreur API Mistral: {response.status_code}")
+        Returns:
+            str: La réponse du LLM
+        """
+        try:
+            return await self._llm.complete_async(prompt)
                 
         except Exception as e:
             print(f"Erreur lors de l'appel à l'API Mistral: {e}")
-            raise
\ No newline at end of file
+            raise
@@ -1,15 +1,28 @@
 from .base_agent import BaseAgent
-from .memory_agent import MemoryAgent
+from .memory_agent import MemoryAgent, get_semantic_cache_stats
 from .emotion_detection_agent import EmotionDetectionAgent
 from .intent_detection_agent import IntentDetectionAgent
 from .threshold_agent import ThresholdAgent
 from .search_agent import SearchAgent
 from .response_generator_agent import ResponseGeneratorAgent
 from .TrackingAgent import TrackingAgent
+from .conversation_schema import DEFAULT_SESSION_ID
+from .llm_client import RateLimitError
+from .pipeline_context import PipelineContext
+from .session_manager import DEFAULT_IDLE_TIMEOUT, DEFAULT_MAX_SESSIONS, SessionManager
 
-import requests
+import asyncio
 import json
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+# Nouvelles tentatives d'une étape en cas de rate limit (section orchestrator.stage_retries)
+DEFAULT_STAGE_RETRIES = 3
+DEFAULT_STAGE_BACKOFF = 1.0
+# Messages récents de la session joints au prompt de réponse, après le résumé (memory.prompt_messages)
+DEFAULT_PROMPT_MESSAGES = 6
 
 class AgentOrchestrator(BaseAgent):
     """
@@ -19,165 +32,659 @@ class AgentOrchestrator(BaseAgent):
     
     def __init__(self, name: str = "coordinator"):
         super().__init__(name)  # Initialise configuration et métadonnées via Agent
-        # Configuration de l'API Mistral
-        self._model_config = self._config["model"]
-        self._api_key = self._model_config["api_key"]
-        self._api_url = self._model_config["api_url"]
         
-        # Instancier les agents auxiliaires
-        self._memory_agent = MemoryAgent()                # A4: gère la mémoire
-        self._emotion_agent = EmotionDetectionAgent()      # A3: détecte l'émotion
-        self._intent_agent = IntentDetectionAgent()        # A5: extrait intent et slots
-        self._response_generator = ResponseGeneratorAgent()# A7: génère les réponses
-        self._threshold_agent = ThresholdAgent()           # A8: vérifie les slots
-        self._search_agent = SearchAgent()                 # A9: effectue les recherches web
+        # Agents auxiliaires, instanciés au premier usage (voir _get_agent)
+        self._agents: Dict[str, Any] = {}
+        self._agents_lock = threading.Lock()
         self.tracking_agent = TrackingAgent()              # Agent de suivi
         
-    def process_message(self, message: str) -> Dict[str, Any]:
+        # Mémoire de conversation : un MemoryAgent par session, dans un LRU borné (section "sessions")
+        sessions_config = self._config.get("sessions", {})
+        max_memory_mb = sessions_config.get("max_memory_mb")
+        self._sessions = SessionManager(
+            lambda session_id: MemoryAgent(session_id=session_id),
+            max_sessions=sessions_config.get("max_sessions", DEFAULT_MAX_SESSIONS),
+            idle_timeout=sessions_config.get("idle_timeout", DEFAULT_IDLE_TIMEOUT),
+            max_memory_bytes=int(max_memory_mb * 2**20) if max_memory_mb else None
+        )
+        
+        # Mode d'exécution des étapes d'analyse : "serial" ou "concurrent"
+        # (fixé au démarrage : il détermine la création du pool de threads)
+        self._execution_mode = self._orchestrator_config.get("execution_mode", "serial")
+        self._executor = None
+        if self._execution_mode == "concurrent":
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._orchestrator_config.get("max_workers", 64),
+                thread_name_prefix="orchestrator-stage"
+            )
+        
+    # Classes des agents auxiliaires
+    _AGENT_FACTORIES = {
+        "emotion": EmotionDetectionAgent,      # A3: détecte l'émotion
+        "intent": IntentDetectionAgent,        # A5: extrait intent et slots
+        "response": ResponseGeneratorAgent,    # A7: génère les réponses
+        "threshold": ThresholdAgent,           # A8: vérifie les slots
+        "search": SearchAgent                  # A9: effectue les recherches web
+    }
+
+    def _get_agent(self, key: str) -> Any:
+        """Retourne l'agent auxiliaire `key`, construit au premier appel."""
+        agent = self._agents.get(key)
+        if agent is None:
+            with self._agents_lock:
+                agent = self._agents.get(key)
+                if agent is None:
+                    agent = self._AGENT_FACTORIES[key]()
+                    self._agents[key] = agent
+        return agent
+
+    def _memory_for(self, session_id: str, pin: bool = False) -> MemoryAgent:
         """
-        Traite un message utilisateur en orchestrant les différents agents.
+        A4 : agent de mémoire de la session (construit au premier message ou après éviction).
+        Avec pin, la session n'est pas évincée avant _release_memory (fin de la requête).
         """
-        try:
-            # Log de l'étape de détection d'intention
-            self.tracking_agent.log_execution(
-                agent_name="intent_detection",
-                action="Détection de l'intention de l'utilisateur",
-                status="démarrage"
-            )
-            
-            # 1. Détection de l'intention
-            intent_result = self._intent_agent.run(message)
-            
+        return self._sessions.get(session_id, pin)
+
+    def _release_memory(self, ctx: PipelineContext) -> None:
+        """Libère la session épinglée par la requête."""
+        if ctx.memory is not None:
+            self._sessions.release(ctx.session_id, ctx.memory)
+
+    @property
+    def _emotion_agent(self) -> EmotionDetectionAgent:
+        return self._get_agent("emotion")
+
+    @property
+    def _intent_agent(self) -> IntentDetectionAgent:
+        return self._get_agent("intent")
+
+    @property
+    def _response_generator(self) -> ResponseGeneratorAgent:
+        return self._get_agent("response")
+
+    @property
+    def _threshold_agent(self) -> ThresholdAgent:
+        return self._get_agent("threshold")
+
+    @property
+    def _search_agent(self) -> SearchAgent:
+        return self._get_agent("search")
+
+    def warm_up(self) -> None:
+        """
+        Construit tous les agents auxiliaires (ouverture de ChromaDB, chargement
+        de l'historique et du classifieur local) avant la première requête.
+        """
+        for key in self._AGENT_FACTORIES:
+            self._get_agent(key)
+        self._memory_for(DEFAULT_SESSION_ID)
+
+    @property
+    def _orchestrator_config(self) -> Dict[str, Any]:
+        return self._config.get("orchestrator", {})
+
+    @property
+    def _analysis_mode(self) -> str:
+        """Mode d'analyse : "separate" (deux appels LLM) ou "joint" (un seul appel), rechargé à chaud."""
+        return self._orchestrator_config.get("analysis_mode", "separate")
+
+    def _retry_after_rate_limit(self, ctx: PipelineContext, stage: str, error: RateLimitError) -> Optional[float]:
+        """
+        Compte une nouvelle tentative de l'étape et la trace.
+
+        Returns:
+            Optional[float]: Attente avant la tentative (backoff exponentiel), ou None
+            si l'étape a épuisé ses tentatives
+        """
+        retry_config = self._orchestrator_config.get("stage_retries", {})
+        max_retries = retry_config.get("max_retries", DEFAULT_STAGE_RETRIES)
+        attempt = ctx.retries.get(stage, 0) + 1
+        if attempt > max_retries:
             self.tracking_agent.log_execution(
-                agent_name="intent_detection",
-                action=f"Détection de l'intention: {intent_result['intent']}",
-                status="succès"
+                agent_name=stage,
+                action="Rate limit persistant, abandon de l'étape",
+                status=f"erreur: {error}",
+                request_id=ctx.request_id
             )
+            return None
+        ctx.retries[stage] = attempt
+        delay = retry_config.get("backoff", DEFAULT_STAGE_BACKOFF) * 2 ** (attempt - 1)
+        self.tracking_agent.log_execution(
+            agent_name=stage,
+            action=f"Rate limit détecté, nouvelle tentative de l'étape dans {delay:g} s",
+            status=f"tentative {attempt}/{max_retries}",
+            request_id=ctx.request_id
+        )
+        return delay
+
+    @staticmethod
+    def _completion_status(ctx: PipelineContext) -> str:
+        """Statut de fin de traitement, avec les nouvelles tentatives par étape."""
+        if not ctx.retries:
+            return "succès"
+        retries = ", ".join(f"{stage}={count}" for stage, count in ctx.retries.items())
+        return f"succès (nouvelles tentatives: {retries})"
+
+    @staticmethod
+    def _result(ctx: PipelineContext) -> Dict[str, Any]:
+        """Résultat d'une requête traitée (nombre de nouvelles tentatives par étape compris)."""
+        return {
+            "response": ctx.response,
+            "success": True,
+            "stage_retries": dict(ctx.retries)
+        }
+
+    def _call_stage(self, ctx: PipelineContext, stage: str, call: Callable[[], Any]) -> Any:
+        """
+        Appelle l'agent d'une étape. Sur rate limit, seul cet appel est réessayé après
+        l'attente : les résultats des étapes déjà terminées restent dans le contexte.
+        """
+        while True:
+            try:
+                return call()
+            except RateLimitError as e:
+                delay = self._retry_after_rate_limit(ctx, stage, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    async def _call_stage_async(self, ctx: PipelineContext, stage: str, call: Callable[[], Any]) -> Any:
+        """Version asynchrone de _call_stage (`call` retourne une coroutine, recréée à chaque tentative)."""
+        while True:
+            try:
+                return await call()
+            except RateLimitError as e:
+                delay = await self._off_loop(self._retry_after_rate_limit, ctx, stage, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    async def _off_loop(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Appelle depuis la boucle asyncio une méthode synchrone qui écrit dans le suivi :
+        dans un thread si le suivi fait des E/S (backend d'état partagé), directement sinon.
+        """
+        if self.tracking_agent.blocking:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    def process_message(self, message: str, session_id: str = DEFAULT_SESSION_ID,
+                        request_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Traite un message utilisateur en orchestrant les différents agents.
+        Les résultats des étapes sont portés par le contexte de la requête
+        (PipelineContext) : l'orchestrateur, partagé, ne garde rien d'une requête.
+        
+        Args:
+            message (str): Le message utilisateur
+            session_id (str): La session (conversation) du message
+            request_id (str, optional): Identifiant de la requête dans les traces
+        """
+        ctx = PipelineContext(message, session_id, request_id=request_id)
+        try:
+            ctx.memory = self._memory_for(session_id, pin=True)
+            if ctx.memory.semantic_cache_enabled:
+                # 1-2. Intention et émotion d'abord : elles conditionnent le cache sémantique
+                self._run_understanding_stages(ctx)
+                if self._run_semantic_cache_stage(ctx) is not None:
+                    return self._serve_cached_response(ctx)
+                # 3. Recherche seulement en cas d'échec du cache
+                self._run_search_stage(ctx, ctx.intent_result)
+            else:
+                # 1-3. Détection de l'intention, de l'émotion et recherche
+                self._run_analysis_stages(ctx)
             
-            # Log de l'étape de détection d'émotion
-            self.tracking_agent.log_execution(
-                agent_name="emotion_detection",
-                action="Analyse de l'état émotionnel",
-                status="démarrage"
-            )
+            # 4. Vérification des seuils
+            self._run_threshold_stage(ctx)
             
-            # 2. Détection de l'émotion
-            emotion = self._emotion_agent.detect_emotion(message)
+            # 5. Préparation de l'échange (mémoire)
+            self._run_memory_stage(ctx)
             
-            self.tracking_agent.log_execution(
-                agent_name="emotion_detection",
-                action=f"Détection de l'émotion: {emotion['emotion']}",
-                status="succès"
+            # 6. Génération de la réponse
+            self._log_response_start(ctx)
+            ctx.response = self._call_stage(ctx, "response_generator", lambda: (
+                self._response_generator.generate_response(
+                    message=message,
+                    emotion=ctx.emotion["emotion"],
+                    intent=ctx.intent_result["intent"],
+                    slots=ctx.intent_result["slots"],
+                    search_results=ctx.search_results,
+                    history=ctx.history
+                )
+            ))
+            self._store_response(ctx)
+            ctx.memory.store_cached_response(
+                message, ctx.intent_result["intent"], ctx.intent_result["slots"], ctx.response, ctx.emotion["emotion"]
             )
             
-            # Log de l'étape de recherche
+            # Log de l'étape finale
             self.tracking_agent.log_execution(
-                agent_name="search",
-                action="Recherche d'informations pertinentes",
-                status="démarrage"
+                agent_name="orchestrator",
+                action="Traitement complet de la demande",
+                status=self._completion_status(ctx),
+                request_id=ctx.request_id
             )
             
-            # 3. Recherche d'informations
-            search_results = self._search_agent.search(message)
+            return self._result(ctx)
             
+        except Exception as e:
+            # Log de l'erreur
             self.tracking_agent.log_execution(
-                agent_name="search",
-                action=f"Recherche terminée: {len(search_results)} résultats",
-                status="succès"
-            )
-            
-            # Log de l'étape de seuil
-            self.tracking_agent.log_execution(
-                agent_name="threshold",
-                action="Vérification des seuils de confiance",
-                status="démarrage"
+                agent_name="orchestrator",
+                action="Erreur lors du traitement",
+                status=f"erreur: {str(e)}",
+                request_id=ctx.request_id
             )
+            raise
+        finally:
+            self._release_memory(ctx)
+
+    async def process_message_async(self, message: str, session_id: str = DEFAULT_SESSION_ID,
+                                    request_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Version asynchrone de process_message : les appels réseau ne bloquent
+        pas la boucle d'événements et les accès ChromaDB sont délégués à un thread.
+        """
+        ctx = PipelineContext(message, session_id, request_id=request_id)
+        try:
+            # Construire une session lit sa fenêtre récente dans ChromaDB
+            ctx.memory = await asyncio.to_thread(self._memory_for, session_id, True)
+            if ctx.memory.semantic_cache_enabled:
+                await self._run_understanding_stages_async(ctx)
+                if await asyncio.to_thread(self._run_semantic_cache_stage, ctx) is not None:
+                    return await asyncio.to_thread(self._serve_cached_response, ctx)
+                await self._run_search_stage_async(ctx, ctx.intent_result)
+            else:
+                # 1-3. Détection de l'intention, de l'émotion et recherche
+                await self._run_analysis_stages_async(ctx)
             
             # 4. Vérification des seuils
-            threshold_check = self._threshold_agent.check_thresholds(
-                intent=intent_result,
-                emotion=emotion,
-                search_results={"results": search_results}
-            )
+            await self._off_loop(self._run_threshold_stage, ctx)
             
-            self.tracking_agent.log_execution(
-                agent_name="threshold",
-                action=f"Vérification des seuils: {threshold_check['status']}",
-                status="succès"
-            )
-            
-            # Log de l'étape de mémoire
-            self.tracking_agent.log_execution(
-                agent_name="memory",
-                action="Mise à jour de la mémoire contextuelle",
-                status="démarrage"
-            )
-            
-            # 5. Mise à jour de la mémoire
-            self._memory_agent.add_message(
-                role="user",
-                content=message,
-                emotion=emotion["emotion"],
-                slots=intent_result["slots"],
-                intent=intent_result["intent"]
-            )
-            
-            self.tracking_agent.log_execution(
-                agent_name="memory",
-                action="Mise à jour de la mémoire terminée",
-                status="succès"
-            )
-            
-            # Log de l'étape de génération de réponse
-            self.tracking_agent.log_execution(
-                agent_name="response_generator",
-                action="Génération de la réponse finale",
-                status="démarrage"
-            )
+            # 5. Préparation de l'échange (mémoire ; complète au besoin intention et slots par le LLM)
+            await asyncio.to_thread(self._run_memory_stage, ctx)
             
             # 6. Génération de la réponse
-            response = self._response_generator.generate_response(
-                message=message,
-                emotion=emotion["emotion"],
-                intent=intent_result["intent"],
-                slots=intent_result["slots"],
-                search_results=search_results
-            )
-            
-            # Ajouter la réponse à la mémoire
-            self._memory_agent.add_message(
-                role="assistant",
-                content=response,
-                emotion=emotion["emotion"],
-                intent=intent_result["intent"]
+            await self._off_loop(self._log_response_start, ctx)
+            ctx.response = await self._call_stage_async(ctx, "response_generator", lambda: (
+                self._response_generator.generate_response_async(
+                    message=message,
+                    emotion=ctx.emotion["emotion"],
+                    intent=ctx.intent_result["intent"],
+                    slots=ctx.intent_result["slots"],
+                    search_results=ctx.search_results,
+                    history=ctx.history
+                )
+            ))
+            await asyncio.to_thread(self._store_response, ctx)
+            await asyncio.to_thread(
+                ctx.memory.store_cached_response,
+                message, ctx.intent_result["intent"], ctx.intent_result["slots"], ctx.response, ctx.emotion["emotion"]
             )
             
-            self.tracking_agent.log_execution(
-                agent_name="response_generator",
-                action="Réponse générée avec succès",
-                status="succès"
-            )
-            
-            # Log de l'étape finale
-            self.tracking_agent.log_execution(
+            await self.tracking_agent.log_execution_async(
                 agent_name="orchestrator",
                 action="Traitement complet de la demande",
-                status="succès"
+                status=self._completion_status(ctx),
+                request_id=ctx.request_id
             )
             
-            return {
-                "response": response,
-                "success": True
-            }
+            return self._result(ctx)
             
         except Exception as e:
-            # Log de l'erreur
-            self.tracking_agent.log_execution(
+            await self.tracking_agent.log_execution_async(
                 agent_name="orchestrator",
                 action="Erreur lors du traitement",
-                status=f"erreur: {str(e)}"
+                status=f"erreur: {str(e)}",
+                request_id=ctx.request_id
             )
             raise
+        finally:
+            self._release_memory(ctx)
+
+    def _run_threshold_stage(self, ctx: PipelineContext) -> Dict[str, Any]:
+        """Étape 4 : vérification des seuils de confiance."""
+        self.tracking_agent.log_execution(
+            agent_name="threshold",
+            action="Vérification des seuils de confiance",
+            status="démarrage",
+            request_id=ctx.request_id
+        )
+        ctx.threshold = self._threshold_agent.check_thresholds(
+            intent=ctx.intent_result,
+            emotion=ctx.emotion,
+            search_results={"results": ctx.search_results}
+        )
+        self.tracking_agent.log_execution(
+            agent_name="threshold",
+            action=f"Vérification des seuils: {ctx.threshold['status']}",
+            status="succès",
+            request_id=ctx.request_id
+        )
+        return ctx.threshold
+
+    def _run_memory_stage(self, ctx: PipelineContext) -> Dict[str, Any]:
+        """
+        Étape 5 : préparation de l'échange de la requête (intention et slots complétés si besoin)
+        et lecture du contexte de conversation de la session. L'échange n'entre dans la
+        mémoire de la session qu'avec sa réponse (_store_response).
+        """
+        self.tracking_agent.log_execution(
+            agent_name="memory",
+            action="Mise à jour de la mémoire contextuelle",
+            status="démarrage",
+            request_id=ctx.request_id
+        )
+        ctx.turn = ctx.memory.prepare_turn(
+            ctx.message,
+            emotion=ctx.emotion["emotion"],
+            slots=ctx.intent_result["slots"],
+            intent=ctx.intent_result["intent"]
+        )
+        # Résumé glissant et derniers messages de la session, pour la génération de la réponse
+        ctx.history = ctx.memory.get_prompt_context(
+            last=self._config.get("memory", {}).get("prompt_messages", DEFAULT_PROMPT_MESSAGES)
+        )
+        self.tracking_agent.log_execution(
+            agent_name="memory",
+            action="Mise à jour de la mémoire terminée",
+            status="succès",
+            request_id=ctx.request_id
+        )
+        return ctx.turn
+
+    def _log_response_start(self, ctx: PipelineContext) -> None:
+        """Trace le début de l'étape 6 (génération de la réponse)."""
+        self.tracking_agent.log_execution(
+            agent_name="response_generator",
+            action="Génération de la réponse finale",
+            status="démarrage",
+            request_id=ctx.request_id
+        )
+
+    def _store_response(self, ctx: PipelineContext) -> None:
+        """Ajoute l'échange et sa réponse à la mémoire de la session et trace la fin de l'étape 6."""
+        ctx.memory.commit_turn(ctx.turn, ctx.response)
+        self.tracking_agent.log_execution(
+            agent_name="response_generator",
+            action="Réponse générée avec succès",
+            status="succès",
+            request_id=ctx.request_id
+        )
+
+    def _run_understanding_stages(self, ctx: PipelineContext) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Étapes 1 et 2 seules (intention et émotion), utilisées lorsque le cache
+        sémantique doit être consulté avant de lancer la recherche.
+        """
+        if self._analysis_mode == "joint":
+            return self._run_joint_stage(ctx)
+        if self._executor is None:
+            return self._run_intent_stage(ctx), self._run_emotion_stage(ctx)
+        intent_future = self._executor.submit(self._run_intent_stage, ctx)
+        emotion_future = self._executor.submit(self._run_emotion_stage, ctx)
+        return intent_future.result(), emotion_future.result()
+
+    async def _run_understanding_stages_async(self, ctx: PipelineContext) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Version asynchrone de _run_understanding_stages."""
+        if self._analysis_mode == "joint":
+            return await self._run_joint_stage_async(ctx)
+        if self._execution_mode != "concurrent":
+            return await self._run_intent_stage_async(ctx), await self._run_emotion_stage_async(ctx)
+        intent_result, emotion = await asyncio.gather(
+            self._run_intent_stage_async(ctx),
+            self._run_emotion_stage_async(ctx)
+        )
+        return intent_result, emotion
+
+    def _run_semantic_cache_stage(self, ctx: PipelineContext) -> Optional[str]:
+        """Consulte le cache sémantique ; retourne la réponse en cache (aussi placée dans ctx.response) ou None."""
+        cached = ctx.memory.lookup_cached_response(
+            ctx.message, ctx.intent_result["intent"], ctx.intent_result["slots"], ctx.emotion["emotion"]
+        )
+        if cached is None:
+            return None
+        self.tracking_agent.log_execution(
+            agent_name="semantic_cache",
+            action=f"Réponse en cache (distance {cached['distance']:.3f}) pour: {cached['cached_message']}",
+            status="succès",
+            request_id=ctx.request_id
+        )
+        ctx.response = cached["response"]
+        return ctx.response
+
+    def _serve_cached_response(self, ctx: PipelineContext) -> Dict[str, Any]:
+        """Retourne une réponse du cache sémantique sans recherche ni génération."""
+        self._run_memory_stage(ctx)
+        ctx.memory.commit_turn(ctx.turn, ctx.response)
+        self.tracking_agent.log_execution(
+            agent_name="orchestrator",
+            action="Traitement complet de la demande (cache sémantique)",
+            status=self._completion_status(ctx),
+            request_id=ctx.request_id
+        )
+        return self._result(ctx)
+
+    def _run_analysis_stages(self, ctx: PipelineContext) -> Tuple[Dict[str, Any], Dict[str, str], List[Dict[str, Any]]]:
+        """
+        Exécute la détection d'intention, la détection d'émotion et la recherche.
+        Ces trois étapes ne dépendent que du message brut : en mode "concurrent",
+        elles sont lancées en parallèle puis jointes avant la vérification des seuils.
+        En mode d'analyse "joint", intention et émotion sont obtenues en un seul appel.
+        
+        Args:
+            ctx (PipelineContext): Le contexte de la requête (résultats placés dans ses champs)
+            
+        Returns:
+            Tuple: (résultat d'intention, émotion, résultats de recherche)
+        """
+        if self._analysis_mode == "joint":
+            # Intention, slots et émotion en un seul appel au LLM
+            if self._executor is None:
+                intent_result, emotion = self._run_joint_stage(ctx)
+                return intent_result, emotion, self._run_search_stage(ctx, intent_result)
+            joint_future = self._executor.submit(self._run_joint_stage, ctx)
+            search_future = self._executor.submit(self._run_search_stage, ctx)
+            intent_result, emotion = joint_future.result()
+            return intent_result, emotion, search_future.result()
+        
+        if self._executor is None:
+            return (
+                self._run_intent_stage(ctx),
+                self._run_emotion_stage(ctx),
+                self._run_search_stage(ctx, ctx.intent_result)
+            )
+        
+        intent_future = self._executor.submit(self._run_intent_stage, ctx)
+        emotion_future = self._executor.submit(self._run_emotion_stage, ctx)
+        search_future = self._executor.submit(self._run_search_stage, ctx)
+        return intent_future.result(), emotion_future.result(), search_future.result()
+
+    async def _run_analysis_stages_async(self, ctx: PipelineContext) -> Tuple[Dict[str, Any], Dict[str, str], List[Dict[str, Any]]]:
+        """
+        Version asynchrone de _run_analysis_stages : en mode "concurrent",
+        les trois étapes sont attendues ensemble avec asyncio.gather.
+        """
+        if self._analysis_mode == "joint":
+            if self._execution_mode != "concurrent":
+                intent_result, emotion = await self._run_joint_stage_async(ctx)
+                return intent_result, emotion, await self._run_search_stage_async(ctx, intent_result)
+            (intent_result, emotion), search_results = await asyncio.gather(
+                self._run_joint_stage_async(ctx),
+                self._run_search_stage_async(ctx)
+            )
+            return intent_result, emotion, search_results
+        
+        if self._execution_mode != "concurrent":
+            return (
+                await self._run_intent_stage_async(ctx),
+                await self._run_emotion_stage_async(ctx),
+                await self._run_search_stage_async(ctx, ctx.intent_result)
+            )
+        
+        intent_result, emotion, search_results = await asyncio.gather(
+            self._run_intent_stage_async(ctx),
+            self._run_emotion_stage_async(ctx),
+            self._run_search_stage_async(ctx)
+        )
+        return intent_result, emotion, search_results
+
+    def _run_joint_stage(self, ctx: PipelineContext) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Étapes 1 et 2 réunies : intention, slots et émotion en un seul appel."""
+        self.tracking_agent.log_execution(
+            agent_name="joint_analysis",
+            action="Analyse conjointe de l'intention et de l'émotion",
+            status="démarrage",
+            request_id=ctx.request_id
+        )
+        ctx.intent_result, ctx.emotion = self._call_stage(ctx, "joint_analysis", lambda: self._intent_agent.run_joint(ctx.message))
+        self.tracking_agent.log_execution(
+            agent_name="joint_analysis",
+            action=f"Intention: {ctx.intent_result['intent']}, émotion: {ctx.emotion['emotion']}",
+            status="succès",
+            request_id=ctx.request_id
+        )
+        return ctx.intent_result, ctx.emotion
+
+    async def _run_joint_stage_async(self, ctx: PipelineContext) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Étapes 1 et 2 réunies (asynchrone)."""
+        await self.tracking_agent.log_execution_async(
+            agent_name="joint_analysis",
+            action="Analyse conjointe de l'intention et de l'émotion",
+            status="démarrage",
+            request_id=ctx.request_id
+        )
+        ctx.intent_result, ctx.emotion = await self._call_stage_async(
+            ctx, "joint_analysis", lambda: self._intent_agent.run_joint_async(ctx.message)
+        )
+        await self.tracking_agent.log_execution_async(
+            agent_name="joint_analysis",
+            action=f"Intention: {ctx.intent_result['intent']}, émotion: {ctx.emotion['emotion']}",
+            status="succès",
+            request_id=ctx.request_id
+        )
+        return ctx.intent_result, ctx.emotion
+
+    def _run_intent_stage(self, ctx: PipelineContext) -> Dict[str, Any]:
+        """Étape 1 : détection de l'intention et des slots."""
+        self.tracking_agent.log_execution(
+            agent_name="intent_detection",
+            action="Détection de l'intention de l'utilisateur",
+            status="démarrage",
+            request_id=ctx.request_id
+        )
+        ctx.intent_result = self._call_stage(ctx, "intent_detection", lambda: self._intent_agent.run(ctx.message))
+        self.tracking_agent.log_execution(
+            agent_name="intent_detection",
+            action=f"Détection de l'intention: {ctx.intent_result['intent']}",
+            status="succès",
+            request_id=ctx.request_id
+        )
+        return ctx.intent_result
+
+    def _run_emotion_stage(self, ctx: PipelineContext) -> Dict[str, str]:
+        """Étape 2 : détection de l'émotion."""
+        self.tracking_agent.log_execution(
+            agent_name="emotion_detection",
+            action="Analyse de l'état émotionnel",
+            status="démarrage",
+            request_id=ctx.request_id
+        )
+        ctx.emotion = self._call_stage(ctx, "emotion_detection", lambda: self._emotion_agent.detect_emotion(ctx.message))
+        self.tracking_agent.log_execution(
+            agent_name="emotion_detection",
+            action=f"Détection de l'émotion: {ctx.emotion['emotion']}",
+            status="succès",
+            request_id=ctx.request_id
+        )
+        return ctx.emotion
+
+    def _run_search_stage(self, ctx: PipelineContext,
+                          intent_result: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Étape 3 : recherche d'informations.
+
+        Args:
+            ctx (PipelineContext): Le contexte de la requête
+            intent_result (Optional[Dict[str, Any]]): Intention et slots servant de clé de
+                cache. Passés seulement quand l'étape d'intention est terminée : lancée en
+                parallèle, la recherche utilise la requête normalisée, sans quoi la clé
+                dépendrait de l'ordre d'achèvement des étapes.
+        """
+        self.tracking_agent.log_execution(
+            agent_name="search",
+            action="Recherche d'informations pertinentes",
+            status="démarrage",
+            request_id=ctx.request_id
+        )
+        ctx.search_results = self._call_stage(
+            ctx, "search", lambda: self._search_agent.search(ctx.message, intent_result)
+        )
+        self.tracking_agent.log_execution(
+            agent_name="search",
+            action=f"Recherche terminée: {len(ctx.search_results)} résultats",
+            status="succès",
+            request_id=ctx.request_id
+        )
+        return ctx.search_results
+
+    async def _run_intent_stage_async(self, ctx: PipelineContext) -> Dict[str, Any]:
+        """Étape 1 (asynchrone) : détection de l'intention et des slots."""
+        await self.tracking_agent.log_execution_async(
+            agent_name="intent_detection",
+            action="Détection de l'intention de l'utilisateur",
+            status="démarrage",
+            request_id=ctx.request_id
+        )
+        ctx.intent_result = await self._call_stage_async(
+            ctx, "intent_detection", lambda: self._intent_agent.run_async(ctx.message)
+        )
+        await self.tracking_agent.log_execution_async(
+            agent_name="intent_detection",
+            action=f"Détection de l'intention: {ctx.intent_result['intent']}",
+            status="succès",
+            request_id=ctx.request_id
+        )
+        return ctx.intent_result
+
+    async def _run_emotion_stage_async(self, ctx: PipelineContext) -> Dict[str, str]:
+        """Étape 2 (asynchrone) : détection de l'émotion."""
+        await self.tracking_agent.log_execution_async(
+            agent_name="emotion_detection",
+            action="Analyse de l'état émotionnel",
+            status="démarrage",
+            request_id=ctx.request_id
+        )
+        ctx.emotion = await self._call_stage_async(
+            ctx, "emotion_detection", lambda: self._emotion_agent.detect_emotion_async(ctx.message)
+        )
+        await self.tracking_agent.log_execution_async(
+            agent_name="emotion_detection",
+            action=f"Détection de l'émotion: {ctx.emotion['emotion']}",
+            status="succès",
+            request_id=ctx.request_id
+        )
+        return ctx.emotion
+
+    async def _run_search_stage_async(self, ctx: PipelineContext,
+                                      intent_result: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Étape 3 (asynchrone) : recherche d'informations (voir _run_search_stage)."""
+        await self.tracking_agent.log_execution_async(
+            agent_name="search",
+            action="Recherche d'informations pertinentes",
+            status="démarrage",
+            request_id=ctx.request_id
+        )
+        ctx.search_results = await self._call_stage_async(
+            ctx, "search", lambda: self._search_agent.search_async(ctx.message, intent_result)
+        )
+        await self.tracking_agent.log_execution_async(
+            agent_name="search",
+            action=f"Recherche terminée: {len(ctx.search_results)} résultats",
+            status="succès",
+            request_id=ctx.request_id
+        )
+        return ctx.search_results
 
     def generate_response(self, slots: Dict[str, Any], intent: str) -> str:
         """
@@ -192,17 +699,38 @@ class AgentOrchestrator(BaseAgent):
         """
         return self._response_generator.generate_response(slots, intent)
 
-    def get_conversation_history(self) -> List[Dict[str, str]]:
+    def get_conversation_history(self, session_id: str = DEFAULT_SESSION_ID) -> List[Dict[str, str]]:
+        """
+        Expose l'historique récent d'une session.
+        """
+        return self._memory_for(session_id).get_messages()
+
+    def get_semantic_cache_stats(self) -> Dict[str, Any]:
         """
-        Expose l'historique des conversations stockées.
+        Expose les statistiques du cache sémantique (communes à toutes les sessions),
+        sans construire ni réveiller de session.
         """
-        return self._memory_agent.get_messages()
+        return get_semantic_cache_stats(self._config)
 
-    def clear_memory(self) -> None:
+    def get_session_stats(self) -> Dict[str, Any]:
         """
-        Efface toute la mémoire de l'agent.
+        Expose le nombre de sessions actives et évincées.
         """
-        self._memory_agent.clear_memory()
+        return self._sessions.get_stats()
+
+    def clear_memory(self, session_id: Optional[str] = None, since: Optional[float] = None,
+                     until: Optional[float] = None) -> None:
+        """
+        Efface la mémoire : toute la mémoire, ou seulement une session et/ou une
+        période (voir MemoryAgent.clear_memory). L'état en mémoire vive des sessions
+        concernées est oublié : il est rechargé depuis ChromaDB au message suivant.
+        """
+        memory = self._memory_for(session_id or DEFAULT_SESSION_ID)
+        memory.clear_memory(session_id=session_id, since=since, until=until)
+        if session_id is None:
+            self._sessions.clear()
+        else:
+            self._sessions.discard(session_id)
 
     def _call_mistral_api(self, messages: List[Dict[str, str]]) -> str:
         """
@@ -214,28 +742,7 @@ class AgentOrchestrator(BaseAgent):
         Returns:
             str: Réponse du modèle
         """
-        headers = {
-            "Authorization": f"Bearer {self._api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": "mistral-tiny",
-            "messages": messages,
-            "temperature": self._model_config["temperature"],
-            "max_tokens": self._model_config["max_tokens"]
-        }
-        
-        response = requests.post(
-            f"{self._api_url}/chat/completions",
-            headers=headers,
-            json=data
-        )
-        
-        if response.status_code == 200:
-            return response.json()["choices"][0]["message"]["content"]
-        else:
-            raise Exception(f"Erreur API Mistral: {response.status_code}")
+        return self._llm.complete(messages)
 
     def _extract_info(self, message: str) -> Dict[str, str]:
         """
@@ -0,0 +1,356 @@
+# partitions.py
+"""
+Collection des échanges partitionnée par semaine.
+
+Chaque semaine ISO (UTC) a sa propre collection ChromaDB ("conversations_2026w42") :
+les recherches ne parcourent que les partitions récentes, et l'expiration
+(memory.partitions.retention_weeks) supprime des partitions entières au lieu
+de documents un à un. La collection non partitionnée des versions précédentes
+("conversations") reste lue comme la plus ancienne partition, jusqu'à ce que
+`python manage.py dedup-memory` répartisse ses échanges par semaine.
+
+Le compactage (compact_store) récupère la place libérée sur disque : VACUUM
+de chroma.sqlite3 et suppression des index HNSW des collections supprimées,
+que ChromaDB laisse en place.
+
+Avec plusieurs workers (backend d'état "sqlite"), l'expiration et le compactage
+ne sont exécutés que par le worker qui prend le bail de la période dans le
+backend d'état ; chaque suppression de partitions y publie une génération, et
+les autres workers oublient alors leurs poignées de collection.
+"""
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Callable, List, Optional
+
+from .state_backend import InProcessStateBackend
+
+WEEK = 7 * 24 * 3600
+# Période de vérification des suppressions faites par un autre processus (s)
+REFRESH_INTERVAL = 60.0
+# Répertoires de segments de ChromaDB (index HNSW), nommés par l'UUID du segment
+SEGMENT_DIR_PATTERN = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+def week_bounds(ts: float) -> tuple:
+    """
+    Semaine ISO (UTC) contenant un instant.
+
+    Returns:
+        tuple: (clé "2026w42", début, fin) ; début et fin en timestamp epoch
+    """
+    year, week, _ = datetime.fromtimestamp(ts, timezone.utc).isocalendar()
+    start = datetime.fromisocalendar(year, week, 1).replace(tzinfo=timezone.utc)
+    return f"{year}w{week:02d}", start.timestamp(), (start + timedelta(days=7)).timestamp()
+
+
+class Partition:
+    """Une collection de la partition (bornes None pour l'ancienne collection non partitionnée)."""
+
+    __slots__ = ("name", "start", "end")
+
+    def __init__(self, name: str, start: Optional[float], end: Optional[float]):
+        self.name = name
+        self.start = start
+        self.end = end
+
+    def overlaps(self, since: Optional[float], until: Optional[float]) -> bool:
+        """La partition peut contenir des échanges de [since, until)."""
+        if self.start is None:
+            return True
+        return (since is None or self.end > since) and (until is None or self.start < until)
+
+    def within(self, since: Optional[float], until: Optional[float]) -> bool:
+        """Tous les échanges de la partition sont dans [since, until)."""
+        if self.start is None:
+            return since is None and until is None
+        return (since is None or self.start >= since) and (until is None or self.end <= until)
+
+
+class PartitionedStore:
+    """
+    Partitions hebdomadaires d'une collection, partagées par tous les agents du
+    processus (get_partitioned_store) : poignées de collection et suppressions communes.
+    """
+
+    def __init__(self, client, base_name: str, enabled: bool = True, state=None):
+        """
+        Args:
+            client: Client ChromaDB persistant
+            base_name (str): Nom de la collection non partitionnée (préfixe des partitions)
+            enabled (bool): Partitionner par semaine (sinon une seule collection, base_name)
+            state (StateBackend, optional): État partagé des workers (bail de maintenance,
+                génération des suppressions)
+        """
+        self._client = client
+        self._base_name = base_name
+        self._enabled = enabled
+        self._pattern = re.compile(re.escape(base_name) + r"_(\d{4})w(\d{2})$")
+        self._collections: Dict[str, Any] = {}
+        # Noms des collections existantes (list_collections coûte plusieurs ms par appel)
+        self._names: Optional[set] = None
+        self._lock = threading.Lock()
+        self._maintenance = None
+        self._state = state
+        self._generation_key = f"partitions:{base_name}:generation"
+        self._generation = state.get(self._generation_key) if state is not None else None
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def partition_name(self, ts: float) -> str:
+        """Nom de la partition d'un échange daté de `ts`."""
+        if not self._enabled:
+            return self._base_name
+        return f"{self._base_name}_{week_bounds(ts)[0]}"
+
+    def partitions(self, since: Optional[float] = None, until: Optional[float] = None) -> List[Partition]:
+        """
+        Partitions existantes pouvant contenir des échanges de [since, until),
+        de la plus récente à la plus ancienne (l'ancienne collection non partitionnée en dernier).
+        """
+        partitions = []
+        legacy = None
+        for name in self._list_names():
+            if name == self._base_name:
+                legacy = Partition(name, None, None)
+                continue
+            match = self._pattern.match(name) if self._enabled else None
+            if match:
+                start = datetime.fromisocalendar(int(match.group(1)), int(match.group(2)), 1)
+                start = start.replace(tzinfo=timezone.utc).timestamp()
+                partitions.append(Partition(name, start, start + WEEK))
+        partitions.sort(key=lambda partition: partition.start, reverse=True)
+        if legacy is not None:
+            partitions.append(legacy)
+        elif not self._enabled:
+            partitions.append(Partition(self._base_name, None, None))
+        return [partition for partition in partitions if partition.overlaps(since, until)]
+
+    def _list_names(self) -> List[str]:
+        with self._lock:
+            if self._names is None:
+                self._names = {
+                    collection if isinstance(collection, str) else collection.name
+                    for collection in self._client.list_collections()
+                }
+            return list(self._names)
+
+    def refresh(self) -> None:
+        """Oublie les collections connues (partitions créées ou supprimées par un autre processus)."""
+        with self._lock:
+            self._names = None
+            self._collections.clear()
+
+    def collection(self, name: str):
+        """Collection d'une partition (créée si besoin)."""
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = self._client.get_or_create_collection(name=name, metadata={"hnsw:space": "cosine"})
+                self._collections[name] = collection
+                if self._names is not None:
+                    self._names.add(name)
+            return collection
+
+    def collection_for(self, ts: float):
+        """Collection de la partition d'un échange daté de `ts`."""
+        return self.collection(self.partition_name(ts))
+
+    def upsert(self, turns: List[tuple], embed: Callable[[List[str]], List[Any]]) -> None:
+        """
+        Écrit des échanges (id, document, métadonnées) dans la partition de leur
+        semaine. Un échange déjà stocké dans cette partition n'est ni recalculé ni
+        réindexé : seules ses métadonnées (date) sont mises à jour.
+
+        Args:
+            turns (List[tuple]): Les échanges ; métadonnées datées par leur champ "ts"
+            embed (Callable): Calcule les vecteurs des documents ajoutés
+        """
+        # Doublons du lot : le dernier l'emporte
+        latest = {turn[0]: turn for turn in turns}
+        by_partition: Dict[str, List[tuple]] = {}
+        for turn in latest.values():
+            by_partition.setdefault(self.partition_name(turn[2]["ts"]), []).append(turn)
+
+        for name, partition_turns in by_partition.items():
+            collection = self.collection(name)
+            existing = set(collection.get(ids=[turn[0] for turn in partition_turns], include=[])["ids"])
+            updated = [turn for turn in partition_turns if turn[0] in existing]
+            added = [turn for turn in partition_turns if turn[0] not in existing]
+            if updated:
+                collection.update(
+                    ids=[turn[0] for turn in updated],
+                    metadatas=[turn[2] for turn in updated]
+                )
+            if added:
+                documents = [turn[1] for turn in added]
+                collection.add(
+                    ids=[turn[0] for turn in added],
+                    documents=documents,
+                    metadatas=[turn[2] for turn in added],
+                    embeddings=embed(documents)
+                )
+
+    def count(self) -> int:
+        """Nombre total d'échanges."""
+        return sum(self.collection(partition.name).count() for partition in self.partitions())
+
+    def drop(self, names: List[str]) -> None:
+        """
+        Supprime des partitions entières. Une nouvelle génération est publiée dans
+        l'état partagé : les autres processus oublient leurs poignées (sync).
+        """
+        if not names:
+            return
+        with self._lock:
+            for name in names:
+                self._collections.pop(name, None)
+                if self._names is not None:
+                    self._names.discard(name)
+                try:
+                    self._client.delete_collection(name)
+                except Exception as e:
+                    print(f"Erreur lors de la suppression de la partition {name}: {e}")
+            if self._state is not None:
+                self._generation = f"{os.getpid()}:{time.time()}"
+                self._state.set(self._generation_key, self._generation)
+
+    def sync(self) -> bool:
+        """
+        Oublie les collections connues si un autre processus a supprimé des partitions
+        depuis la dernière vérification.
+
+        Returns:
+            bool: Les poignées ont été oubliées
+        """
+        if self._state is None:
+            return False
+        generation = self._state.get(self._generation_key)
+        if generation == self._generation:
+            return False
+        self.refresh()
+        self._generation = generation
+        return True
+
+    def drop_all(self) -> None:
+        """Supprime toutes les partitions (la collection non partitionnée comprise)."""
+        self.drop([partition.name for partition in self.partitions()])
+
+    def enforce_retention(self, retention_weeks: Optional[float], now: Optional[float] = None) -> List[str]:
+        """
+        Supprime les partitions entièrement plus anciennes que l'horizon de rétention ;
+        dans l'ancienne collection non partitionnée, les échanges expirés sont supprimés un à un.
+
+        Args:
+            retention_weeks (float, optional): Horizon en semaines (None : pas d'expiration)
+            now (float, optional): Instant de référence (par défaut maintenant)
+
+        Returns:
+            List[str]: Les partitions supprimées
+        """
+        if not retention_weeks:
+            return []
+        horizon = (now if now is not None else time.time()) - retention_weeks * WEEK
+        expired = [partition.name for partition in self.partitions(until=horizon)
+                   if partition.start is not None and partition.end <= horizon]
+        self.drop(expired)
+        if self._enabled and self._base_name in self._list_names():
+            self.collection(self._base_name).delete(where={"ts": {"$lt": horizon}})
+        return expired
+
+    def start_maintenance(self, persist_directory: str, retention_weeks: Optional[float],
+                          interval: float, tasks: Optional[List[Callable[[], Any]]] = None) -> None:
+        """
+        Lance (une fois par processus) la tâche de fond d'expiration et de compactage,
+        exécutée toutes les `interval` secondes par un seul des processus : celui qui
+        prend le bail de la période dans l'état partagé. Chaque processus vérifie en
+        outre toutes les REFRESH_INTERVAL secondes les suppressions faites par les autres.
+
+        Args:
+            tasks (List[Callable], optional): Suppressions supplémentaires de la période
+                (exécutées avant le compactage, qui récupère leur place)
+        """
+        with self._lock:
+            if self._maintenance is not None or not interval:
+                return
+            self._maintenance = threading.Thread(
+                target=self._run_maintenance, args=(persist_directory, retention_weeks, interval, tasks or []),
+                name=f"partition-maintenance-{self._base_name}", daemon=True
+            )
+        self._maintenance.start()
+
+    def _run_maintenance(self, persist_directory: str, retention_weeks: Optional[float], interval: float,
+                         tasks: List[Callable[[], Any]]) -> None:
+        state = self._state if self._state is not None else InProcessStateBackend()
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        lease_key = f"partitions:{self._base_name}:maintenance"
+        # La période en cours est réservée au démarrage : première exécution après `interval`
+        state.acquire_lease(lease_key, owner, interval)
+        while True:
+            time.sleep(min(interval, REFRESH_INTERVAL))
+            try:
+                self.sync()
+                if state.acquire_lease(lease_key, owner, interval):
+                    self.enforce_retention(retention_weeks)
+                    for task in tasks:
+                        task()
+                    compact_store(persist_directory)
+            except Exception as e:
+                print(f"Erreur lors de la maintenance des partitions: {e}")
+
+
+def store_size(persist_directory: str) -> int:
+    """Taille sur disque (octets) d'une base ChromaDB."""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(persist_directory) for name in names
+    )
+
+
+def compact_store(persist_directory: str, timeout: float = 5.0) -> Dict[str, Any]:
+    """
+    Récupère la place libérée par les suppressions : index HNSW des collections
+    supprimées, puis VACUUM de chroma.sqlite3 (attend au plus `timeout` secondes un accès exclusif).
+    Seuls les répertoires nommés comme un segment (UUID) sont supprimés ; les autres
+    répertoires de persist_directory ne sont pas touchés.
+
+    Returns:
+        Dict[str, Any]: {"size_before", "size_after", "removed_segments"} (tailles en octets)
+    """
+    size_before = store_size(persist_directory)
+    database = os.path.join(persist_directory, "chroma.sqlite3")
+    # Répertoires listés avant de lire les segments : un segment créé entre-temps est déjà enregistré
+    directories = [name for name in os.listdir(persist_directory)
+                   if SEGMENT_DIR_PATTERN.match(name) and os.path.isdir(os.path.join(persist_directory, name))]
+    connection = sqlite3.connect(database, timeout=timeout)
+    try:
+        segments = {row[0] for row in connection.execute("SELECT id FROM segments")}
+        removed = [name for name in directories if name not in segments]
+        for name in removed:
+            shutil.rmtree(os.path.join(persist_directory, name), ignore_errors=True)
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+    return {"size_before": size_before, "size_after": store_size(persist_directory), "removed_segments": len(removed)}
+
+
+_registry_lock = threading.Lock()
+_stores: Dict[tuple, PartitionedStore] = {}
+
+
+def get_partitioned_store(client, persist_directory: str, base_name: str, enabled: bool,
+                          state=None) -> PartitionedStore:
+    """Retourne le magasin partitionné partagé pour cette base et cette collection."""
+    key = (os.path.abspath(persist_directory), base_name, enabled)
+    with _registry_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = PartitionedStore(client, base_name, enabled, state)
+            _stores[key] = store
+        return store
@@ -0,0 +1,56 @@
+# pipeline_context.py
+"""
+Contexte d'une requête traitée par l'orchestrateur.
+
+Tout ce que produit une requête (intention, émotion, résultats de recherche,
+échange en cours, réponse) vit dans son PipelineContext, transmis explicitement
+d'une étape à l'autre : l'orchestrateur et les agents, partagés par les requêtes
+concurrentes, ne gardent aucun état propre à une requête. Les étapes tracées
+portent le request_id du contexte.
+
+Le contexte garde aussi les résultats des étapes terminées : sur rate limit,
+seule l'étape en échec est rejouée (voir AgentOrchestrator._call_stage).
+"""
+import uuid
+from typing import Dict, Any, List, Optional
+
+from .conversation_schema import DEFAULT_SESSION_ID
+
+
+def new_request_id() -> str:
+    """Identifiant court et unique d'une requête."""
+    return uuid.uuid4().hex[:12]
+
+
+class PipelineContext:
+    """État d'une requête, du message reçu à la réponse enregistrée."""
+
+    __slots__ = (
+        "request_id", "session_id", "message", "memory",
+        "intent_result", "emotion", "search_results", "threshold", "turn", "history", "response", "retries"
+    )
+
+    def __init__(self, message: str, session_id: str = DEFAULT_SESSION_ID, memory: Any = None,
+                 request_id: Optional[str] = None):
+        """
+        Args:
+            message (str): Le message utilisateur
+            session_id (str): La session (conversation) du message
+            memory (MemoryAgent, optional): L'agent de mémoire de la session
+            request_id (str, optional): Identifiant de la requête (généré par défaut)
+        """
+        self.request_id = request_id or new_request_id()
+        self.session_id = session_id
+        self.message = message
+        self.memory = memory
+        self.intent_result: Optional[Dict[str, Any]] = None
+        self.emotion: Optional[Dict[str, str]] = None
+        self.search_results: Optional[List[Dict[str, Any]]] = None
+        self.threshold: Optional[Dict[str, Any]] = None
+        # Échange préparé par l'étape mémoire (MemoryAgent.prepare_turn), enregistré avec la réponse
+        self.turn: Optional[Dict[str, Any]] = None
+        # Contexte de conversation (résumé glissant puis derniers messages) donné à la génération de la réponse
+        self.history: List[Dict[str, str]] = []
+        self.response: Optional[str] = None
+        # Nouvelles tentatives par étape après un rate limit (seul l'appel de l'étape est rejoué)
+        self.retries: Dict[str, int] = {}
@@ -1,5 +1,5 @@
 from .base_agent import BaseAgent
-import requests
+from .llm_client import RateLimitError
 from typing import Dict, Any, List, Optional
 import json
 import re
@@ -11,75 +11,118 @@ class ResponseGeneratorAgent(BaseAgent):
     
     def __init__(self, name: str = "response"):
         super().__init__(name)
-        self._model_config = self._config["model"]
-        self._api_key = self._model_config["api_key"]
-        self._api_url = self._model_config["api_url"]
         
-    def generate_response(self, message: str, emotion: str, intent: str, slots: Dict[str, Any], search_results: List[Dict[str, Any]] = None) -> str:
+    def generate_response(self, message: str, emotion: str, intent: str, slots: Dict[str, Any], search_results: List[Dict[str, Any]] = None,
+                          history: List[Dict[str, str]] = None) -> str:
         """
         Génère une réponse finale basée sur les informations disponibles.
+        `history` est le contexte de la conversation (MemoryAgent.get_prompt_context) :
+        résumé glissant puis derniers messages de la session.
         """
         try:
-            if intent == "restaurant_search":
-                prompt = [
-                    {"role": "system", "content": """Vous êtes un assistant touristique qui aide les utilisateurs à trouver des restaurants.
-                    Votre tâche est de fournir une réponse utile et informative basée sur les informations disponibles.
-                    
-                    Instructions:
-                    1. Si vous avez des informations vérifiées sur des restaurants, mentionnez-les en priorité
-                    2. Pour chaque restaurant mentionné, incluez :
-                       - Le nom exact
-                       - L'adresse (si disponible)
-                       - Les horaires d'ouverture (si disponibles)
-                       - Le budget moyen (si disponible)
-                    3. Si vous n'avez pas toutes les informations pour un restaurant mais que vous avez des informations partielles fiables, vous pouvez les mentionner en précisant ce qui est vérifié
-                    4. Si vous n'avez pas d'informations vérifiées sur des restaurants spécifiques :
-                       - Suggérez des sources fiables pour trouver l'information (sites web officiels, etc.)
-                       - Proposez des alternatives (autres jours, autres quartiers, etc.)
-                       - Demandez des précisions si nécessaire
-                    5. Adaptez votre ton à l'émotion de l'utilisateur
-                    6. Soyez concis mais informatif
-                    7. Terminez par une question ouverte ou une suggestion d'action"""},
-                    {"role": "user", "content": f"""
-                    Message: {message}
-                    Émotion: {emotion}
-                    Intention: {intent}
-                    Informations disponibles:
-                    - Localisation: {slots.get('location')}
-                    - Type de cuisine: {slots.get('food_type')}
-                    - Budget: {slots.get('budget')}
-                    
-                    Résultats de recherche web:
-                    {json.dumps(search_results, indent=2) if search_results else "Aucun résultat de recherche disponible"}
-                    
-                    Génère une réponse utile basée sur les informations disponibles."""}
-                ]
-            else:
-                prompt = [
-                    {"role": "system", "content": """Vous êtes un assistant touristique qui aide les utilisateurs.
-                    Votre tâche est de fournir une réponse finale basée sur les informations disponibles.
-                    
-                    Instructions:
-                    1. Soyez concis et direct
-                    2. Ne faites pas de suppositions
-                    3. Si des informations sont manquantes, demandez-les
-                    4. Terminez par une question ouverte"""},
-                    {"role": "user", "content": f"""
-                    Message: {message}
-                    Émotion: {emotion}
-                    Intention: {intent}
-                    Informations disponibles:
-                    {self._format_known_slots(slots)}
-                    
-                    Génère une réponse appropriée."""}
-                ]
-            
+            prompt = self._build_response_prompt(message, emotion, intent, slots, search_results, history)
             response = self._get_llm_response(prompt)
             return response.strip()
             
+        except RateLimitError:
+            # Quota dépassé : l'orchestrateur réessaie l'étape
+            raise
+        except Exception:
+            return "Désolé, je n'ai pas pu générer une réponse appropriée. Veuillez réessayer."
+
+    async def generate_response_async(self, message: str, emotion: str, intent: str, slots: Dict[str, Any], search_results: List[Dict[str, Any]] = None,
+                                      history: List[Dict[str, str]] = None) -> str:
+        """
+        Version asynchrone de generate_response.
+        """
+        try:
+            prompt = self._build_response_prompt(message, emotion, intent, slots, search_results, history)
+            response = await self._get_llm_response_async(prompt)
+            return response.strip()
+            
+        except RateLimitError:
+            raise
         except Exception:
             return "Désolé, je n'ai pas pu générer une réponse appropriée. Veuillez réessayer."
 
+    def _build_response_prompt(self, message: str, emotion: str, intent: str, slots: Dict[str, Any], search_results: List[Dict[str, Any]] = None,
+                               history: List[Dict[str, str]] = None) -> List[Dict[str, str]]:
+        """
+        Construit le prompt de génération de la réponse finale.
+        Le résumé de la conversation complète le message système ; les derniers
+        messages de la session précèdent le message courant.
+        """
+        if intent == "restaurant_search":
+            prompt = [
+                {"role": "system", "content": """Vous êtes un assistant touristique qui aide les utilisateurs à trouver des restaurants.
+                Votre tâche est de fournir une réponse utile et informative basée sur les informations disponibles.
+                
+                Instructions:
+                1. Si vous avez des informations vérifiées sur des restaurants, mentionnez-les en priorité
+                2. Pour chaque restaurant mentionné, incluez :
+                   - Le nom exact
+                   - L'adresse (si disponible)
+                   - Les horaires d'ouverture (si disponibles)
+                   - Le budget moyen (si disponible)
+                3. Si vous n'avez pas toutes les informations pour un restaurant mais que vous avez des informations partielles fiables, vous pouvez les mentionner en précisant ce qui est vérifié
+                4. Si vous n'avez pas d'informations vérifiées sur des restaurants spécifiques :
+                   - Suggérez des sources fiables pour trouver l'information (sites web officiels, etc.)
+                   - Proposez des alternatives (autres jours, autres quartiers, etc.)
+                   - Demandez des précisions si nécessaire
+                5. Adaptez votre ton à l'émotion de l'utilisateur
+                6. Soyez concis mais informatif
+                7. Terminez par une question ouverte ou une suggestion d'action"""},
+                {"role": "user", "content": f"""
+                Message: {message}
+                Émotion: {emotion}
+                Intention: {intent}
+                Informations disponibles:
+                - Localisation: {slots.get('location')}
+                - Type de cuisine: {slots.get('food_type')}
+                - Budget: {slots.get('budget')}
+                
+                Résultats de recherche web:
+                {json.dumps(search_results, indent=2) if search_results else "Aucun résultat de recherche disponible"}
+                
+                Génère une réponse utile basée sur les informations disponibles."""}
+            ]
+        else:
+            prompt = [
+                {"role": "system", "content": """Vous êtes un assistant touristique qui aide les utilisateurs.
+                Votre tâche est de fournir une réponse finale basée sur les informations disponibles.
+                
+                Instructions:
+                1. Soyez concis et direct
+                2. Ne faites pas de suppositions
+                3. Si des informations sont manquantes, demandez-les
+                4. Terminez par une question ouverte"""},
+                {"role": "user", "content": f"""
+                Message: {message}
+                Émotion: {emotion}
+                Intention: {intent}
+                Informations disponibles:
+                {self._format_known_slots(slots)}
+                
+                Génère une réponse appropriée."""}
+            ]
+        return self._with_history(prompt, history)
+
+    @staticmethod
+    def _with_history(prompt: List[Dict[str, str]], history: Optional[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        """
+        Insère le contexte de conversation dans un prompt [système, utilisateur] : le
+        résumé (message système du contexte) est ajouté au message système, les
+        messages récents sont placés avant le message utilisateur.
+        """
+        if not history:
+            return prompt
+        system, user = prompt
+        summaries = [entry["content"] for entry in history if entry["role"] == "system"]
+        if summaries:
+            system = {"role": "system", "content": "\n\n".join([system["content"]] + summaries)}
+        turns = [entry for entry in history if entry["role"] != "system"]
+        return [system] + turns + [user]
+
     def generate_question(self, missing_slots: List[str], filled_slots: Dict[str, Any], message: str, emotion: str) -> str:
         """
         Génère une question naturelle pour obtenir les informations manquantes.
@@ -176,33 +219,29 @@ class ResponseGeneratorAgent(BaseAgent):
             str: La réponse du LLM
         """
         try:
-            headers = {
-                "Authorization": f"Bearer {self._api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": "mistral-tiny",
-                "messages": prompt,
-                "temperature": self._model_config["temperature"],
-                "max_tokens": self._model_config["max_tokens"]
-            }
-            
-            response = requests.post(
-                f"{self._api_url}/chat/completions",
-                headers=headers,
-                json=data
-            )
-            
-            if response.status_code == 200:
-                return response.json()["choices"][0]["message"]["content"]
-            else:
-                raise Exception(f"Erreur API Mistral: {response.status_code}")
+            return self._llm.complete(prompt)
                 
         except Exception as e:
             print(f"Erreur lors de l'appel à l'API Mistral: {e}")
             raise
+
+    async def _get_llm_response_async(self, prompt: List[Dict[str, str]]) -> str:
+        """
+        Version asynchrone de _get_llm_response (client HTTP non bloquant).
         
+        Args:
+            prompt (List[Dict[str, str]]): Le prompt à envoyer au LLM
+            
+        Returns:
+            str: La réponse du LLM
+        """
+        try:
+            return await self._llm.complete_async(prompt)
+                
+        except Exception as e:
+            print(f"Erreur lors de l'appel à l'API Mistral: {e}")
+            raise
+
     def run(self, message: str, emotions: List[str], context: Optional[Dict] = None) -> str:
         """
         Génère une réponse en fonction du message et des émotions.
@@ -1,9 +1,21 @@
 # search_agent.py
 
 import json
-import requests
+from urllib.parse import quote_plus
 from .base_agent import BaseAgent
-from typing import Dict, Any, List
+from .llm_client import RateLimitError, get_http_transport
+from .cache import get_cache, make_cache_key
+from .text_utils import normalize_query, normalize_value
+from .slot_extractor import get_slot_extractor
+from typing import Dict, Any, List, Optional
+
+# Slots utilisés pour la clé de cache, avec leurs noms alternatifs produits par le LLM
+CACHE_KEY_SLOTS = {
+    "location": ("location", "city", "ville", "lieu"),
+    "food_type": ("food_type", "type", "cuisine"),
+    "budget": ("budget", "price", "prix"),
+    "time": ("time", "date", "moment")
+}
 
 class SearchAgent(BaseAgent):
     """
@@ -14,58 +26,171 @@ class SearchAgent(BaseAgent):
 
     def __init__(self, name: str = "search"):
         super().__init__(name)
-        self._search_config = self._config.get("search", {})
+        self._transport = get_http_transport(self._config)
+
+        # Cache des résultats (mémoire LRU + SQLite), clé sur la requête normalisée ou les slots
+        cache_config = self._config.get("cache", {}).get("search", {})
+        self._cache = get_cache("search", cache_config) if cache_config.get("enabled", False) else None
+
+    @property
+    def _search_config(self) -> Dict[str, Any]:
+        """Paramètres courants de l'API de recherche (section "search", rechargée à chaud)."""
+        return self._config.get("search", {})
 
-    def search(self, query: str) -> List[Dict[str, Any]]:
+    def search(self, query: str, intent_result: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Effectue une recherche web et retourne les résultats.
         
         Args:
             query (str): La requête de recherche
+            intent_result (Optional[Dict[str, Any]]): Intention et slots déjà détectés,
+                utilisés pour la clé de cache lorsqu'ils sont disponibles
             
         Returns:
             List[Dict[str, Any]]: Liste des résultats de recherche
         """
-        return self.search_web(query)
+        key = self._cache_key(query, intent_result)
+        if key is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+        results = self.search_web(query)
+        # Seuls des résultats réels sont mis en cache ; le secours est recalculé à chaque échec
+        if key is not None and results:
+            self._cache.set(key, results)
+        return results or self._get_fallback_results(query)
 
-    def search_web(self, query: str) -> List[Dict[str, Any]]:
+    def search_web(self, query: str) -> Optional[List[Dict[str, Any]]]:
         """
         Méthode interne pour effectuer la recherche web.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Les résultats valides (éventuellement aucun),
+            ou None si l'API a échoué (les résultats de secours ne sont pas mis en cache)
+
+        Raises:
+            RateLimitError: si l'API répond 429 (l'orchestrateur réessaie l'étape)
         """
         try:
             if not self._search_config.get("api_key") or not self._search_config.get("url"):
-                return self._get_fallback_results(query)
+                return None
 
-            response = requests.post(
+            status, data = self._transport.post_json(
                 self._search_config.get("url", ""),
-                json={
-                    "api_key": self._search_config.get("api_key", ""),
-                    "query": query,
-                    "search_depth": "advanced",
-                    "include_answer": True
-                },
-                timeout=15
+                self._build_payload(query),
+                timeout=self._search_config.get("timeout", 15),
+                service="tavily"
             )
             
-            response.raise_for_status()
-            data = response.json()
+            if status == 429:
+                raise RateLimitError("tavily")
+            if status != 200:
+                raise Exception(f"Erreur API de recherche: {status}")
+            return self._extract_results(data)
+
+        except RateLimitError:
+            raise
+        except Exception:
+            return None
+
+    async def search_async(self, query: str, intent_result: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Version asynchrone de search.
+        
+        Args:
+            query (str): La requête de recherche
+            intent_result (Optional[Dict[str, Any]]): Intention et slots déjà détectés
             
-            results = []
-            for r in data.get("results", []):
-                if self._is_valid_result(r):
-                    results.append({
-                        "title": r.get("title", ""),
-                        "snippet": r.get("content", ""),
-                        "url": r.get("url", ""),
-                        "score": r.get("score", 0)
-                    })
-                    if len(results) >= 3:
-                        break
-                        
-            return results if results else self._get_fallback_results(query)
+        Returns:
+            List[Dict[str, Any]]: Liste des résultats de recherche
+        """
+        key = self._cache_key(query, intent_result)
+        if key is not None:
+            # Le niveau disque (SQLite) est lu et écrit hors de la boucle d'événements
+            cached = await self._cache.get_async(key)
+            if cached is not None:
+                return cached
+        results = await self.search_web_async(query)
+        # Seuls des résultats réels sont mis en cache ; le secours est recalculé à chaque échec
+        if key is not None and results:
+            await self._cache.set_async(key, results)
+        return results or self._get_fallback_results(query)
 
+    async def search_web_async(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Version asynchrone de search_web (client HTTP non bloquant).
+        """
+        try:
+            if not self._search_config.get("api_key") or not self._search_config.get("url"):
+                return None
+
+            status, data = await self._transport.post_json_async(
+                self._search_config.get("url", ""),
+                self._build_payload(query),
+                timeout=self._search_config.get("timeout", 15),
+                service="tavily"
+            )
+            
+            if status == 429:
+                raise RateLimitError("tavily")
+            if status != 200:
+                raise Exception(f"Erreur API de recherche: {status}")
+            return self._extract_results(data)
+
+        except RateLimitError:
+            raise
         except Exception:
-            return self._get_fallback_results(query)
+            return None
+
+    def _build_payload(self, query: str) -> Dict[str, Any]:
+        """Corps de la requête envoyée à l'API de recherche."""
+        return {
+            "api_key": self._search_config.get("api_key", ""),
+            "query": query,
+            "search_depth": "advanced",
+            "include_answer": True
+        }
+
+    def _cache_key(self, query: str, intent_result: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Clé de cache d'une recherche.
+        Si les slots sont connus et qu'un lieu est renseigné, la clé porte sur
+        (intent, location, food_type, budget, time) ; sinon sur la requête normalisée
+        (minuscules, sans accents, ponctuation ni mots vides).
+
+        Returns:
+            Optional[str]: La clé, ou None si le cache est désactivé
+        """
+        if self._cache is None:
+            return None
+        if intent_result:
+            slots = intent_result.get("slots") or {}
+            values = {}
+            for slot, aliases in CACHE_KEY_SLOTS.items():
+                value = next((slots[alias] for alias in aliases if slots.get(alias)), "")
+                values[slot] = normalize_value(value)
+            if values["location"]:
+                return make_cache_key("slots", intent_result.get("intent", ""), values)
+        return make_cache_key("query", normalize_query(query))
+
+    def _extract_results(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Filtre et formate les résultats bruts de l'API de recherche.
+        Retourne une liste vide si aucun résultat n'est valide.
+        """
+        results = []
+        for r in data.get("results", []):
+            if self._is_valid_result(r):
+                results.append({
+                    "title": r.get("title", ""),
+                    "snippet": r.get("content", ""),
+                    "url": r.get("url", ""),
+                    "score": r.get("score", 0)
+                })
+                if len(results) >= 3:
+                    break
+                    
+        return results
 
     def run(self, prompt: str) -> Dict[str, Any]:
         """
@@ -120,24 +245,27 @@ class SearchAgent(BaseAgent):
         """
         Génère des résultats de secours plus détaillés en cas d'échec.
         """
-        location = ""
-        budget = ""
-        day = ""
-        
-        if "dijon" in query.lower():
-            location = "Dijon"
-        if "pas cher" in query.lower() or "pas trop cher" in query.lower():
+        extractor = get_slot_extractor()
+        slots = extractor.extract(query) if extractor else {}
+        location = slots.get("location", "")
+        budget = slots.get("budget", "")
+        if budget == "pas cher":
             budget = "budget modéré"
-        if "lundi" in query.lower():
-            day = "lundi"
+        elif budget:
+            budget = f"budget {budget}"
+        day = slots.get("time", "")
+        place = f"à {location}" if location else "dans la ville"
+        details = "".join(part for part in (f" pour {day}" if day else "", f" avec un {budget}" if budget else ""))
+        url = (f"https://www.tripadvisor.fr/Search?q={quote_plus('restaurants ' + location)}"
+               if location else "https://www.tripadvisor.fr/")
             
         return [{
             "title": "Recherche de restaurant",
-            "snippet": f"""Je recherche des restaurants à {location} {f'pour {day}' if day else ''} {f'avec un {budget}' if budget else ''}.
+            "snippet": f"""Je recherche des restaurants {place}{details}.
             Je vous suggère de :
-            1. Consulter le site de l'Office de Tourisme de Dijon
+            1. Consulter le site de l'Office de Tourisme {f'de {location}' if location else 'local'}
             2. Vérifier les horaires d'ouverture sur les sites des restaurants
             3. Contacter directement les établissements pour confirmer les informations""",
-            "url": "https://www.destinationdijon.com/",
+            "url": url,
             "score": 0.4
-        }]
\ No newline at end of file
+        }]
@@ -0,0 +1,191 @@
+# session_manager.py
+"""
+État de conversation par session.
+
+Chaque session (champ session_id de /chat) a son propre agent de mémoire :
+fenêtre de messages, résumé glissant, échange en cours et slots. Les sessions
+sont gardées dans un LRU borné en nombre (max_sessions) et en mémoire
+(max_memory_mb) ; une session inactive depuis idle_timeout secondes est évincée.
+Une session épinglée par une requête en cours (get(pin=True) jusqu'à release)
+n'est jamais évincée : une autre requête de la même session ne reconstruit pas
+un second état en parallèle.
+
+Une session évincée n'est pas perdue : ses échanges sont dans ChromaDB, marqués
+par leur session_id, et sa fenêtre est rechargée à son prochain message (le
+résumé glissant, lui, repart de zéro).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional
+
+DEFAULT_MAX_SESSIONS = 1000
+DEFAULT_IDLE_TIMEOUT = 1800
+
+
+class SessionManager:
+    """
+    LRU thread-safe des sessions actives, construites à la demande par `factory`.
+    La taille d'une session est remesurée à chacun de ses accès.
+    """
+
+    def __init__(self, factory: Callable[[str], Any], max_sessions: Optional[int] = DEFAULT_MAX_SESSIONS,
+                 idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT, max_memory_bytes: Optional[int] = None,
+                 size_of: Optional[Callable[[Any], int]] = None):
+        """
+        Args:
+            factory (Callable[[str], Any]): Construit l'état d'une session à partir de son ID
+            max_sessions (int, optional): Nombre maximal de sessions gardées (None : sans limite)
+            idle_timeout (float, optional): Durée d'inactivité avant éviction, en secondes (None : jamais)
+            max_memory_bytes (int, optional): Mémoire totale des sessions gardées (None : sans limite)
+            size_of (Callable[[Any], int], optional): Taille d'une session en octets
+                (par défaut sa méthode memory_usage)
+        """
+        self._factory = factory
+        self._max_sessions = max_sessions
+        self._idle_timeout = idle_timeout
+        self._max_memory_bytes = max_memory_bytes
+        self._size_of = size_of or (lambda session: session.memory_usage())
+        # ID -> [session, dernier accès (time.monotonic), taille, requêtes en cours] ;
+        # de la moins à la plus récemment utilisée
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "created": 0,
+            "hits": 0,
+            "evicted_idle": 0,
+            "evicted_capacity": 0,
+            "evicted_memory": 0,
+            "discarded": 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get(self, session_id: str, pin: bool = False) -> Any:
+        """
+        Retourne l'état de la session, construit au premier accès (ou après éviction).
+
+        Args:
+            session_id (str): L'ID de la session
+            pin (bool): Épingler la session jusqu'à l'appel de release (requête en cours)
+
+        Returns:
+            Any: L'état de la session
+        """
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._stats["hits"] += 1
+                entry[3] += pin
+                return self._touch(session_id, entry)
+
+        # Construction hors du verrou (lecture de la fenêtre récente dans ChromaDB) ; si un autre
+        # thread a construit la même session entre-temps, c'est son état qui est gardé
+        session = self._factory(session_id)
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                entry = [session, 0.0, 0, 0]
+                self._sessions[session_id] = entry
+                self._stats["created"] += 1
+            else:
+                self._stats["hits"] += 1
+            entry[3] += pin
+            return self._touch(session_id, entry)
+
+    def release(self, session_id: str, session: Any) -> None:
+        """
+        Libère une session épinglée par get(pin=True) à la fin de la requête ; sa
+        taille est remesurée. Sans effet si la session a été oubliée entre-temps
+        (discard, clear), y compris si un nouvel état l'a remplacée.
+        """
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or entry[0] is not session or not entry[3]:
+                return
+            entry[3] -= 1
+            self._touch(session_id, entry)
+
+    def _touch(self, session_id: str, entry: list) -> Any:
+        """Marque la session comme la plus récente, remesure sa taille puis évince (verrou tenu)."""
+        self._sessions.move_to_end(session_id)
+        entry[1] = time.monotonic()
+        size = self._size_of(entry[0])
+        self._memory_bytes += size - entry[2]
+        entry[2] = size
+        self._evict(keep=session_id)
+        return entry[0]
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """
+        Évince les sessions inactives, puis les moins récentes au-delà des limites (verrou tenu).
+        Les sessions épinglées et `keep` ne sont pas évincées, quitte à dépasser les limites.
+        """
+        if self._idle_timeout is not None:
+            deadline = time.monotonic() - self._idle_timeout
+            # Les sessions sont rangées par dernier accès : les inactives sont en tête
+            for session_id, entry in list(self._sessions.items()):
+                if entry[1] > deadline:
+                    break
+                if session_id != keep and not entry[3]:
+                    self._remove(session_id, "evicted_idle")
+        while self._max_sessions is not None and len(self._sessions) > self._max_sessions:
+            if not self._remove_oldest(keep, "evicted_capacity"):
+                break
+        while (self._max_memory_bytes is not None and self._memory_bytes > self._max_memory_bytes
+               and len(self._sessions) > 1):
+            if not self._remove_oldest(keep, "evicted_memory"):
+                break
+
+    def _remove_oldest(self, keep: Optional[str], reason: str) -> bool:
+        """Évince la moins récente des sessions évinçables ; False s'il n'y en a aucune (verrou tenu)."""
+        for session_id, entry in self._sessions.items():
+            if session_id != keep and not entry[3]:
+                self._remove(session_id, reason)
+                return True
+        return False
+
+    def _remove(self, session_id: str, reason: str) -> None:
+        entry = self._sessions.pop(session_id)
+        self._memory_bytes -= entry[2]
+        self._stats[reason] += 1
+
+    def discard(self, session_id: str) -> bool:
+        """
+        Oublie l'état d'une session (après effacement de ses échanges) ; il sera
+        reconstruit depuis ChromaDB à son prochain message.
+
+        Returns:
+            bool: La session était active
+        """
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._remove(session_id, "discarded")
+            return True
+
+    def clear(self) -> None:
+        """Oublie toutes les sessions actives."""
+        with self._lock:
+            self._stats["discarded"] += len(self._sessions)
+            self._sessions.clear()
+            self._memory_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Sessions actives, créées et évincées (par motif), mémoire occupée."""
+        with self._lock:
+            self._evict()
+            stats = dict(self._stats)
+            stats["active"] = len(self._sessions)
+            stats["pinned"] = sum(1 for entry in self._sessions.values() if entry[3])
+            stats["memory_bytes"] = self._memory_bytes
+        stats["evicted"] = stats["evicted_idle"] + stats["evicted_capacity"] + stats["evicted_memory"]
+        stats["max_sessions"] = self._max_sessions
+        stats["max_memory_bytes"] = self._max_memory_bytes
+        stats["idle_timeout"] = self._idle_timeout
+        return stats
@@ -0,0 +1,235 @@
+# short_term_memory.py
+"""
+Mémoire à court terme de taille fixe.
+
+Les derniers messages sont gardés dans un tampon circulaire (deque bornée)
+d'enregistrements compacts (__slots__). Les messages qui sortent de la fenêtre
+sont mis de côté pour être résumés : le résumé glissant et la fenêtre forment
+le contexte envoyé au LLM, dont la taille reste bornée quelle que soit la
+longueur de la conversation.
+
+SharedShortTermMemory garde la même fenêtre dans un backend d'état partagé
+(voir state_backend) : tous les processus servant la session la voient.
+"""
+import sys
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from .state_backend import StateBackend
+
+
+class Message:
+    """Message de la conversation (enregistrement compact)."""
+
+    __slots__ = ("role", "content", "emotion", "intent")
+
+    def __init__(self, role: str, content: str, emotion: Optional[str] = None, intent: Optional[str] = None):
+        self.role = role
+        self.content = content
+        self.emotion = emotion
+        self.intent = intent
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Représentation dict (format historique des messages de MemoryAgent)."""
+        message = {"role": self.role, "content": self.content}
+        if self.emotion is not None:
+            message["emotion"] = self.emotion
+        if self.intent is not None:
+            message["intent"] = self.intent
+        return message
+
+
+class ShortTermMemory:
+    """
+    Tampon circulaire des derniers messages, avec résumé glissant des messages sortis.
+    """
+
+    def __init__(self, capacity: Optional[int], max_pending: Optional[int] = None):
+        """
+        Args:
+            capacity (int, optional): Nombre de messages gardés dans la fenêtre (None : sans limite)
+            max_pending (int, optional): Nombre maximal de messages en attente de résumé
+                (les plus anciens sont abandonnés au-delà ; par défaut `capacity`)
+        """
+        self._messages: deque = deque(maxlen=capacity)
+        self._pending: deque = deque(maxlen=max_pending or capacity)
+        self._summary = ""
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> Optional[int]:
+        return self._messages.maxlen
+
+    @property
+    def summary(self) -> str:
+        """Résumé des messages sortis de la fenêtre."""
+        return self._summary
+
+    @property
+    def pending_count(self) -> int:
+        """Nombre de messages sortis de la fenêtre et pas encore résumés."""
+        return len(self._pending)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def append(self, message: Message, summarize: bool = True) -> None:
+        """
+        Ajoute un message ; le plus ancien sort de la fenêtre si elle est pleine.
+
+        Args:
+            message (Message): Le message à ajouter
+            summarize (bool): Mettre le message sorti de côté pour le résumé
+                (False au rechargement de l'historique, déjà stocké dans ChromaDB)
+        """
+        with self._lock:
+            if summarize and len(self._messages) == self._messages.maxlen:
+                self._pending.append(self._messages[0])
+            self._messages.append(message)
+
+    def load(self, messages: List[Message]) -> None:
+        """Charge l'historique récent (déjà stocké dans ChromaDB) dans une fenêtre vide."""
+        for message in messages:
+            self.append(message, summarize=False)
+
+    def take_pending(self) -> List[Message]:
+        """Retire et retourne les messages en attente de résumé."""
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+            return pending
+
+    def restore_pending(self, messages: List[Message]) -> None:
+        """Remet en attente des messages dont le résumé a échoué (avant les nouveaux)."""
+        with self._lock:
+            newer = list(self._pending)
+            self._pending.clear()
+            self._pending.extend(messages)
+            self._pending.extend(newer)
+
+    def set_summary(self, summary: str) -> None:
+        self._summary = summary
+
+    def messages(self, last: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Messages de la fenêtre, du plus ancien au plus récent.
+
+        Args:
+            last (int, optional): Ne garder que les `last` derniers messages
+        """
+        with self._lock:
+            messages = list(self._messages)
+        if last is not None:
+            messages = messages[-last:] if last > 0 else []
+        return [message.to_dict() for message in messages]
+
+    def count(self, role: str) -> int:
+        """Nombre de messages de la fenêtre émis par `role`."""
+        with self._lock:
+            return sum(1 for message in self._messages if message.role == role)
+
+    def prompt_context(self, last: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Contexte pour un prompt : résumé glissant (message système) puis derniers messages.
+
+        Args:
+            last (int, optional): Nombre de messages récents inclus (par défaut toute la fenêtre)
+
+        Returns:
+            List[Dict[str, str]]: Messages au format de l'API de chat
+        """
+        context = []
+        summary = self.summary
+        if summary:
+            context.append({"role": "system", "content": f"Résumé de la conversation précédente : {summary}"})
+        context.extend({"role": message["role"], "content": message["content"]} for message in self.messages(last))
+        return context
+
+    def memory_usage(self) -> int:
+        """Taille approximative (octets) de la fenêtre, des messages en attente de résumé et du résumé."""
+        with self._lock:
+            messages = list(self._messages) + list(self._pending)
+        return sys.getsizeof(self._summary) + sum(
+            sys.getsizeof(message) + sys.getsizeof(message.content) for message in messages
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._messages.clear()
+            self._pending.clear()
+            self._summary = ""
+
+
+class SharedShortTermMemory(ShortTermMemory):
+    """
+    Fenêtre, messages en attente de résumé et résumé d'une session, stockés dans
+    un backend d'état partagé sous les noms `<namespace>:messages`, `:pending` et
+    `:summary`. Un message qui sort de la fenêtre est mis en attente une seule
+    fois, quel que soit le processus qui l'a poussé dehors.
+    """
+
+    def __init__(self, state: StateBackend, namespace: str, capacity: Optional[int],
+                 max_pending: Optional[int] = None):
+        """
+        Args:
+            state (StateBackend): Le backend d'état
+            namespace (str): Préfixe des clés de la session ("session:<id>")
+            capacity (int, optional): Nombre de messages gardés dans la fenêtre (None : sans limite)
+            max_pending (int, optional): Nombre maximal de messages en attente de résumé
+        """
+        self._state = state
+        self._namespace = namespace
+        self._capacity = capacity
+        self._max_pending = max_pending or capacity
+        self._messages_key = f"{namespace}:messages"
+        self._pending_key = f"{namespace}:pending"
+        self._summary_key = f"{namespace}:summary"
+
+    @property
+    def capacity(self) -> Optional[int]:
+        return self._capacity
+
+    @property
+    def summary(self) -> str:
+        return self._state.get(self._summary_key, "")
+
+    @property
+    def pending_count(self) -> int:
+        return self._state.length(self._pending_key)
+
+    def __len__(self) -> int:
+        return self._state.length(self._messages_key)
+
+    def append(self, message: Message, summarize: bool = True) -> None:
+        removed = self._state.append(self._messages_key, message.to_dict(), max_len=self._capacity)
+        if summarize:
+            for item in removed:
+                self._state.append(self._pending_key, item, max_len=self._max_pending)
+
+    def load(self, messages: List[Message]) -> None:
+        # Un seul des processus qui ouvrent la session en même temps charge l'historique
+        self._state.extend(self._messages_key, [message.to_dict() for message in messages],
+                           max_len=self._capacity, if_empty=True)
+
+    def take_pending(self) -> List[Message]:
+        return [Message(**item) for item in self._state.pop_all(self._pending_key)]
+
+    def restore_pending(self, messages: List[Message]) -> None:
+        self._state.prepend(self._pending_key, [message.to_dict() for message in messages])
+
+    def set_summary(self, summary: str) -> None:
+        self._state.set(self._summary_key, summary)
+
+    def messages(self, last: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._state.read(self._messages_key, last=last)
+
+    def count(self, role: str) -> int:
+        return sum(1 for message in self.messages() if message["role"] == role)
+
+    def memory_usage(self) -> int:
+        # La fenêtre est dans le backend : la session n'occupe presque rien dans le processus
+        return sys.getsizeof(self)
+
+    def clear(self) -> None:
+        self._state.delete(f"{self._namespace}:")
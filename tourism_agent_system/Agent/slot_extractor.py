@@ -0,0 +1,145 @@
+# slot_extractor.py
+"""
+Extraction locale des slots location, food_type, budget et time.
+
+Le gazetteer (data/gazetteer.json : villes et régions, cuisines, expressions
+de budget et de moment) est compilé une fois en un trie de mots : la recherche
+parcourt le message une seule fois et son coût dépend de la longueur du message,
+pas de la taille du gazetteer. Les montants ("moins de 20 €") et les heures
+("20h30") sont reconnus par expressions régulières.
+"""
+import json
+import os
+import re
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from .text_utils import fold_accents, tokenize
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_GAZETTEER_PATH = os.path.join(PACKAGE_DIR, "data", "gazetteer.json")
+
+SLOTS = ("location", "food_type", "budget", "time")
+
+# Prépositions qui doivent précéder un nom de lieu ambigu ("à Tours", "près de Nice")
+LOCATIVE_WORDS = frozenset(["a", "au", "de", "d", "vers", "pres", "sur", "en", "autour", "dans", "pour", "visiter"])
+
+_VALUE = "__value__"
+
+_AMOUNT_PATTERN = re.compile(
+    r"(?:(moins de|max(?:imum)?|pas plus de|jusqu'a|environ|autour de)\s*)?(\d+)\s*(?:€|euros?\b|eur\b)"
+)
+_HOUR_PATTERN = re.compile(r"\b(?:a\s+|vers\s+)?(\d{1,2})\s*(?:h|heures?)\s*(\d{2})?\b")
+
+
+class SlotExtractor:
+    """Extracteur de slots à base de gazetteer compilé en trie."""
+
+    def __init__(self, gazetteer: Dict[str, Any]):
+        self._trie: Dict[str, Any] = {}
+        for slot in SLOTS:
+            section = gazetteer.get(slot, {})
+            if slot == "location":
+                ambiguous = {fold_accents(name.lower()) for name in section.get("ambiguous", [])}
+                for name in section.get("entries", []):
+                    self._add(name, slot, name, fold_accents(name.lower()) in ambiguous)
+            else:
+                for canonical, variants in section.items():
+                    for phrase in [canonical] + list(variants):
+                        self._add(phrase, slot, canonical, False)
+
+    def _add(self, phrase: str, slot: str, canonical: str, ambiguous: bool) -> None:
+        """Ajoute une expression (suite de mots normalisés) au trie."""
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        values = node.setdefault(_VALUE, [])
+        if all(value[0] != slot for value in values):
+            values.append((slot, canonical, ambiguous))
+
+    def _longest_match(self, tokens: List[str], start: int) -> Tuple[int, Optional[list]]:
+        """Plus longue expression du gazetteer commençant à la position start."""
+        node = self._trie
+        end, values = start, None
+        for i in range(start, len(tokens)):
+            node = node.get(tokens[i])
+            if node is None:
+                break
+            if _VALUE in node:
+                end, values = i + 1, node[_VALUE]
+        return end, values
+
+    def extract(self, message: str) -> Dict[str, str]:
+        """
+        Extrait les slots d'un message.
+
+        Args:
+            message (str): Le message utilisateur
+
+        Returns:
+            Dict[str, str]: Les slots trouvés parmi location, food_type, budget et time
+        """
+        tokens = tokenize(message)
+        found: Dict[str, List[str]] = {}
+        i = 0
+        while i < len(tokens):
+            end, values = self._longest_match(tokens, i)
+            if values is None:
+                i += 1
+                continue
+            for slot, canonical, ambiguous in values:
+                if ambiguous and (i == 0 or tokens[i - 1] not in LOCATIVE_WORDS):
+                    continue
+                if canonical not in found.setdefault(slot, []):
+                    found[slot].append(canonical)
+            i = end
+
+        text = fold_accents(message.lower())
+        amount = _AMOUNT_PATTERN.search(text)
+        if amount:
+            prefix = "moins de " if amount.group(1) and amount.group(1) not in ("environ", "autour de") else ""
+            found["budget"] = [f"{prefix}{amount.group(2)} €"]
+        hour = _HOUR_PATTERN.search(text)
+        if hour:
+            found.setdefault("time", []).append(f"{int(hour.group(1))}h{hour.group(2) or ''}")
+
+        slots = {}
+        for slot, values in found.items():
+            if not values:
+                continue
+            # Plusieurs indications de moment se combinent ("lundi soir"), sinon la première l'emporte
+            slots[slot] = " ".join(values) if slot == "time" else values[0]
+        return slots
+
+
+def merge_slots(llm_slots: Optional[Dict[str, Any]], local_slots: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Fusionne les slots du LLM et les slots locaux : les valeurs du LLM sont
+    conservées, les slots vides ou absents sont complétés par l'extraction locale.
+    """
+    merged = dict(llm_slots or {})
+    for slot, value in local_slots.items():
+        if not merged.get(slot):
+            merged[slot] = value
+    return merged
+
+
+_extractor_lock = threading.Lock()
+_extractor: Optional[SlotExtractor] = None
+
+
+def get_slot_extractor(path: Optional[str] = None) -> Optional[SlotExtractor]:
+    """Retourne l'extracteur partagé (gazetteer compilé une seule fois par processus)."""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            try:
+                with open(path or DEFAULT_GAZETTEER_PATH, "r", encoding="utf-8") as f:
+                    _extractor = SlotExtractor(json.load(f))
+            except Exception as e:
+                print(f"Erreur lors du chargement du gazetteer: {e}")
+                return None
+        return _extractor
@@ -0,0 +1,436 @@
+# state_backend.py
+"""
+État partagé du service : fenêtre et résumé des sessions, slots, événements de suivi.
+
+Deux implémentations, choisies par la section "state" de config.json :
+
+- "memory" (par défaut) : structures Python du processus. Chaque processus a
+  son propre état ; suffisant pour un seul worker uvicorn.
+- "sqlite" : fichier SQLite en mode WAL, partagé par tous les processus de la
+  machine (`uvicorn --workers N`) : /chat, /logs et /analysis voient le même
+  état quel que soit le worker qui sert la requête.
+
+Le modèle est volontairement réduit : des clés (valeur JSON) et des flux (listes
+ordonnées de valeurs JSON, bornables, chaque élément pouvant porter une étiquette
+comme le request_id). Les opérations sur un flux sont atomiques, y compris entre
+processus pour le backend SQLite.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+# Les chemins relatifs sont résolus depuis tourism_agent_system/
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StateBackend:
+    """Interface commune des backends d'état."""
+
+    # L'état est-il visible des autres processus ?
+    shared = False
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Valeur de la clé, ou default si elle est absente."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any) -> None:
+        """Enregistre une valeur sérialisable en JSON."""
+        raise NotImplementedError
+
+    def merge(self, key: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Met à jour atomiquement le dictionnaire de la clé et retourne le résultat."""
+        raise NotImplementedError
+
+    def acquire_lease(self, key: str, owner: str, duration: float) -> bool:
+        """
+        Prend le bail `key` pour `duration` secondes s'il n'est tenu par personne
+        (absent ou expiré) : une tâche périodique n'est exécutée que par un seul
+        processus par période, le bail n'étant pas renouvelé par son détenteur.
+
+        Args:
+            owner (str): Identifiant du preneur (enregistré avec le bail)
+
+        Returns:
+            bool: Le bail a été pris
+        """
+        raise NotImplementedError
+
+    def append(self, stream: str, item: Any, tag: Optional[str] = None,
+               max_len: Optional[int] = None) -> List[Any]:
+        """
+        Ajoute un élément en fin de flux.
+
+        Args:
+            stream (str): Le flux
+            item (Any): L'élément, sérialisable en JSON
+            tag (str, optional): Étiquette de l'élément (voir read)
+            max_len (int, optional): Longueur maximale du flux après ajout
+
+        Returns:
+            List[Any]: Éléments retirés du début du flux pour respecter max_len
+        """
+        raise NotImplementedError
+
+    def extend(self, stream: str, items: List[Any], max_len: Optional[int] = None,
+               if_empty: bool = False) -> bool:
+        """
+        Ajoute plusieurs éléments en fin de flux (les plus anciens au-delà de max_len sont retirés).
+
+        Args:
+            if_empty (bool): N'ajouter que si le flux est vide (chargement initial
+                fait par un seul des processus)
+
+        Returns:
+            bool: Les éléments ont été ajoutés
+        """
+        raise NotImplementedError
+
+    def prepend(self, stream: str, items: List[Any]) -> None:
+        """Remet des éléments en tête de flux, dans l'ordre donné."""
+        raise NotImplementedError
+
+    def read(self, stream: str, tag: Optional[str] = None, last: Optional[int] = None) -> List[Any]:
+        """
+        Éléments du flux, du plus ancien au plus récent.
+
+        Args:
+            tag (str, optional): Ne garder que les éléments portant cette étiquette
+            last (int, optional): Ne garder que les `last` plus récents
+        """
+        raise NotImplementedError
+
+    def length(self, stream: str) -> int:
+        """Nombre d'éléments du flux."""
+        raise NotImplementedError
+
+    def pop_all(self, stream: str) -> List[Any]:
+        """Retire et retourne tous les éléments du flux."""
+        raise NotImplementedError
+
+    def delete(self, prefix: str) -> None:
+        """Supprime les clés et les flux dont le nom commence par `prefix`."""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Description du backend (type, emplacement, nombre de clés et de flux)."""
+        raise NotImplementedError
+
+
+class InProcessStateBackend(StateBackend):
+    """État dans le processus : dictionnaires et deques protégés par un verrou."""
+
+    def __init__(self):
+        self._keys: Dict[str, Any] = {}
+        # Flux -> deque de (étiquette, élément)
+        self._streams: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._keys.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._keys[key] = value
+
+    def merge(self, key: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            merged = dict(self._keys.get(key) or {}, **values)
+            self._keys[key] = merged
+            return dict(merged)
+
+    def acquire_lease(self, key: str, owner: str, duration: float) -> bool:
+        now = time.time()
+        with self._lock:
+            lease = self._keys.get(key)
+            if lease and lease["until"] > now:
+                return False
+            self._keys[key] = {"owner": owner, "until": now + duration}
+            return True
+
+    def append(self, stream: str, item: Any, tag: Optional[str] = None,
+               max_len: Optional[int] = None) -> List[Any]:
+        with self._lock:
+            entries = self._streams.setdefault(stream, deque())
+            entries.append((tag, item))
+            return self._trim(entries, max_len)
+
+    def extend(self, stream: str, items: List[Any], max_len: Optional[int] = None,
+               if_empty: bool = False) -> bool:
+        with self._lock:
+            entries = self._streams.setdefault(stream, deque())
+            if if_empty and entries:
+                return False
+            entries.extend((None, item) for item in items)
+            self._trim(entries, max_len)
+            return True
+
+    def prepend(self, stream: str, items: List[Any]) -> None:
+        with self._lock:
+            self._streams.setdefault(stream, deque()).extendleft((None, item) for item in reversed(items))
+
+    def read(self, stream: str, tag: Optional[str] = None, last: Optional[int] = None) -> List[Any]:
+        with self._lock:
+            entries = list(self._streams.get(stream, ()))
+        items = [item for item_tag, item in entries if tag is None or item_tag == tag]
+        if last is not None:
+            items = items[-last:] if last > 0 else []
+        return items
+
+    def length(self, stream: str) -> int:
+        with self._lock:
+            return len(self._streams.get(stream, ()))
+
+    def pop_all(self, stream: str) -> List[Any]:
+        with self._lock:
+            entries = self._streams.pop(stream, ())
+        return [item for _, item in entries]
+
+    def delete(self, prefix: str) -> None:
+        with self._lock:
+            for mapping in (self._keys, self._streams):
+                for name in [name for name in mapping if name.startswith(prefix)]:
+                    del mapping[name]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "memory", "keys": len(self._keys), "streams": len(self._streams)}
+
+    @staticmethod
+    def _trim(entries: deque, max_len: Optional[int]) -> List[Any]:
+        removed = []
+        while max_len is not None and len(entries) > max_len:
+            removed.append(entries.popleft()[1])
+        return removed
+
+
+class SQLiteStateBackend(StateBackend):
+    """
+    État dans un fichier SQLite en mode WAL, partagé entre processus : les lectures
+    ne bloquent pas les écritures, et chaque opération sur un flux est une
+    transaction (BEGIN IMMEDIATE) qui sérialise les écrivains des différents processus.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        """
+        Args:
+            path (str): Fichier SQLite (créé au besoin)
+            busy_timeout (float): Attente maximale d'un verrou tenu par un autre processus (s)
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._path = path
+        # Transactions explicites (isolation_level=None) ; une connexion par backend, protégée par un verrou
+        self._db = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS state_keys (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            # Position explicite dans le flux : prepend insère avant le premier élément sans renuméroter
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS state_streams ("
+                "id INTEGER PRIMARY KEY, stream TEXT NOT NULL, pos INTEGER NOT NULL, tag TEXT, value TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS state_streams_pos ON state_streams (stream, pos)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS state_streams_tag ON state_streams (stream, tag)")
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _write(self, operation):
+        """Exécute `operation(db)` dans une transaction d'écriture."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM state_keys WHERE key = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO state_keys (key, value) VALUES (?, ?)", (key, data))
+
+    def merge(self, key: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        def operation(db):
+            row = db.execute("SELECT value FROM state_keys WHERE key = ?", (key,)).fetchone()
+            merged = dict(json.loads(row[0]) if row else {}, **values)
+            db.execute("INSERT OR REPLACE INTO state_keys (key, value) VALUES (?, ?)",
+                       (key, json.dumps(merged, ensure_ascii=False)))
+            return merged
+
+        return self._write(operation)
+
+    def acquire_lease(self, key: str, owner: str, duration: float) -> bool:
+        def operation(db):
+            # Lecture et prise dans la même transaction d'écriture : un seul processus l'emporte
+            now = time.time()
+            row = db.execute("SELECT value FROM state_keys WHERE key = ?", (key,)).fetchone()
+            if row and json.loads(row[0])["until"] > now:
+                return False
+            db.execute("INSERT OR REPLACE INTO state_keys (key, value) VALUES (?, ?)",
+                       (key, json.dumps({"owner": owner, "until": now + duration})))
+            return True
+
+        return self._write(operation)
+
+    def append(self, stream: str, item: Any, tag: Optional[str] = None,
+               max_len: Optional[int] = None) -> List[Any]:
+        data = json.dumps(item, ensure_ascii=False)
+
+        def operation(db):
+            db.execute(
+                "INSERT INTO state_streams (stream, pos, tag, value) VALUES "
+                "(?, (SELECT COALESCE(MAX(pos), 0) + 1 FROM state_streams WHERE stream = ?), ?, ?)",
+                (stream, stream, tag, data)
+            )
+            return self._trim(db, stream, max_len)
+
+        return self._write(operation)
+
+    def extend(self, stream: str, items: List[Any], max_len: Optional[int] = None,
+               if_empty: bool = False) -> bool:
+        rows = [json.dumps(item, ensure_ascii=False) for item in items]
+
+        def operation(db):
+            last = db.execute("SELECT MAX(pos) FROM state_streams WHERE stream = ?", (stream,)).fetchone()[0]
+            if if_empty and last is not None:
+                return False
+            start = (last or 0) + 1
+            db.executemany(
+                "INSERT INTO state_streams (stream, pos, value) VALUES (?, ?, ?)",
+                [(stream, start + i, value) for i, value in enumerate(rows)]
+            )
+            self._trim(db, stream, max_len)
+            return True
+
+        return self._write(operation)
+
+    def prepend(self, stream: str, items: List[Any]) -> None:
+        rows = [json.dumps(item, ensure_ascii=False) for item in items]
+
+        def operation(db):
+            first = db.execute("SELECT MIN(pos) FROM state_streams WHERE stream = ?", (stream,)).fetchone()[0]
+            start = (first if first is not None else 1) - len(rows)
+            db.executemany(
+                "INSERT INTO state_streams (stream, pos, value) VALUES (?, ?, ?)",
+                [(stream, start + i, value) for i, value in enumerate(rows)]
+            )
+
+        self._write(operation)
+
+    def read(self, stream: str, tag: Optional[str] = None, last: Optional[int] = None) -> List[Any]:
+        if last is not None and last <= 0:
+            return []
+        query = "SELECT value FROM state_streams WHERE stream = ?"
+        params: list = [stream]
+        if tag is not None:
+            query += " AND tag = ?"
+            params.append(tag)
+        if last is None:
+            query += " ORDER BY pos"
+        else:
+            query += " ORDER BY pos DESC LIMIT ?"
+            params.append(last)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        if last is not None:
+            rows.reverse()
+        return [json.loads(row[0]) for row in rows]
+
+    def length(self, stream: str) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM state_streams WHERE stream = ?", (stream,)).fetchone()[0]
+
+    def pop_all(self, stream: str) -> List[Any]:
+        def operation(db):
+            rows = db.execute("SELECT value FROM state_streams WHERE stream = ? ORDER BY pos", (stream,)).fetchall()
+            db.execute("DELETE FROM state_streams WHERE stream = ?", (stream,))
+            return rows
+
+        return [json.loads(row[0]) for row in self._write(operation)]
+
+    def delete(self, prefix: str) -> None:
+        # Préfixe comparé par bornes (pas de LIKE : les noms peuvent contenir % ou _)
+        bounds = (prefix, prefix + "\uffff")
+
+        def operation(db):
+            db.execute("DELETE FROM state_keys WHERE key >= ? AND key < ?", bounds)
+            db.execute("DELETE FROM state_streams WHERE stream >= ? AND stream < ?", bounds)
+
+        self._write(operation)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            keys = self._db.execute("SELECT COUNT(*) FROM state_keys").fetchone()[0]
+            streams = self._db.execute("SELECT COUNT(DISTINCT stream) FROM state_streams").fetchone()[0]
+        return {"backend": "sqlite", "path": self._path, "keys": keys, "streams": streams}
+
+    @staticmethod
+    def _trim(db, stream: str, max_len: Optional[int]) -> List[Any]:
+        """
+        Retire les éléments les plus anciens au-delà de max_len (transaction en cours).
+        Les positions d'un flux sont contiguës (ajouts en fin, remises en tête, retraits
+        des plus anciens) : la borne se calcule depuis la dernière position, sans compter.
+        """
+        if max_len is None:
+            return []
+        last = db.execute("SELECT MAX(pos) FROM state_streams WHERE stream = ?", (stream,)).fetchone()[0]
+        if last is None:
+            return []
+        rows = db.execute(
+            "SELECT id, value FROM state_streams WHERE stream = ? AND pos <= ? ORDER BY pos",
+            (stream, last - max_len)
+        ).fetchall()
+        if rows:
+            db.executemany("DELETE FROM state_streams WHERE id = ?", [(row[0],) for row in rows])
+        return [json.loads(row[1]) for row in rows]
+
+
+_registry_lock = threading.Lock()
+_backends: Dict[tuple, StateBackend] = {}
+
+
+def get_state_backend(config: Dict[str, Any]) -> StateBackend:
+    """
+    Retourne le backend d'état du processus décrit par la section "state" de la
+    configuration (backend "memory" ou "sqlite", path), créé à la première demande.
+    """
+    state_config = config.get("state", {})
+    backend = state_config.get("backend", "memory")
+    path = None
+    if backend == "sqlite":
+        path = state_config.get("path", os.path.join("state", "state.db"))
+        if not os.path.isabs(path):
+            path = os.path.join(PACKAGE_DIR, path)
+    elif backend != "memory":
+        raise ValueError(f"Backend d'état inconnu: {backend}")
+    key = (backend, path)
+    with _registry_lock:
+        state = _backends.get(key)
+        if state is None:
+            if backend == "sqlite":
+                try:
+                    state = SQLiteStateBackend(path, state_config.get("busy_timeout", 5.0))
+                except sqlite3.Error as e:
+                    print(f"État SQLite indisponible ({path}), état en mémoire du processus: {e}")
+                    state = InProcessStateBackend()
+            else:
+                state = InProcessStateBackend()
+            _backends[key] = state
+        return state
@@ -0,0 +1,58 @@
+# text_utils.py
+"""
+Utilitaires de normalisation de texte français (minuscules, suppression des
+accents, de la ponctuation et des mots vides), utilisés pour construire des
+clés de cache stables.
+"""
+import re
+import unicodedata
+from typing import List
+
+# Mots de négation : jamais retirés, ils changent le sens d'une requête
+# ("pas cher", "sans gluten", "ni italien")
+NEGATION_WORDS = frozenset("ne n pas sans ni non jamais aucun aucune".split())
+
+# Mots vides français courants (hors négations)
+FRENCH_STOPWORDS = frozenset("""
+a au aux avec ce ces cet cette c ca d de des du elle en et eux il ils j je
+l la le les leur leurs lui m ma mais me mes moi mon nos notre nous on
+ou par pour qu que qui s sa se ses son sur t ta te tes toi ton tu un une
+vos votre vous y est sont suis etre ai as avons avez ont avoir
+svp stp merci bonjour salut peux pouvez voudrais veux aimerais cherche
+recherche trouver trouve quel quelle quels quelles quoi
+""".split()) - NEGATION_WORDS
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def fold_accents(text: str) -> str:
+    """Supprime les accents et signes diacritiques ("é" -> "e", "ç" -> "c")."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte en mots, en minuscules et sans accents."""
+    return _TOKEN_PATTERN.findall(fold_accents(text.lower()))
+
+
+def normalize_query(text: str) -> str:
+    """
+    Forme normalisée d'une requête : minuscules, sans accents, ponctuation ni mots
+    vides (les négations sont gardées). L'ordre des mots est conservé : il porte le
+    sens d'une négation ("pas cher, pas italien" et "italien, pas cher" restent distincts).
+
+    Args:
+        text (str): La requête brute
+
+    Returns:
+        str: La requête normalisée
+    """
+    return " ".join(token for token in tokenize(text) if token not in FRENCH_STOPWORDS)
+
+
+def normalize_value(value) -> str:
+    """Normalise une valeur de slot (minuscules, sans accents, espaces réduits)."""
+    if value is None:
+        return ""
+    return " ".join(tokenize(str(value)))
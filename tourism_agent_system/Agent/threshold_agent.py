@@ -10,9 +10,13 @@ class ThresholdAgent(BaseAgent):
 
     def __init__(self, name: str = "threshold"):
         super().__init__(name)
-        self._threshold_config = self._config.get("threshold", {})
         self._default_threshold = 0.7
 
+    @property
+    def _threshold_config(self) -> Dict[str, Any]:
+        """Seuils courants (section "threshold", rechargée à chaud)."""
+        return self._config.get("threshold", {})
+
     def check_threshold(self, value: float, action_type: str) -> bool:
         """
         Vérifie si une valeur dépasse le seuil pour un type d'action donné.
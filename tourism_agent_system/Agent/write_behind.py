@@ -0,0 +1,167 @@
+# write_behind.py
+"""
+File d'écriture différée (write-behind) vidée par un thread de fond.
+
+Les éléments sont regroupés et écrits en un seul appel dès que le lot atteint
+max_batch éléments ou que le plus ancien attend depuis flush_interval secondes.
+La file est bornée à un lot, écriture en cours comprise : si le processus
+s'arrête brutalement, au plus un lot est perdu. Quand la file est pleine,
+l'appelant attend la fin de l'écriture en cours.
+"""
+import atexit
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List
+
+DEFAULT_MAX_BATCH = 32
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+_queues: "weakref.WeakSet[WriteBehindQueue]" = weakref.WeakSet()
+_queues_lock = threading.Lock()
+
+
+class WriteBehindQueue:
+    """File bornée d'éléments écrits par lots en tâche de fond."""
+
+    def __init__(self, name: str, write_batch: Callable[[List[Any]], None],
+                 max_batch: int = DEFAULT_MAX_BATCH, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """
+        Args:
+            name (str): Nom de la file (métriques, nom du thread)
+            write_batch (Callable): Fonction qui écrit un lot d'éléments
+            max_batch (int): Taille maximale d'un lot (et de la file)
+            flush_interval (float): Délai maximal d'attente d'un élément avant écriture (secondes)
+        """
+        self._name = name
+        self._write_batch = write_batch
+        self._max_batch = max(1, max_batch)
+        self._flush_interval = flush_interval
+        self._items: List[Any] = []
+        self._oldest = 0.0
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "flushes": 0,
+            "errors": 0,
+            "dropped": 0,
+            "flush_latency_total": 0.0,
+            "flush_latency_max": 0.0
+        }
+        self._thread = threading.Thread(target=self._run, name=f"write-behind-{name}", daemon=True)
+        self._thread.start()
+        with _queues_lock:
+            _queues.add(self)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def put(self, item: Any) -> None:
+        """Ajoute un élément ; attend si un lot complet est déjà en attente ou en cours d'écriture."""
+        with self._cond:
+            while not self._closed and len(self._items) + self._in_flight >= self._max_batch:
+                self._cond.wait()
+            if self._closed:
+                # File fermée : écriture immédiate
+                self._write([item])
+                return
+            if not self._items:
+                self._oldest = time.monotonic()
+            self._items.append(item)
+            self._stats["enqueued"] += 1
+            self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Écrit immédiatement les éléments en attente et attend la fin de l'écriture."""
+        with self._cond:
+            if self._closed:
+                return
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._items or self._in_flight:
+                self._cond.wait()
+            self._flush_requested = False
+
+    def close(self) -> None:
+        """Vide la file puis arrête le thread de fond."""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=10)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._items and (
+                        self._closed or self._flush_requested
+                        or len(self._items) >= self._max_batch
+                        or time.monotonic() - self._oldest >= self._flush_interval
+                    ):
+                        break
+                    if self._closed:
+                        return
+                    timeout = None
+                    if self._items:
+                        timeout = self._flush_interval - (time.monotonic() - self._oldest)
+                    self._cond.wait(timeout)
+                batch, self._items = self._items, []
+                self._in_flight = len(batch)
+            self._write(batch)
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def _write(self, batch: List[Any]) -> None:
+        """Écrit un lot ; en cas d'erreur le lot est abandonné (et compté)."""
+        start = time.perf_counter()
+        try:
+            self._write_batch(batch)
+            error = False
+        except Exception as e:
+            print(f"Erreur lors de l'écriture différée ({self._name}, {len(batch)} éléments): {e}")
+            error = True
+        elapsed = time.perf_counter() - start
+        with self._cond:
+            self._stats["flushes"] += 1
+            self._stats["flush_latency_total"] += elapsed
+            self._stats["flush_latency_max"] = max(self._stats["flush_latency_max"], elapsed)
+            if error:
+                self._stats["errors"] += 1
+                self._stats["dropped"] += len(batch)
+            else:
+                self._stats["written"] += len(batch)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Profondeur de la file, nombre d'éléments écrits et latence des écritures."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["queue_depth"] = len(self._items) + self._in_flight
+        stats["max_batch"] = self._max_batch
+        stats["flush_latency_avg"] = stats["flush_latency_total"] / stats["flushes"] if stats["flushes"] else 0.0
+        stats["avg_batch_size"] = (stats["written"] + stats["dropped"]) / stats["flushes"] if stats["flushes"] else 0.0
+        return stats
+
+
+def get_write_behind_metrics() -> Dict[str, Dict[str, Any]]:
+    """Métriques de toutes les files d'écriture différée du processus."""
+    with _queues_lock:
+        queues = list(_queues)
+    return {queue.name: queue.get_stats() for queue in queues}
+
+
+def close_all() -> None:
+    """Vide et ferme toutes les files (arrêt de l'application)."""
+    with _queues_lock:
+        queues = list(_queues)
+    for queue in queues:
+        queue.close()
+
+
+atexit.register(close_all)
@@ -0,0 +1,77 @@
+# bench_async_load.py
+"""
+Test de charge de l'endpoint /chat : débit en requêtes concurrentes avec
+l'ancien pipeline synchrone (def + threadpool Starlette) et le pipeline
+asynchrone (async def + process_message_async), contre un backend simulé.
+
+Usage :
+    python Benchmark/bench_async_load.py --requests 400 --latency 0.5 --max-concurrent 128
+
+Le pipeline synchrone est borné par le threadpool Starlette (40 workers) ;
+le pipeline asynchrone par http.max_concurrent_requests (quota amont).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Ajouter la racine du dépôt au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.dirname(os.path.dirname(current_dir))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+import httpx
+from mock_backend import MockBackend
+
+MESSAGE = "Je cherche un restaurant pas cher à Dijon pour lundi soir"
+
+
+async def fire(app, path: str, total: int) -> dict:
+    """Envoie `total` requêtes simultanées sur `path` et mesure le débit."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post(path, json={"message": MESSAGE}) for _ in range(total)
+        ])
+        elapsed = time.perf_counter() - start
+    ok = sum(1 for r in responses if r.status_code == 200 and r.json().get("success"))
+    return {"elapsed": elapsed, "ok": ok, "throughput": total / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400, help="Nombre de requêtes simultanées")
+    parser.add_argument("--latency", type=float, default=0.5, help="Latence simulée par appel distant (s)")
+    parser.add_argument("--max-concurrent", type=int, default=128,
+                        help="Appels amont simultanés autorisés (http.max_concurrent_requests)")
+    args = parser.parse_args()
+
+    overrides = {"http": {"max_concurrent_requests": args.max_concurrent}}
+    with MockBackend(latency=args.latency, config_overrides=overrides):
+        from tourism_agent_system import api
+
+        @api.app.post("/chat-sync")
+        def chat_sync(payload: dict):
+            """Reproduction de l'ancien endpoint synchrone (un worker de threadpool par requête)."""
+            try:
+                result = api.get_orchestrator().process_message(payload["message"])
+                return {"success": True, "response": result["response"]}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+
+        before = asyncio.run(fire(api.app, "/chat-sync", args.requests))
+        after = asyncio.run(fire(api.app, "/chat", args.requests))
+
+    print(f"{args.requests} requêtes simultanées, latence simulée {args.latency * 1000:.0f} ms par appel")
+    print(f"{'pipeline':<14}{'durée (s)':>12}{'req/s':>10}{'succès':>10}")
+    for label, result in (("synchrone", before), ("asynchrone", after)):
+        print(f"{label:<14}{result['elapsed']:>12.2f}{result['throughput']:>10.1f}{result['ok']:>10}")
+
+
+if __name__ == "__main__":
+    main()
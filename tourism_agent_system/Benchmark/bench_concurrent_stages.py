@@ -0,0 +1,63 @@
+# bench_concurrent_stages.py
+"""
+Compare le temps d'exécution des étapes d'analyse (intention, émotion, recherche)
+en mode "serial" et en mode "concurrent", contre un backend local simulé.
+
+Usage :
+    python Benchmark/bench_concurrent_stages.py --latency 0.2 --runs 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from mock_backend import MockBackend
+from Agent.orchestrator import AgentOrchestrator
+from Agent.pipeline_context import PipelineContext
+
+MESSAGE = "Je cherche un restaurant pas cher à Dijon pour lundi soir"
+
+
+def bench_mode(mode: str, latency: float, runs: int) -> list:
+    """Mesure le temps de _run_analysis_stages pour un mode d'exécution."""
+    overrides = {"orchestrator": {"execution_mode": mode}}
+    with MockBackend(latency=latency, config_overrides=overrides):
+        orchestrator = AgentOrchestrator()
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            orchestrator._run_analysis_stages(PipelineContext(MESSAGE))
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Latence simulée par appel distant (s)")
+    parser.add_argument("--runs", type=int, default=10, help="Nombre de messages traités par mode")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("serial", "concurrent"):
+        results[mode] = bench_mode(mode, args.latency, args.runs)
+
+    print(f"Latence simulée par appel : {args.latency * 1000:.0f} ms, {args.runs} messages")
+    print(f"{'mode':<12}{'moyenne (ms)':>14}{'médiane (ms)':>14}{'max (ms)':>12}")
+    for mode, timings in results.items():
+        print(
+            f"{mode:<12}{statistics.mean(timings) * 1000:>14.1f}"
+            f"{statistics.median(timings) * 1000:>14.1f}{max(timings) * 1000:>12.1f}"
+        )
+    speedup = statistics.mean(results["serial"]) / statistics.mean(results["concurrent"])
+    print(f"Accélération : x{speedup:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# bench_embedding.py
+"""
+Backends d'embedding de la collection 'conversations' : débit de calcul,
+mémoire résidente (RSS) et qualité de la recherche.
+
+Usage :
+    python Benchmark/bench_embedding.py --texts 2000 --backends default hashed precomputed
+
+Pour chaque backend, dans un interpréteur neuf :
+- débit à froid : textes distincts, sans mémorisation ;
+- débit à chaud : les mêmes textes, vecteurs mémorisés par empreinte ;
+- RSS : mémoire ajoutée par le backend (chargement du modèle compris) ;
+- rappel@k : sur les exemples annotés de data/intent_examples.jsonl, part des
+  messages dont au moins un des k plus proches voisins a la même intention,
+  et précision@k (part des k voisins de même intention).
+
+Le backend "precomputed" lit un fichier de vecteurs écrit au préalable avec le
+backend de repli (memory.embedding.fallback) : il mesure le coût de la lecture.
+Un backend indisponible (modèle par défaut non téléchargeable hors ligne) est signalé et ignoré.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.config_registry import get_config
+from Agent.intent_classifier import DEFAULT_EXAMPLES_PATH, load_examples
+
+# Exécuté dans un processus neuf : mesure un backend
+_CHILD = """
+import json, resource, sys, time
+import numpy as np
+sys.path.append(PROJECT_ROOT)
+from Agent.embeddings import CachedEmbedder, create_backend, save_precomputed
+from Agent.intent_classifier import load_examples
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+examples = load_examples(EXAMPLES_PATH)
+texts = [f"User: {examples[i % len(examples)][0]} (message {i})" for i in range(TEXTS)]
+if CONFIG["backend"] == "precomputed":
+    # Fichier de vecteurs écrit par le backend de repli (hors mesure)
+    reference = create_backend(CONFIG, CONFIG["fallback"])
+    corpus = texts + [text for text, _ in examples]
+    save_precomputed(CONFIG["precomputed_path"], corpus, reference.embed(corpus))
+    del reference
+
+before = rss_mb()
+backend = create_backend(CONFIG)
+embedder = CachedEmbedder(backend, batch_size=CONFIG.get("batch_size", 64), cache_size=len(texts))
+start = time.perf_counter()
+embedder.embed(texts)
+cold = time.perf_counter() - start
+start = time.perf_counter()
+embedder.embed(texts)
+warm = time.perf_counter() - start
+rss = rss_mb() - before
+
+vectors = np.stack(backend.embed([text for text, _ in examples]))
+vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+labels = np.array([intent for _, intent in examples])
+similarity = vectors @ vectors.T
+np.fill_diagonal(similarity, -np.inf)
+neighbours = np.argsort(-similarity, axis=1)[:, :K]
+same = labels[neighbours] == labels[:, None]
+print(json.dumps({
+    "cold_per_s": len(texts) / cold,
+    "warm_per_s": len(texts) / warm,
+    "rss_mb": rss,
+    "recall": float(same.any(axis=1).mean()),
+    "precision": float(same.mean())
+}))
+"""
+
+
+def measure(embedding_config: dict, texts: int, k: int) -> dict:
+    """Mesure un backend dans un interpréteur neuf (None s'il est indisponible)."""
+    child = (f"PROJECT_ROOT = {project_root!r}\nEXAMPLES_PATH = {DEFAULT_EXAMPLES_PATH!r}\n"
+             f"CONFIG = {embedding_config!r}\nTEXTS = {texts}\nK = {k}\n{_CHILD}")
+    result = subprocess.run([sys.executable, "-c", child], capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"# backend {embedding_config['backend']} indisponible : {result.stderr.strip().splitlines()[-1]}")
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000, help="Nombre de textes distincts calculés")
+    parser.add_argument("--backends", nargs="+", default=["default", "hashed", "precomputed"],
+                        help="Backends mesurés")
+    parser.add_argument("--k", type=int, default=5, help="Nombre de voisins pour le rappel")
+    args = parser.parse_args()
+
+    base_config = dict(get_config().get("memory", {}).get("embedding", {}))
+    examples = load_examples(DEFAULT_EXAMPLES_PATH)
+    print(f"{args.texts} textes, {len(examples)} exemples annotés pour le rappel@{args.k}")
+    print(f"{'backend':>18}{'froid (/s)':>12}{'chaud (/s)':>12}{'RSS (Mo)':>10}"
+          f"{f'rappel@{args.k}':>11}{f'précision@{args.k}':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in args.backends:
+            config = dict(base_config, backend=backend,
+                          precomputed_path=os.path.join(directory, "vectors.npz"))
+            result = measure(config, args.texts, args.k)
+            if result is None:
+                continue
+            label = backend if backend != "precomputed" else f"precomp.({config.get('fallback', 'default')})"
+            print(f"{label:>18}{result['cold_per_s']:>12.0f}{result['warm_per_s']:>12.0f}"
+                  f"{result['rss_mb']:>10.1f}{result['recall'] * 100:>10.1f}%{result['precision'] * 100:>14.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# bench_emotion_fast_path.py
+"""
+Mesure le premier étage local de détection d'émotion (emotion_lexicon) :
+taux d'escalade vers le LLM, latence par message du classifieur local, et
+latence moyenne de EmotionDetectionAgent.detect_emotion avec et sans fast path,
+contre un backend simulé.
+
+Usage :
+    python Benchmark/bench_emotion_fast_path.py --latency 0.2
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from mock_backend import MockBackend
+from Agent.emotion_lexicon import classify_emotion, is_confident
+
+# (message, émotion attendue) : messages typiques d'un assistant touristique
+CORPUS = [
+    ("Bonjour", "neutre"),
+    ("Salut !", "neutre"),
+    ("Merci", "gratitude"),
+    ("Merci beaucoup pour votre aide !", "gratitude"),
+    ("Ok d'accord", "neutre"),
+    ("Je cherche un restaurant pas cher à Dijon pour lundi soir", "neutre"),
+    ("Quels musées visiter à Paris ce week-end ?", "neutre"),
+    ("Réserve-moi une chambre d'hôtel à Lyon pour deux personnes le 12 juin", "neutre"),
+    ("Quelle est la meilleure période pour visiter la Bretagne ?", "neutre"),
+    ("Je veux une balade à vélo facile autour d'Annecy", "neutre"),
+    ("Super, c'est exactement ce que je cherchais !", "joie"),
+    ("Génial, merci !!", "gratitude"),
+    ("J'adore cette idée 😍", "enthousiasme"),
+    ("Trop bien, j'ai hâte d'y être", "enthousiasme"),
+    ("Parfait, je réserve tout de suite", "satisfaction"),
+    ("Je suis vraiment déçu, l'hôtel que vous m'avez conseillé était sale", "déception"),
+    ("Le restaurant était nul, franchement", "déception"),
+    ("Je ne suis pas du tout satisfait de vos suggestions", "déception"),
+    ("C'est inadmissible, personne ne répond au téléphone !", "colère"),
+    ("J'en ai marre, aucun restaurant n'est ouvert après 22h à Tours", "frustration"),
+    ("C'est énervant, le musée est encore fermé", "colère"),
+    ("J'ai peur de rater mon train pour Marseille", "peur"),
+    ("Je suis un peu inquiet pour la météo de demain", "inquiétude"),
+    ("Je suis stressé, mon vol a été annulé 😰", "inquiétude"),
+    ("Je suis triste de quitter Nice demain", "tristesse"),
+    ("Dommage, c'est complet", "déception"),
+    ("Ouf, il reste une place !", "soulagement"),
+    ("Quoi ?! Le château est fermé ?", "surprise"),
+    ("Bof...", "déception"),
+    ("Il pleut depuis trois jours, qu'est-ce qu'on peut faire à Bordeaux avec des enfants qui tournent en rond ?", "frustration"),
+    ("Bon, je sais pas trop, on verra bien ce que ça donne là-bas avec tout ce monde...", "inquiétude"),
+    ("C'est pas mal mais je m'attendais à mieux", "déception"),
+]
+
+
+def bench_local(repeat: int) -> dict:
+    """Classe le corpus localement et mesure la latence par message."""
+    timings = []
+    escalated = []
+    correct = 0
+    for message, expected in CORPUS:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = classify_emotion(message)
+        timings.append((time.perf_counter() - start) / repeat)
+        if is_confident(result):
+            correct += result["emotion"] == expected
+        else:
+            escalated.append(message)
+    kept = len(CORPUS) - len(escalated)
+    return {
+        "timings": timings,
+        "escalated": escalated,
+        "accuracy": correct / kept if kept else 0.0,
+        "distribution": Counter(classify_emotion(m)["emotion"] for m, _ in CORPUS if m not in escalated)
+    }
+
+
+def bench_agent(fast_path: bool, latency: float) -> list:
+    """Latence de detect_emotion sur le corpus, avec ou sans premier étage local."""
+    overrides = {"emotion": {"fast_path": fast_path}}
+    with MockBackend(latency=latency, config_overrides=overrides):
+        from Agent.emotion_detection_agent import EmotionDetectionAgent
+        agent = EmotionDetectionAgent()
+        timings = []
+        for message, _ in CORPUS:
+            start = time.perf_counter()
+            agent.detect_emotion(message)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Latence simulée par appel au LLM (s)")
+    parser.add_argument("--repeat", type=int, default=1000, help="Répétitions par message pour la latence locale")
+    args = parser.parse_args()
+
+    local = bench_local(args.repeat)
+    print(f"{len(CORPUS)} messages")
+    print(f"Classifieur local : moyenne {statistics.mean(local['timings']) * 1e6:.1f} µs, "
+          f"max {max(local['timings']) * 1e6:.1f} µs par message")
+    print(f"Taux d'escalade vers le LLM : {len(local['escalated']) / len(CORPUS) * 100:.1f} % "
+          f"({len(local['escalated'])}/{len(CORPUS)})")
+    print(f"Exactitude locale (messages non escaladés) : {local['accuracy'] * 100:.1f} %")
+    print(f"Répartition locale : {dict(local['distribution'])}")
+    for message in local["escalated"]:
+        print(f"  escaladé : {message}")
+
+    llm_only = bench_agent(False, args.latency)
+    fast_path = bench_agent(True, args.latency)
+    print(f"\ndetect_emotion, latence simulée {args.latency * 1000:.0f} ms par appel")
+    print(f"{'mode':<12}{'moyenne (ms)':>14}{'médiane (ms)':>14}")
+    for label, timings in (("llm seul", llm_only), ("fast path", fast_path)):
+        print(f"{label:<12}{statistics.mean(timings) * 1000:>14.2f}{statistics.median(timings) * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# bench_history_load.py
+"""
+Chargement de l'historique au démarrage de MemoryAgent : durée et mémoire
+résidente (RSS) selon le nombre d'échanges stockés, en chargeant tout
+l'historique (memory.history_window = null, ancien comportement) ou
+seulement la fenêtre récente.
+
+Usage :
+    python Benchmark/bench_history_load.py --sizes 10000 100000 1000000 --window 200
+
+La collection est remplie directement avec des vecteurs fournis (dimension 8)
+dans un répertoire temporaire ; chaque mesure est faite dans un interpréteur neuf.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.conversation_schema import DEFAULT_SESSION_ID, build_metadata
+
+CONFIG_PATH = os.path.join(project_root, "config.json")
+
+# Exécuté dans un processus neuf : mesure la construction de MemoryAgent
+_CHILD = """
+import json, resource, sys, time
+sys.path.append(PROJECT_ROOT)
+import chromadb  # chargé avant la mesure : seule la lecture de l'historique est comptée
+from Agent.memory_agent import MemoryAgent
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+agent = MemoryAgent.__new__(MemoryAgent)
+before = rss_mb()
+start = time.perf_counter()
+MemoryAgent.__init__(agent)
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "rss_mb": rss_mb() - before, "messages": len(agent.get_messages())}))
+"""
+
+
+def populate(chroma_dir: str, turns: int) -> None:
+    """Remplit la collection 'conversations' avec `turns` échanges factices."""
+    import chromadb
+
+    client = chromadb.PersistentClient(path=chroma_dir)
+    collection = client.get_or_create_collection(name="conversations", metadata={"hnsw:space": "cosine"})
+    batch_size = min(client.get_max_batch_size(), 5000)
+    origin = datetime(2024, 1, 1)
+    for first in range(0, turns, batch_size):
+        count = min(batch_size, turns - first)
+        ids, documents, metadatas, embeddings = [], [], [], []
+        for i in range(first, first + count):
+            metadata = build_metadata(
+                f"Je cherche un restaurant à Dijon (message {i})",
+                f"Voici quelques restaurants à Dijon (réponse {i}).",
+                "neutre", "recherche_restaurant", {"location": "Dijon"},
+                DEFAULT_SESSION_ID, (origin + timedelta(seconds=i)).timestamp()
+            )
+            ids.append(f"conv_{i:09d}")
+            documents.append(f"User: {metadata['user_message']}\nAssistant: {metadata['ai_message']}")
+            metadatas.append(metadata)
+            embeddings.append([float((i >> bit) & 1) for bit in range(7)] + [1.0])
+        collection.add(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+
+def measure(chroma_dir: str, window) -> dict:
+    """Construit MemoryAgent dans un interpréteur neuf avec la fenêtre donnée."""
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config["memory"] = dict(config.get("memory", {}), persist_directory=chroma_dir, history_window=window)
+    config.get("cache", {}).get("semantic", {})["enabled"] = False
+    fd, path = tempfile.mkstemp(prefix="tourism_config_", suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False)
+    try:
+        env = dict(os.environ, TOURISM_AGENT_CONFIG=path)
+        output = subprocess.run(
+            [sys.executable, "-c", f"PROJECT_ROOT = {project_root!r}\n{_CHILD}"],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000],
+                        help="Nombres d'échanges stockés")
+    parser.add_argument("--window", type=int, default=200, help="Échanges gardés en mémoire vive")
+    args = parser.parse_args()
+
+    print(f"{'échanges':>10}{'mode':>12}{'durée (ms)':>14}{'RSS (Mo)':>12}{'messages':>10}")
+    for size in args.sizes:
+        chroma_dir = tempfile.mkdtemp(prefix="tourism_chroma_")
+        try:
+            start = time.perf_counter()
+            populate(chroma_dir, size)
+            print(f"# {size} échanges insérés en {time.perf_counter() - start:.1f} s")
+            for label, window in (("complet", None), ("fenêtre", args.window)):
+                result = measure(chroma_dir, window)
+                print(f"{size:>10}{label:>12}{result['seconds'] * 1000:>14.0f}"
+                      f"{result['rss_mb']:>12.1f}{result['messages']:>10}")
+        finally:
+            shutil.rmtree(chroma_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
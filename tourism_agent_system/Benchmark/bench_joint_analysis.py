@@ -0,0 +1,118 @@
+# bench_joint_analysis.py
+"""
+Compare l'analyse en deux appels (IntentDetectionAgent.run + EmotionDetectionAgent.detect_emotion)
+et l'analyse conjointe (IntentDetectionAgent.run_joint) : tokens consommés,
+latence et accord entre les deux chemins sur l'intention et l'émotion.
+
+Usage :
+    python Benchmark/bench_joint_analysis.py --latency 0.2
+    python Benchmark/bench_joint_analysis.py --live   # API Mistral réelle (config.json)
+
+Contre le backend simulé, les réponses sont fixes : l'accord est trivialement
+de 100 %, seuls les tokens et la latence sont significatifs. Utiliser --live
+pour mesurer l'accord réel.
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from mock_backend import MockBackend
+from Agent.intent_detection_agent import IntentDetectionAgent
+from Agent.emotion_detection_agent import EmotionDetectionAgent
+from Agent.llm_client import get_http_metrics
+
+MESSAGES = [
+    "Je cherche un restaurant pas cher à Dijon pour lundi soir",
+    "Quels musées visiter à Paris ce week-end ?",
+    "Je suis vraiment déçu, l'hôtel que vous m'avez conseillé était sale",
+    "Super, merci beaucoup pour ces recommandations !",
+    "Réserve-moi une chambre d'hôtel à Lyon pour deux personnes le 12 juin",
+    "Il pleut depuis trois jours, qu'est-ce qu'on peut faire à Bordeaux ?",
+    "J'ai peur de rater mon train pour Marseille, combien de temps pour aller à la gare ?",
+    "Quelle est la meilleure période pour visiter la Bretagne ?",
+    "Je veux une balade à vélo facile autour d'Annecy",
+    "C'est énervant, aucun restaurant n'est ouvert après 22h à Tours",
+]
+
+
+def _tokens() -> int:
+    """Total des tokens (prompt + complétion) consommés sur l'API Mistral."""
+    metrics = get_http_metrics().get("mistral", {})
+    return metrics.get("prompt_tokens", 0) + metrics.get("completion_tokens", 0)
+
+
+def run_two_calls(intent_agent, emotion_agent, executor, message):
+    """Chemin actuel : deux appels lancés en parallèle (execution_mode "concurrent")."""
+    intent_future = executor.submit(intent_agent.run, message)
+    emotion_future = executor.submit(emotion_agent.detect_emotion, message)
+    return intent_future.result(), emotion_future.result()
+
+
+def bench(messages):
+    """Exécute les deux chemins sur chaque message et collecte les mesures."""
+    intent_agent = IntentDetectionAgent()
+    emotion_agent = EmotionDetectionAgent()
+    results = {"two_calls": {"timings": [], "tokens": 0}, "joint": {"timings": [], "tokens": 0}}
+    intent_agreement = 0
+    emotion_agreement = 0
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for message in messages:
+            tokens_before = _tokens()
+            start = time.perf_counter()
+            intent_a, emotion_a = run_two_calls(intent_agent, emotion_agent, executor, message)
+            results["two_calls"]["timings"].append(time.perf_counter() - start)
+            results["two_calls"]["tokens"] += _tokens() - tokens_before
+
+            tokens_before = _tokens()
+            start = time.perf_counter()
+            intent_b, emotion_b = intent_agent.run_joint(message)
+            results["joint"]["timings"].append(time.perf_counter() - start)
+            results["joint"]["tokens"] += _tokens() - tokens_before
+
+            intent_agreement += intent_a["intent"] == intent_b["intent"]
+            emotion_agreement += emotion_a["emotion"] == emotion_b["emotion"]
+
+    results["intent_agreement"] = intent_agreement / len(messages)
+    results["emotion_agreement"] = emotion_agreement / len(messages)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Latence simulée par appel distant (s)")
+    parser.add_argument("--live", action="store_true", help="Utiliser l'API réelle définie dans config.json")
+    args = parser.parse_args()
+
+    backend = contextlib.nullcontext() if args.live else MockBackend(latency=args.latency)
+    with backend:
+        results = bench(MESSAGES)
+
+    source = "API réelle" if args.live else f"backend simulé ({args.latency * 1000:.0f} ms par appel)"
+    print(f"{len(MESSAGES)} messages, {source}")
+    print(f"{'chemin':<12}{'tokens':>10}{'tokens/msg':>12}{'moyenne (ms)':>14}{'max (ms)':>12}")
+    for path in ("two_calls", "joint"):
+        data = results[path]
+        print(
+            f"{path:<12}{data['tokens']:>10}{data['tokens'] / len(MESSAGES):>12.1f}"
+            f"{statistics.mean(data['timings']) * 1000:>14.1f}{max(data['timings']) * 1000:>12.1f}"
+        )
+    if results["two_calls"]["tokens"]:
+        saved = 1 - results["joint"]["tokens"] / results["two_calls"]["tokens"]
+        print(f"Tokens économisés : {saved * 100:.1f} %")
+    print(f"Accord intention : {results['intent_agreement'] * 100:.0f} %")
+    print(f"Accord émotion : {results['emotion_agreement'] * 100:.0f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# bench_partitions.py
+"""
+Collection des échanges unique ou partitionnée par semaine : latence des
+recherches, durée de chargement de la fenêtre récente et taille sur disque.
+
+Usage :
+    python Benchmark/bench_partitions.py --weeks 52 --per-week 2000 --retention 26
+
+Scénarios, chacun dans un interpréteur neuf et un répertoire temporaire :
+- "unique" : tous les échanges dans une seule collection (memory.partitions.enabled = false) ;
+- "partitions" : une collection par semaine, recherche sur les search_weeks plus récentes ;
+- "rétention" : partitions puis expiration (retention_weeks) et compactage (compact_store).
+
+Les échanges (backend d'embedding "hashed") sont répartis régulièrement sur les
+`weeks` dernières semaines.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+CONFIG_PATH = os.path.join(project_root, "config.json")
+
+# Exécuté dans un processus neuf : remplit la base puis mesure
+_CHILD = """
+import json, statistics, sys, time
+sys.path.append(PROJECT_ROOT)
+from Agent.conversation_schema import build_metadata
+from Agent.memory_agent import MemoryAgent
+from Agent.partitions import compact_store, store_size
+
+WEEK = 7 * 24 * 3600
+CITIES = ["Dijon", "Paris", "Lyon", "Nice", "Lille", "Nantes", "Tours", "Brest"]
+CUISINES = ["italien", "japonais", "indien", "bistrot", "végétarien", "crêperie"]
+agent = MemoryAgent()
+now = time.time()
+total = WEEKS * PER_WEEK
+batch = []
+for i in range(total):
+    ts = now - (total - i) * (WEEKS * WEEK / total)
+    city, cuisine = CITIES[i % len(CITIES)], CUISINES[(i // len(CITIES)) % len(CUISINES)]
+    user = f"Je cherche un restaurant {cuisine} à {city} (message {i})"
+    metadata = build_metadata(user, f"Voici des restaurants {cuisine} à {city}.", "neutre",
+                              "recherche_restaurant", {"location": city, "food_type": cuisine}, "bench", ts)
+    batch.append((agent._turn_id("bench", user, metadata["ai_message"]), f"User: {user}", metadata))
+    if len(batch) == 1000:
+        agent._write_turns(batch)
+        batch = []
+if batch:
+    agent._write_turns(batch)
+
+result = {"size_mb": store_size(agent.persist_directory) / 2**20, "turns": agent._store.count()}
+if RETENTION:
+    agent._store.enforce_retention(RETENTION)
+    compact_store(agent.persist_directory)
+    result.update(size_mb=store_size(agent.persist_directory) / 2**20, turns=agent._store.count())
+
+queries = [f"un restaurant {CUISINES[i % len(CUISINES)]} à {CITIES[i % len(CITIES)]}" for i in range(QUERIES)]
+agent._find_relevant_turns(queries[0])
+latencies = []
+for query in queries:
+    start = time.perf_counter()
+    agent._find_relevant_turns(query)
+    latencies.append(time.perf_counter() - start)
+start = time.perf_counter()
+MemoryAgent()
+result["load_seconds"] = time.perf_counter() - start
+result["query_p50"] = statistics.median(latencies)
+result["query_p95"] = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+result["partitions"] = len(agent._store.partitions())
+print(json.dumps(result))
+"""
+
+
+def run_scenario(weeks: int, per_week: int, partitions: dict, retention, queries: int) -> dict:
+    """Exécute un scénario dans un interpréteur neuf avec sa propre base."""
+    chroma_dir = tempfile.mkdtemp(prefix="tourism_chroma_")
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    memory = config.setdefault("memory", {})
+    memory.update(persist_directory=chroma_dir, partitions=partitions)
+    memory["embedding"] = dict(memory.get("embedding", {}), backend="hashed")
+    memory["write_behind"] = dict(memory.get("write_behind", {}), enabled=False)
+    config.get("cache", {}).get("semantic", {})["enabled"] = False
+    fd, path = tempfile.mkstemp(prefix="tourism_config_", suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False)
+    try:
+        child = (f"PROJECT_ROOT = {project_root!r}\nWEEKS = {weeks}\nPER_WEEK = {per_week}\n"
+                 f"RETENTION = {retention!r}\nQUERIES = {queries}\n{_CHILD}")
+        output = subprocess.run(
+            [sys.executable, "-c", child],
+            env=dict(os.environ, TOURISM_AGENT_CONFIG=path), capture_output=True, text=True, check=True
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+    finally:
+        os.remove(path)
+        shutil.rmtree(chroma_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, default=52, help="Semaines d'historique")
+    parser.add_argument("--per-week", type=int, default=2000, help="Échanges par semaine")
+    parser.add_argument("--retention", type=float, default=26, help="Horizon de rétention (semaines)")
+    parser.add_argument("--search-weeks", type=int, default=8, help="Partitions parcourues par une recherche")
+    parser.add_argument("--queries", type=int, default=50, help="Recherches mesurées")
+    args = parser.parse_args()
+
+    partitioned = {"enabled": True, "search_weeks": args.search_weeks, "compaction_interval": 0}
+    scenarios = [
+        ("unique", {"enabled": False}, None),
+        ("partitions", partitioned, None),
+        ("rétention", partitioned, args.retention)
+    ]
+    print(f"{args.weeks} semaines x {args.per_week} échanges, recherche sur {args.search_weeks} semaines, "
+          f"rétention {args.retention:g} semaines")
+    print(f"{'scénario':>12}{'partitions':>12}{'échanges':>10}{'disque (Mo)':>13}"
+          f"{'recherche p50 (ms)':>20}{'p95 (ms)':>10}{'chargement (ms)':>17}")
+    for label, partitions, retention in scenarios:
+        result = run_scenario(args.weeks, args.per_week, partitions, retention, args.queries)
+        print(f"{label:>12}{result['partitions']:>12}{result['turns']:>10}{result['size_mb']:>13.1f}"
+              f"{result['query_p50'] * 1000:>20.1f}{result['query_p95'] * 1000:>10.1f}"
+              f"{result['load_seconds'] * 1000:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
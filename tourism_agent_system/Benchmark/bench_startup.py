@@ -0,0 +1,131 @@
+# bench_startup.py
+"""
+Temps de démarrage : durée de `import tourism_agent_system.api` et délai
+jusqu'à la première réponse de /chat (import compris), mesurés dans un
+interpréteur neuf contre le backend simulé.
+
+Usage :
+    python Benchmark/bench_startup.py              # compare au budget enregistré
+    python Benchmark/bench_startup.py --record     # enregistre les mesures comme budget
+
+Le script échoue (code de sortie 1) si une mesure dépasse le budget de
+startup_budget.json de plus de la tolérance, si la première réponse échoue ou
+si chromadb, requests ou aiohttp sont chargés dès l'import.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Ajouter la racine du dépôt au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.dirname(os.path.dirname(current_dir))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from mock_backend import MockBackend
+
+BUDGET_PATH = os.path.join(current_dir, "startup_budget.json")
+MESSAGE = "Je cherche un restaurant pas cher à Dijon pour lundi soir"
+# Dépendances dont l'import doit être différé jusqu'au premier usage
+HEAVY_MODULES = ["chromadb", "requests", "aiohttp"]
+
+# Exécuté dans un processus neuf : aucun module du projet n'est encore chargé
+_CHILD = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+from tourism_agent_system import api
+imported = time.perf_counter()
+heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+import httpx
+
+async def first_request():
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        return await client.post("/chat", json={"message": MESSAGE})
+
+response = asyncio.run(first_request())
+answered = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - start,
+    "first_response_seconds": answered - start,
+    "success": response.status_code == 200 and response.json().get("success", False),
+    "heavy_modules_at_import": heavy
+}))
+"""
+
+
+def measure_once(latency: float) -> dict:
+    """Lance un interpréteur neuf et mesure import puis première réponse."""
+    child = f"MESSAGE = {MESSAGE!r}\nHEAVY_MODULES = {HEAVY_MODULES!r}\n{_CHILD}"
+    with MockBackend(latency=latency):
+        output = subprocess.run(
+            [sys.executable, "-c", child],
+            cwd=repo_root, env=dict(os.environ), capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Nombre de démarrages mesurés (médiane retenue)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence simulée par appel distant (s)")
+    parser.add_argument("--record", action="store_true", help="Enregistrer les mesures comme nouveau budget")
+    parser.add_argument("--budget", default=BUDGET_PATH, help="Fichier de budget (JSON)")
+    args = parser.parse_args()
+
+    runs = [measure_once(args.latency) for _ in range(args.runs)]
+    measured = {
+        "import_seconds": statistics.median(r["import_seconds"] for r in runs),
+        "first_response_seconds": statistics.median(r["first_response_seconds"] for r in runs)
+    }
+    heavy = sorted({m for r in runs for m in r["heavy_modules_at_import"]})
+    failures = sum(1 for r in runs if not r["success"])
+
+    print(f"{args.runs} démarrages, latence simulée {args.latency * 1000:.0f} ms par appel")
+    print(f"  import de l'API      : {measured['import_seconds'] * 1000:.0f} ms")
+    print(f"  première réponse     : {measured['first_response_seconds'] * 1000:.0f} ms")
+    print(f"  modules lourds chargés à l'import : {', '.join(heavy) or 'aucun'}")
+    if failures:
+        print(f"  {failures} première(s) réponse(s) en échec")
+
+    if args.record:
+        if failures:
+            print("Budget non enregistré : la première réponse doit réussir")
+            sys.exit(1)
+        budget = {"tolerance": 0.25}
+        if os.path.exists(args.budget):
+            with open(args.budget, "r", encoding="utf-8") as f:
+                budget["tolerance"] = json.load(f).get("tolerance", budget["tolerance"])
+        budget.update({key: round(value, 3) for key, value in measured.items()})
+        with open(args.budget, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=4)
+            f.write("\n")
+        print(f"Budget enregistré dans {args.budget}")
+        return
+
+    with open(args.budget, "r", encoding="utf-8") as f:
+        budget = json.load(f)
+    tolerance = budget.get("tolerance", 0.25)
+    regressions = []
+    for key in ("import_seconds", "first_response_seconds"):
+        if budget.get(key) is None:
+            print(f"  pas de budget enregistré pour {key}")
+        elif measured[key] > budget[key] * (1 + tolerance):
+            regressions.append(f"{key} : {measured[key]:.3f} s > {budget[key]:.3f} s (+{tolerance * 100:.0f} %)")
+    if failures:
+        regressions.append(f"{failures} première(s) réponse(s) en échec")
+    if heavy:
+        regressions.append(f"modules lourds chargés à l'import : {', '.join(heavy)}")
+    if regressions:
+        print("Régression du temps de démarrage :")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("Temps de démarrage dans le budget")
+
+
+if __name__ == "__main__":
+    main()
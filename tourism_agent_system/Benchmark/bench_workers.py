@@ -0,0 +1,126 @@
+# bench_workers.py
+"""
+/chat servi par plusieurs workers uvicorn : débit et cohérence de l'état
+(suivi, fenêtre des sessions) selon le backend d'état, contre un backend simulé.
+
+Usage :
+    python Benchmark/bench_workers.py --workers 4 --requests 200 --sessions 20 --latency 0.05
+
+Pour chaque backend d'état ("memory" puis "sqlite"), un serveur
+`uvicorn --workers N` est lancé, les requêtes sont envoyées simultanément sur
+`sessions` sessions, puis /logs est appelé plusieurs fois : avec l'état du
+processus, chaque appel ne voit que les requêtes servies par le worker qui
+répond ; avec l'état SQLite, tous voient toutes les requêtes.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+# Ajouter la racine du dépôt au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.dirname(os.path.dirname(current_dir))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+import httpx
+from mock_backend import MockBackend
+
+MESSAGE = "Je cherche un restaurant pas cher à Dijon pour lundi soir"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int) -> tuple:
+    """Lance uvicorn avec la configuration courante (TOURISM_AGENT_CONFIG) et attend qu'il réponde."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "tourism_agent_system.api:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=repo_root, env=dict(os.environ)
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{url}/metrics", timeout=30)
+            return process, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Le serveur uvicorn n'a pas démarré")
+
+
+async def fire(url: str, total: int, sessions: int) -> dict:
+    """Envoie `total` requêtes simultanées réparties sur `sessions` sessions."""
+    limits = httpx.Limits(max_connections=256)
+    async with httpx.AsyncClient(base_url=url, timeout=None, limits=limits) as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/chat", json={"message": f"{MESSAGE} ({i})", "session_id": f"bench-{i % sessions}"})
+            for i in range(total)
+        ])
+        elapsed = time.perf_counter() - start
+    ok = sum(1 for r in responses if r.status_code == 200 and r.json().get("success"))
+    return {"elapsed": elapsed, "ok": ok, "throughput": total / elapsed}
+
+
+def visible_requests(url: str, calls: int) -> list:
+    """Nombre de requêtes /chat terminées visibles dans chacun des `calls` appels à /logs."""
+    counts = []
+    with httpx.Client(base_url=url, timeout=None) as client:
+        for _ in range(calls):
+            # Une connexion par appel : elle peut être acceptée par un autre worker
+            steps = client.get("/logs", headers={"Connection": "close"}).json()["execution_sequence"]
+            counts.append(sum(1 for step in steps if step["action"] == "Traitement complet de la demande"))
+    return counts
+
+
+def run(state: str, args) -> dict:
+    directory = tempfile.mkdtemp(prefix="tourism_state_")
+    overrides = {"state": {"backend": state, "path": os.path.join(directory, "state.db")}}
+    try:
+        with MockBackend(latency=args.latency, config_overrides=overrides):
+            process, url = start_server(args.workers)
+            try:
+                result = asyncio.run(fire(url, args.requests, args.sessions))
+                result["logs"] = visible_requests(url, args.log_calls)
+            finally:
+                process.terminate()
+                process.wait()
+        return result
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="Workers uvicorn")
+    parser.add_argument("--requests", type=int, default=200, help="Nombre de requêtes simultanées")
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions distinctes")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence simulée par appel distant (s)")
+    parser.add_argument("--log-calls", type=int, default=10, help="Appels à /logs après la charge")
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers, {args.requests} requêtes simultanées sur {args.sessions} sessions, "
+          f"latence simulée {args.latency * 1000:.0f} ms par appel")
+    print(f"{'état':<8}{'durée (s)':>11}{'req/s':>9}{'succès':>9}{'vues par /logs (min-max)':>27}")
+    for state in ("memory", "sqlite"):
+        result = run(state, args)
+        print(f"{state:<8}{result['elapsed']:>11.2f}{result['throughput']:>9.1f}{result['ok']:>9}"
+              f"{min(result['logs']):>20}-{max(result['logs'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+# mock_backend.py
+"""
+Backend HTTP local simulant les API Mistral et Tavily pour les benchmarks.
+
+Utilisation :
+    with MockBackend(latency=0.2) as backend:
+        orchestrator = AgentOrchestrator()
+        ...
+
+Le serveur tourne dans un processus séparé (pour ne pas partager le GIL avec
+le code mesuré). Le backend écrit une copie de config.json pointant vers le
+serveur local et l'expose aux agents via la variable d'environnement
+TOURISM_AGENT_CONFIG.
+"""
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+
+
+def _estimate_tokens(text: str) -> int:
+    """Estimation grossière du nombre de tokens (≈ 4 caractères par token)."""
+    return max(1, len(text) // 4)
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """Gestionnaire de requêtes du backend simulé."""
+
+    protocol_version = "HTTP/1.1"  # connexions keep-alive, comme les API réelles
+    disable_nagle_algorithm = True  # évite les 40 ms d'ACK retardé sur les connexions réutilisées
+
+    def log_message(self, format, *args):
+        # Pas de logs HTTP sur la sortie standard pendant les benchmarks
+        pass
+
+    def do_GET(self):
+        if self.path != "/stats":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send_json(self.server.backend.stats)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        backend = self.server.backend
+
+        if self.path.endswith("/chat/completions"):
+            time.sleep(backend.latency)
+            if backend.rate_limited(backend.chat_kind(payload)):
+                self._send_json({"message": "Requests rate limit exceeded"}, status=429)
+                return
+            body = backend.chat_completion(payload)
+        elif self.path.endswith("/search"):
+            time.sleep(backend.search_latency)
+            if backend.rate_limited("search"):
+                self._send_json({"message": "Requests rate limit exceeded"}, status=429)
+                return
+            body = backend.search(payload)
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self._send_json(body)
+
+    def _send_json(self, body, status: int = 200):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockBackend:
+    """
+    Serveur local imitant /v1/chat/completions (Mistral) et /search (Tavily)
+    avec une latence configurable.
+    """
+
+    def __init__(self, latency: float = 0.2, search_latency: Optional[float] = None,
+                 config_overrides: Optional[Dict[str, Any]] = None, echo_messages: bool = False,
+                 rate_limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            latency (float): Latence simulée par complétion (s)
+            search_latency (float, optional): Latence simulée par recherche (par défaut latency)
+            config_overrides (dict, optional): Sections de config.json à remplacer
+            echo_messages (bool): Recopier le dernier message utilisateur du prompt dans les
+                réponses en texte libre (vérifie l'appariement requête/réponse)
+            rate_limits (dict, optional): Nombre de premiers appels répondus par un 429, par type
+                d'appel ("intent", "emotion", "joint", "response" ou "search")
+        """
+        self.latency = latency
+        self.search_latency = latency if search_latency is None else search_latency
+        self.config_overrides = config_overrides or {}
+        self.echo_messages = echo_messages
+        self.rate_limits = rate_limits or {}
+        self.stats = {"chat_requests": 0, "search_requests": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                      "rate_limited": 0}
+        # Appels reçus par type (voir chat_kind), 429 compris
+        self.stats.update({f"{kind}_calls": 0 for kind in ("intent", "emotion", "joint", "response", "search")})
+        self._lock = threading.Lock()
+        self._process = None
+        self._port = None
+        self._config_file = None
+        self._chroma_dir = None
+        self._previous_config = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._port}"
+
+    @staticmethod
+    def chat_kind(payload: Dict[str, Any]) -> str:
+        """Type d'appel d'après le prompt système : "joint", "intent", "emotion" ou "response"."""
+        messages = payload.get("messages", [])
+        system_prompt = " ".join(m["content"] for m in messages if m.get("role") == "system").lower()
+        if '"slots"' in system_prompt and '"emotion"' in system_prompt:
+            return "joint"
+        if '"slots"' in system_prompt:
+            return "intent"
+        if '"emotion"' in system_prompt:
+            return "emotion"
+        return "response"
+
+    def rate_limited(self, kind: str) -> bool:
+        """Compte un appel ; True s'il fait partie des premiers appels de ce type à refuser (429)."""
+        with self._lock:
+            self.stats[f"{kind}_calls"] += 1
+            if self.stats[f"{kind}_calls"] <= self.rate_limits.get(kind, 0):
+                self.stats["rate_limited"] += 1
+                return True
+        return False
+
+    def chat_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Construit une réponse de complétion en fonction du type d'appel."""
+        messages = payload.get("messages", [])
+        prompt_text = " ".join(m.get("content", "") for m in messages)
+        kind = self.chat_kind(payload)
+
+        if kind == "joint":
+            content = json.dumps({
+                "intent": "restaurant_search",
+                "confidence": "high",
+                "slots": {"location": "Dijon", "budget": "pas cher"},
+                "emotion": "neutre",
+                "emotion_confidence": "high"
+            })
+        elif kind == "intent":
+            content = json.dumps({
+                "intent": "restaurant_search",
+                "confidence": "high",
+                "slots": {"location": "Dijon", "budget": "pas cher"}
+            })
+        elif kind == "emotion":
+            content = json.dumps({"emotion": "neutre", "confidence": "high"})
+        else:
+            content = "Voici quelques restaurants à Dijon. Souhaitez-vous plus de détails ?"
+            if self.echo_messages:
+                user_messages = [m.get("content", "") for m in messages if m.get("role") == "user"]
+                content += f" [{user_messages[-1].strip() if user_messages else ''}]"
+
+        usage = {
+            "prompt_tokens": _estimate_tokens(prompt_text),
+            "completion_tokens": _estimate_tokens(content)
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        with self._lock:
+            self.stats["chat_requests"] += 1
+            self.stats["prompt_tokens"] += usage["prompt_tokens"]
+            self.stats["completion_tokens"] += usage["completion_tokens"]
+
+        return {
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": usage
+        }
+
+    def search(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Construit une réponse de recherche au format Tavily."""
+        with self._lock:
+            self.stats["search_requests"] += 1
+        return {
+            "results": [
+                {
+                    "title": f"Restaurant {i} - {payload.get('query', '')}",
+                    "content": "Restaurant traditionnel bourguignon, cuisine maison et prix raisonnables.",
+                    "url": f"https://www.tripadvisor.fr/restaurant-{i}",
+                    "score": 0.9
+                }
+                for i in range(3)
+            ]
+        }
+
+    def _write_config(self) -> str:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        config["model"]["api_url"] = f"{self.url}/v1"
+        config["search"]["url"] = f"{self.url}/search"
+        # Mémoire ChromaDB isolée pour ne pas polluer la base locale
+        config.setdefault("memory", {})["persist_directory"] = self._chroma_dir
+        # Embeddings locaux : le modèle par défaut est téléchargé au premier usage
+        config["memory"]["embedding"] = dict(config["memory"].get("embedding", {}), backend="hashed")
+        # Caches désactivés par défaut : chaque appel mesuré atteint le backend
+        for cache_config in config.get("cache", {}).values():
+            cache_config["enabled"] = False
+        for section, values in self.config_overrides.items():
+            if isinstance(values, dict):
+                config.setdefault(section, {}).update(values)
+            else:
+                config[section] = values
+
+        fd, path = tempfile.mkstemp(prefix="tourism_config_", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(config, f, ensure_ascii=False)
+        return path
+
+    def fetch_stats(self) -> Dict[str, int]:
+        """Récupère les compteurs du serveur (requêtes et tokens simulés)."""
+        with urllib.request.urlopen(f"{self.url}/stats") as response:
+            return json.loads(response.read())
+
+    def serve(self, port_queue) -> None:
+        """Point d'entrée du processus serveur."""
+        ThreadingHTTPServer.request_queue_size = 1024  # supporte les rafales de connexions concurrentes
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _MockHandler)
+        server.daemon_threads = True
+        server.backend = self
+        port_queue.put(server.server_address[1])
+        server.serve_forever()
+
+    def __enter__(self) -> "MockBackend":
+        port_queue = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=self.serve, args=(port_queue,), daemon=True)
+        self._process.start()
+        self._port = port_queue.get(timeout=10)
+
+        self._chroma_dir = tempfile.mkdtemp(prefix="tourism_chroma_")
+        self._config_file = self._write_config()
+        self._previous_config = os.environ.get("TOURISM_AGENT_CONFIG")
+        os.environ["TOURISM_AGENT_CONFIG"] = self._config_file
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Les échanges encore en file d'écriture différée sont écrits tant que la base
+        # ChromaDB temporaire existe (module chargé comme Agent.* ou tourism_agent_system.Agent.*)
+        for name, module in list(sys.modules.items()):
+            if name == "Agent.write_behind" or name.endswith(".Agent.write_behind"):
+                module.close_all()
+        self._process.terminate()
+        self._process.join()
+        if self._previous_config is None:
+            os.environ.pop("TOURISM_AGENT_CONFIG", None)
+        else:
+            os.environ["TOURISM_AGENT_CONFIG"] = self._previous_config
+        os.remove(self._config_file)
+        shutil.rmtree(self._chroma_dir, ignore_errors=True)
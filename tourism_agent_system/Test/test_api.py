@@ -0,0 +1,30 @@
+import unittest
+import sys
+import os
+
+# Ajouter le chemin du projet, de son parent (imports tourism_agent_system.*) et du backend simulé au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+for path in (project_root, os.path.dirname(project_root), os.path.join(project_root, "Benchmark")):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from mock_backend import MockBackend
+
+class TestApi(unittest.TestCase):
+    """Tests des endpoints de l'API contre le backend simulé"""
+
+    def test_metrics_do_not_create_sessions(self):
+        """/metrics sur un orchestrateur neuf ne construit aucune session"""
+        with MockBackend(latency=0):
+            from tourism_agent_system import api
+            first = api.get_metrics()
+            second = api.get_metrics()
+
+        self.assertEqual(first["sessions"]["active"], 0)
+        self.assertEqual(second["sessions"]["active"], 0)
+        self.assertEqual(second["sessions"]["created"], 0)
+        self.assertEqual(second["semantic_cache"]["lookups"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+import asyncio
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.cache import TTLCache, make_cache_key
+
+class TestTTLCache(unittest.TestCase):
+    """Tests pour le cache LRU/TTL à deux niveaux"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "cache.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_hit_and_miss(self):
+        """Une valeur enregistrée est retrouvée, une clé inconnue est un miss"""
+        cache = TTLCache(max_entries=10, ttl=60)
+        cache.set("a", "bonjour")
+        self.assertEqual(cache.get("a"), "bonjour")
+        self.assertIsNone(cache.get("b"))
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_lru_eviction(self):
+        """L'entrée la moins récemment utilisée est évincée"""
+        cache = TTLCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+    def test_ttl_expiration(self):
+        """Une entrée expirée n'est plus retournée"""
+        cache = TTLCache(max_entries=10, ttl=0.05)
+        cache.set("a", "valeur")
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get_stats()["expired"], 1)
+
+    def test_disk_tier_survives_restart(self):
+        """Le niveau SQLite est relu par une nouvelle instance"""
+        TTLCache(max_entries=10, ttl=60, persist_path=self.db_path).set("a", {"intent": "greeting"})
+        cache = TTLCache(max_entries=10, ttl=60, persist_path=self.db_path)
+        self.assertEqual(cache.get("a"), {"intent": "greeting"})
+        self.assertEqual(cache.get_stats()["disk_hits"], 1)
+
+    def test_disk_tier_is_capped(self):
+        """Au-delà de max_disk_entries, les plus anciennes lignes sur disque sont supprimées"""
+        cache = TTLCache(max_entries=2, ttl=60, persist_path=self.db_path, max_disk_entries=5)
+        for i in range(20):
+            cache.set(f"k{i}", i)
+        cache.purge()
+        reopened = TTLCache(max_entries=100, ttl=60, persist_path=self.db_path, max_disk_entries=5)
+        self.assertEqual([reopened.get(f"k{i}") for i in range(15, 20)], list(range(15, 20)))
+        self.assertIsNone(reopened.get("k0"))
+        self.assertGreaterEqual(cache.get_stats()["disk_purged"], 15)
+
+    def test_expired_disk_rows_are_purged(self):
+        """Les lignes expirées sont supprimées du disque sans attendre d'être relues"""
+        cache = TTLCache(max_entries=10, ttl=0.05, persist_path=self.db_path)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        time.sleep(0.1)
+        self.assertEqual(cache.purge(), 2)
+
+    def test_async_access_reads_disk_tier(self):
+        """get_async et set_async passent par le niveau disque comme get et set"""
+        asyncio.run(TTLCache(max_entries=10, ttl=60, persist_path=self.db_path).set_async("a", [1, 2]))
+        cache = TTLCache(max_entries=10, ttl=60, persist_path=self.db_path)
+        self.assertEqual(asyncio.run(cache.get_async("a")), [1, 2])
+        self.assertEqual(asyncio.run(cache.get_async("a")), [1, 2])
+        stats = cache.get_stats()
+        self.assertEqual((stats["disk_hits"], stats["memory_hits"]), (1, 1))
+
+    def test_cache_key_depends_on_all_parts(self):
+        """La clé change avec la température et les messages"""
+        messages = [{"role": "user", "content": "Bonjour"}]
+        key = make_cache_key("mistral-tiny", 0.3, messages)
+        self.assertEqual(key, make_cache_key("mistral-tiny", 0.3, list(messages)))
+        self.assertNotEqual(key, make_cache_key("mistral-tiny", 0.7, messages))
+        self.assertNotEqual(key, make_cache_key("mistral-tiny", 0.3, [{"role": "user", "content": "Merci"}]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import time
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.config_registry import ConfigRegistry, get_config_registry
+
+class TestConfigRegistry(unittest.TestCase):
+    """Tests pour le registre de configuration partagé"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "config.json")
+        self._write({"threshold": {"intent_classifier": 0.75}, "agents": {}})
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        self.tmp.cleanup()
+
+    def _write(self, content, mtime=None):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(content if isinstance(content, str) else json.dumps(content))
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_shared_instance(self):
+        """Un seul registre par fichier de configuration"""
+        self.assertIs(get_config_registry(self.path), get_config_registry(self.path))
+
+    def test_config_is_read_only(self):
+        """La configuration partagée ne peut pas être modifiée"""
+        config = ConfigRegistry(self.path).get()
+        with self.assertRaises(TypeError):
+            config["threshold"]["intent_classifier"] = 0.1
+        self.assertEqual(json.loads(json.dumps(config))["threshold"]["intent_classifier"], 0.75)
+
+    def test_reload_on_change(self):
+        """Le fichier est relu lorsque sa date de modification change"""
+        registry = ConfigRegistry(self.path, check_interval=0)
+        first = registry.get()
+        self.assertIs(registry.get(), first)
+        self._write({"threshold": {"intent_classifier": 0.9}, "agents": {}}, mtime=time.time() + 10)
+        self.assertEqual(registry.get()["threshold"]["intent_classifier"], 0.9)
+        self.assertEqual(registry.version, 2)
+
+    def test_invalid_file_keeps_previous_version(self):
+        """Un fichier mal formé est ignoré et la version précédente est conservée"""
+        registry = ConfigRegistry(self.path, check_interval=0)
+        self._write("{ invalide", mtime=time.time() + 10)
+        self.assertEqual(registry.get()["threshold"]["intent_classifier"], 0.75)
+        self.assertEqual(registry.version, 1)
+
+if __name__ == '__main__':
+    unittest.main()
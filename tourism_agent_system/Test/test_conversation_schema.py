@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.conversation_schema import (
+    SCHEMA_VERSION, build_metadata, build_where, normalize_emotion, normalize_intent,
+    slots_from_metadata, upgrade_metadata
+)
+
+class TestConversationSchema(unittest.TestCase):
+    """Tests pour le schéma des métadonnées des échanges stockés"""
+
+    def test_vocabularies(self):
+        """Intentions et émotions ramenées à un vocabulaire fermé"""
+        self.assertEqual(normalize_intent("Recherche Restaurant"), "recherche_restaurant")
+        self.assertEqual(normalize_intent("recherche_hotel"), "reservation_hotel")
+        self.assertEqual(normalize_intent(""), "unknown")
+        self.assertEqual(normalize_intent("météo"), "autre")
+        self.assertEqual(normalize_emotion("Colere"), "colère")
+        self.assertEqual(normalize_emotion("stress"), "inquiétude")
+        self.assertEqual(normalize_emotion(None), "neutre")
+        self.assertEqual(normalize_emotion("nostalgie"), "autre")
+
+    def test_slots_are_typed_fields(self):
+        """Chaque slot devient un champ de métadonnées, le texte est normalisé"""
+        metadata = build_metadata("Un restaurant à Dijon", "Voici...", "joie", "recherche_restaurant",
+                                  {"location": "Dijon", "budget": 20, "time": ""}, "s1", 1700000000)
+        self.assertEqual(metadata["slot_location"], "dijon")
+        self.assertEqual(metadata["slot_budget"], 20)
+        self.assertNotIn("slot_time", metadata)
+        self.assertNotIn("slots", metadata)
+        self.assertEqual(metadata["ts"], 1700000000.0)
+        self.assertEqual(slots_from_metadata(metadata), {"location": "dijon", "budget": 20})
+
+    def test_upgrade_legacy_metadata(self):
+        """Un ancien échange (slots JSON, date ISO, sans session) est converti"""
+        legacy = {
+            "user_message": "Un hôtel à Nice",
+            "ai_message": "Voici...",
+            "emotion": "Content",
+            "intent": "Reservation_Hotel",
+            "slots": json.dumps({"location": "Nice", "budget": None}),
+            "timestamp": "2024-01-01T12:00:00"
+        }
+        update = upgrade_metadata(legacy)
+        self.assertEqual(update["slot_location"], "nice")
+        self.assertEqual(update["emotion"], "joie")
+        self.assertEqual(update["intent"], "reservation_hotel")
+        self.assertEqual(update["session_id"], "default")
+        self.assertEqual(update["ts"], datetime(2024, 1, 1, 12).timestamp())
+        self.assertEqual(update["schema_version"], SCHEMA_VERSION)
+        # Les anciens champs sont effacés par la mise à jour partielle
+        self.assertIsNone(update["slots"])
+        self.assertIsNone(update["timestamp"])
+        # Un échange déjà migré n'est pas modifié
+        self.assertIsNone(upgrade_metadata(dict(legacy, **update)))
+
+    def test_build_where(self):
+        """Filtre ChromaDB construit avec les valeurs normalisées"""
+        self.assertIsNone(build_where())
+        self.assertEqual(build_where(session_id="s1"), {"session_id": "s1"})
+        self.assertEqual(
+            build_where(intent="Recherche_Restaurant", slots={"location": "Dijon"}, since=10),
+            {"$and": [{"ts": {"$gte": 10.0}}, {"intent": "recherche_restaurant"}, {"slot_location": "dijon"}]}
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.embeddings import CachedEmbedder, Embedder, HashedNgramEmbedder, PrecomputedEmbedder, save_precomputed
+
+class CountingEmbedder(Embedder):
+    """Backend factice qui compte les textes et les lots reçus"""
+
+    name = "counting"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return [np.array([float(len(text)), 1.0], dtype=np.float32) for text in texts]
+
+class TestEmbeddings(unittest.TestCase):
+    """Tests pour les backends d'embedding de la collection 'conversations'"""
+
+    def test_hashed_embedder(self):
+        """Vecteurs de taille fixe, normalisés, stables et proches pour des textes proches"""
+        embedder = HashedNgramEmbedder(dimension=128)
+        restaurant, restaurants, hotel = embedder.embed([
+            "Je cherche un restaurant à Dijon",
+            "je cherche des restaurants a dijon",
+            "Réserver une chambre d'hôtel à Nice"
+        ])
+        self.assertEqual(restaurant.shape, (128,))
+        self.assertAlmostEqual(float(np.linalg.norm(restaurant)), 1.0, places=5)
+        self.assertTrue(np.array_equal(restaurant, embedder.embed(["Je cherche un restaurant à Dijon"])[0]))
+        self.assertGreater(restaurant @ restaurants, restaurant @ hotel)
+        self.assertAlmostEqual(float(np.linalg.norm(embedder.embed(["?!"])[0])), 1.0, places=5)
+
+    def test_cached_embedder_batches_and_memoizes(self):
+        """Les doublons et les textes déjà vus ne sont pas recalculés"""
+        backend = CountingEmbedder()
+        embedder = CachedEmbedder(backend, batch_size=2, cache_size=100)
+        vectors = embedder.embed(["a", "bb", "a", "ccc"])
+        self.assertEqual([len(call) for call in backend.calls], [2, 1])
+        self.assertEqual([float(v[0]) for v in vectors], [1.0, 2.0, 1.0, 3.0])
+        embedder.embed(["bb", "dddd"])
+        self.assertEqual(backend.calls[-1], ["dddd"])
+        stats = embedder.get_stats()
+        self.assertEqual((stats["texts"], stats["computed"]), (6, 4))
+
+    def test_precomputed_embedder(self):
+        """Vecteurs lus dans le fichier, textes absents calculés par le backend de repli"""
+        fallback = CountingEmbedder()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "vectors.npz")
+            save_precomputed(path, ["connu"], [[9.0, 9.0]])
+            embedder = PrecomputedEmbedder(path, fallback)
+            known, unknown = embedder.embed(["connu", "inconnu"])
+        self.assertEqual(known.tolist(), [9.0, 9.0])
+        self.assertEqual(unknown.tolist(), [7.0, 1.0])
+        self.assertEqual(fallback.calls, [["inconnu"]])
+        self.assertEqual(embedder.name, "counting")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.emotion_lexicon import classify_emotion, is_confident
+
+class TestEmotionLexicon(unittest.TestCase):
+    """Tests pour le classifieur d'émotions local (premier étage avant le LLM)"""
+
+    def _assert_local(self, message: str, emotion: str):
+        result = classify_emotion(message)
+        self.assertEqual(result["emotion"], emotion, message)
+        self.assertTrue(is_confident(result), message)
+
+    def test_greetings_and_thanks(self):
+        """Salutations et remerciements sont traités sans LLM"""
+        self._assert_local("Bonjour", "neutre")
+        self._assert_local("Merci beaucoup !", "gratitude")
+
+    def test_unmatched_message_escalates(self):
+        """Sans mot du lexique, le message est confié au LLM (confiance faible)"""
+        result = classify_emotion("Je cherche un restaurant pas cher à Dijon")
+        self.assertEqual(result["emotion"], "neutre")
+        self.assertFalse(is_confident(result))
+
+    def test_negation(self):
+        """La négation inverse une émotion positive et annule une émotion négative"""
+        self._assert_local("Je ne suis pas content", "déception")
+        self.assertNotEqual(classify_emotion("Je ne suis pas inquiet")["emotion"], "inquiétude")
+
+    def test_negation_stops_at_clause_boundary(self):
+        """Une négation d'une autre proposition ne change pas un remerciement"""
+        for message in ("Pas de souci, merci !", "Sans problème, merci", "Rien d'autre, merci beaucoup"):
+            self._assert_local(message, "gratitude")
+        self._assert_local("Pas terrible le musée, mais je suis content", "joie")
+
+    def test_nulle_part_is_not_disappointment(self):
+        """'nulle part' n'est pas une déception ; 'nul' l'est"""
+        result = classify_emotion("Je ne trouve ce restaurant nulle part")
+        self.assertNotEqual(result["emotion"], "déception")
+        self.assertFalse(is_confident(result))
+        self._assert_local("C'est nul !", "déception")
+
+    def test_negated_negative_escalates(self):
+        """Une émotion négative niée n'est pas tranchée localement"""
+        result = classify_emotion("Je n'ai plus peur")
+        self.assertNotEqual(result["emotion"], "peur")
+        self.assertFalse(is_confident(result))
+
+    def test_intensifier_and_punctuation(self):
+        """Intensifieurs et points d'exclamation renforcent la confiance"""
+        self.assertEqual(classify_emotion("Je suis vraiment furieux !!")["confidence"], "high")
+
+    def test_emoji(self):
+        """Les émojis sont des indices émotionnels"""
+        self.assertEqual(classify_emotion("😭")["emotion"], "tristesse")
+
+    def test_ambiguous_message_escalates(self):
+        """Un message long sans indice clair n'est pas tranché localement"""
+        result = classify_emotion("Bon, je sais pas trop, on verra bien ce que ça donne là-bas avec tout ce monde...")
+        self.assertFalse(is_confident(result))
+
+if __name__ == '__main__':
+    unittest.main()
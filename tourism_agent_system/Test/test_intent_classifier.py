@@ -0,0 +1,56 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.intent_classifier import IntentClassifier, load_examples
+
+class TestIntentClassifier(unittest.TestCase):
+    """Tests pour le classifieur d'intentions local (TF-IDF + régression logistique)"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Entraînement unique sur les exemples annotés du dépôt"""
+        examples = load_examples()
+        cls.classifier = IntentClassifier.train([t for t, _ in examples], [i for _, i in examples])
+
+    def test_frequent_intents(self):
+        """Les intentions sans slots les plus fréquentes sont reconnues avec confiance"""
+        for message, expected in [
+            ("Bonjour !", "salutation"),
+            ("Merci beaucoup pour votre aide", "remerciement"),
+            ("Oui, c'est ça", "confirmation"),
+        ]:
+            intent, probability = self.classifier.predict(message)
+            self.assertEqual(intent, expected, message)
+            self.assertGreaterEqual(probability, 0.75, message)
+
+    def test_probabilities_sum_to_one(self):
+        """predict_proba retourne une distribution sur toutes les intentions"""
+        probabilities = self.classifier.predict_proba("Je cherche un restaurant à Dijon")
+        self.assertEqual(set(probabilities), set(self.classifier.labels))
+        self.assertAlmostEqual(sum(probabilities.values()), 1.0, places=4)
+
+    def test_unknown_words(self):
+        """Un message hors vocabulaire ne provoque pas d'erreur et reste peu confiant"""
+        _, probability = self.classifier.predict("xyzzy plugh")
+        self.assertLess(probability, 0.75)
+
+    def test_save_and_load(self):
+        """Le modèle .npz rechargé donne les mêmes prédictions"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "intent.npz")
+            self.classifier.save(path)
+            loaded = IntentClassifier.load(path)
+        message = "Réserve-moi un hôtel à Lyon"
+        self.assertEqual(loaded.predict(message)[0], self.classifier.predict(message)[0])
+        self.assertAlmostEqual(loaded.predict(message)[1], self.classifier.predict(message)[1], places=5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import random
+import time
+
+# Ajouter le chemin du projet (et du backend simulé) au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+for path in (project_root, os.path.join(project_root, "Benchmark")):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from mock_backend import MockBackend
+from Agent.conversation_schema import build_metadata
+from Agent.memory_agent import MemoryAgent, purge_expired_responses
+from Agent.response_generator_agent import ResponseGeneratorAgent
+
+class TestMemoryAgent(unittest.TestCase):
+    """Tests de l'agent de mémoire contre le backend simulé"""
+
+    def test_extract_intent_and_slots(self):
+        """L'intention et les slots manquants sont extraits par le client LLM partagé"""
+        with MockBackend(latency=0) as backend:
+            memory = MemoryAgent(session_id="extraction")
+            intent, slots = memory._extract_intent_and_slots("Un restaurant pas cher à Dijon")
+            turn = memory.prepare_turn("Un restaurant pas cher à Dijon")
+            stats = backend.fetch_stats()
+
+        self.assertEqual(intent, "restaurant_search")
+        self.assertEqual(slots, {"location": "Dijon", "budget": "pas cher"})
+        self.assertEqual(turn["intent"], "restaurant_search")
+        self.assertEqual(stats["intent_calls"], 2)
+
+    def test_fetch_turns_returns_most_recent_by_ts(self):
+        """Les échanges les plus récents sont lus par date, quel que soit l'ordre d'insertion"""
+        overrides = {"memory": {"page_size": 4, "write_behind": {"enabled": False}}}
+        with MockBackend(latency=0, config_overrides=overrides):
+            memory = MemoryAgent(session_id="recents")
+            now = time.time()
+            turns = []
+            for i in range(30):
+                for session in ("recents", "autre"):
+                    metadata = build_metadata(f"message {i}", f"réponse {i}", None, None, {}, session, now - i * 600)
+                    turns.append((f"{session}-{i}", f"{session} {i}", metadata))
+            random.Random(0).shuffle(turns)
+            memory._write_turns(turns)
+
+            latest = memory._fetch_turns(0, 5)
+            previous = memory._fetch_turns(5, 5)
+            everything = memory._fetch_turns(0, None)
+
+        self.assertEqual([turn["user_message"] for turn in latest], [f"message {i}" for i in range(4, -1, -1)])
+        self.assertEqual([turn["user_message"] for turn in previous], [f"message {i}" for i in range(9, 4, -1)])
+        self.assertEqual(len(everything), 30)
+        self.assertTrue(all(turn["session_id"] == "recents" for turn in everything))
+
+    def test_prompt_context_reaches_response_prompt(self):
+        """Le résumé glissant et les derniers messages de la session entrent dans le prompt de réponse"""
+        with MockBackend(latency=0):
+            memory = MemoryAgent(session_id="contexte")
+            memory.commit_turn(memory.prepare_turn("Un restaurant à Dijon", intent="recherche_restaurant",
+                                                   slots={"location": "Dijon"}), "Quel budget ?")
+            memory._short_term.set_summary("L'utilisateur prépare un week-end en Bourgogne.")
+            prompt = ResponseGeneratorAgent()._build_response_prompt(
+                "Pas cher", "neutre", "recherche_restaurant", {"location": "Dijon"},
+                history=memory.get_prompt_context(last=6)
+            )
+
+        self.assertEqual([entry["role"] for entry in prompt], ["system", "user", "assistant", "user"])
+        self.assertIn("week-end en Bourgogne", prompt[0]["content"])
+        self.assertEqual(prompt[1]["content"], "Un restaurant à Dijon")
+        self.assertIn("Pas cher", prompt[-1]["content"])
+
+    def test_expired_cached_responses_are_purged(self):
+        """Les réponses du cache sémantique plus anciennes que le TTL sont supprimées"""
+        import chromadb
+        collection = chromadb.EphemeralClient().get_or_create_collection("semantic_cache_purge")
+        now = time.time()
+        collection.add(
+            ids=["ancienne", "recente"],
+            documents=["Un restaurant à Dijon", "Un musée à Lyon"],
+            metadatas=[{"created_at": now - 7200}, {"created_at": now - 60}],
+            embeddings=[[1.0, 0.0], [0.0, 1.0]]
+        )
+        self.assertEqual(purge_expired_responses(collection, 3600, now), 1)
+        self.assertEqual(collection.get(include=[])["ids"], ["recente"])
+        self.assertEqual(purge_expired_responses(collection, 3600, now), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime, timezone
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.partitions import WEEK, Partition, PartitionedStore, compact_store, week_bounds
+from Agent.state_backend import InProcessStateBackend
+
+class FakeCollection:
+    """Poignée de collection : seul le nom est utilisé"""
+
+    def __init__(self, name):
+        self.name = name
+
+class FakeClient:
+    """Client ChromaDB réduit aux appels de PartitionedStore sur les collections"""
+
+    def __init__(self):
+        self.names = set()
+        self.listings = 0
+
+    def list_collections(self):
+        self.listings += 1
+        return [FakeCollection(name) for name in self.names]
+
+    def get_or_create_collection(self, name, metadata=None):
+        self.names.add(name)
+        return FakeCollection(name)
+
+    def delete_collection(self, name):
+        self.names.discard(name)
+
+class TestPartitions(unittest.TestCase):
+    """Tests pour le découpage hebdomadaire des échanges"""
+
+    def test_week_bounds(self):
+        """Semaine ISO en UTC, du lundi 0 h au lundi suivant"""
+        ts = datetime(2026, 10, 17, 12, 30, tzinfo=timezone.utc).timestamp()
+        key, start, end = week_bounds(ts)
+        self.assertEqual(key, "2026w42")
+        self.assertEqual(start, datetime(2026, 10, 12, tzinfo=timezone.utc).timestamp())
+        self.assertEqual(end - start, WEEK)
+        self.assertEqual(week_bounds(end)[0], "2026w43")
+        self.assertEqual(week_bounds(end - 1)[0], "2026w42")
+
+    def test_year_boundary(self):
+        """Les premiers jours de janvier peuvent appartenir à la dernière semaine ISO de l'année précédente"""
+        ts = datetime(2027, 1, 2, tzinfo=timezone.utc).timestamp()
+        self.assertEqual(week_bounds(ts)[0], "2026w53")
+
+    def test_partition_ranges(self):
+        """Chevauchement et inclusion d'une partition dans un intervalle [since, until)"""
+        partition = Partition("conversations_2026w42", 1000.0, 1000.0 + WEEK)
+        self.assertTrue(partition.overlaps(None, None))
+        self.assertTrue(partition.overlaps(1000.0 + WEEK - 1, None))
+        self.assertFalse(partition.overlaps(1000.0 + WEEK, None))
+        self.assertFalse(partition.overlaps(None, 1000.0))
+        self.assertTrue(partition.within(1000.0, 1000.0 + WEEK))
+        self.assertFalse(partition.within(1001.0, None))
+
+    def test_legacy_partition(self):
+        """L'ancienne collection non partitionnée n'est entièrement couverte que sans bornes"""
+        legacy = Partition("conversations", None, None)
+        self.assertTrue(legacy.overlaps(0.0, 1.0))
+        self.assertTrue(legacy.within(None, None))
+        self.assertFalse(legacy.within(0.0, None))
+
+    def test_drop_is_seen_by_other_workers(self):
+        """Une suppression publiée dans l'état partagé fait oublier leurs poignées aux autres workers"""
+        state = InProcessStateBackend()
+        client = FakeClient()
+        worker_a = PartitionedStore(client, "conversations", state=state)
+        worker_b = PartitionedStore(client, "conversations", state=state)
+        worker_a.collection("conversations_2026w01")
+        worker_a.collection("conversations_2026w42")
+        self.assertEqual(len(worker_b.partitions()), 2)
+        self.assertFalse(worker_b.sync())
+        worker_a.drop(["conversations_2026w01"])
+        self.assertFalse(worker_a.sync())
+        self.assertTrue(worker_b.sync())
+        self.assertEqual([p.name for p in worker_b.partitions()], ["conversations_2026w42"])
+
+    def test_compaction_only_removes_orphan_segments(self):
+        """Seuls les répertoires nommés comme un segment absent de la base sont supprimés"""
+        directory = tempfile.mkdtemp(prefix="tourism_chroma_")
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        live = "0f8fad5b-d9cb-469f-a165-70867728950e"
+        orphan = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+        for name in (live, orphan, "sauvegarde", "0F8FAD5B-D9CB-469F-A165-70867728950E"):
+            os.makedirs(os.path.join(directory, name))
+        connection = sqlite3.connect(os.path.join(directory, "chroma.sqlite3"))
+        connection.execute("CREATE TABLE segments (id TEXT PRIMARY KEY)")
+        connection.execute("INSERT INTO segments (id) VALUES (?)", (live,))
+        connection.commit()
+        connection.close()
+        stats = compact_store(directory)
+        self.assertEqual(stats["removed_segments"], 1)
+        self.assertEqual(sorted(os.listdir(directory)),
+                         sorted(["0F8FAD5B-D9CB-469F-A165-70867728950E", live, "chroma.sqlite3", "sauvegarde"]))
+
+if __name__ == '__main__':
+    unittest.main()
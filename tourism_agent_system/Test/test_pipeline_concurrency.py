@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Ajouter le chemin du projet (et du backend simulé) au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+for path in (project_root, os.path.join(project_root, "Benchmark")):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from mock_backend import MockBackend
+from Agent.orchestrator import AgentOrchestrator
+
+REQUESTS = 64
+SESSIONS = 8
+MARKER = re.compile(r"demande-\d+")
+
+class TestPipelineConcurrency(unittest.TestCase):
+    """Requêtes parallèles sur un orchestrateur partagé : chaque réponse reste appariée à son message"""
+
+    def test_parallel_requests_keep_their_pairing(self):
+        """64 requêtes en parallèle sur 8 sessions : échanges et traces restent propres à chaque requête"""
+        overrides = {
+            "orchestrator": {"execution_mode": "concurrent"},
+            "memory": {"write_behind": {"enabled": True}}
+        }
+        with MockBackend(latency=0.02, config_overrides=overrides, echo_messages=True):
+            orchestrator = AgentOrchestrator()
+            requests = [
+                (f"request{i:02d}", f"session-{i % SESSIONS}", f"Un restaurant à Dijon, demande-{i}")
+                for i in range(REQUESTS)
+            ]
+
+            def send(request):
+                request_id, session_id, message = request
+                return orchestrator.process_message(message, session_id, request_id=request_id)
+
+            with ThreadPoolExecutor(max_workers=REQUESTS) as executor:
+                results = list(executor.map(send, requests))
+
+            # Chaque réponse recopie (backend en écho) le seul message de sa requête
+            for (_, _, message), result in zip(requests, results):
+                self.assertTrue(result["success"])
+                self.assertEqual(MARKER.findall(result["response"]), MARKER.findall(message))
+
+            turns = []
+            for session in range(SESSIONS):
+                memory = orchestrator._memory_for(f"session-{session}")
+                session_turns = memory.find_turns(session_id=f"session-{session}")
+                self.assertEqual(len(session_turns), REQUESTS // SESSIONS)
+                # La fenêtre de la session ne contient que ses propres messages, appariés
+                messages = memory.get_messages()
+                self.assertEqual(len(messages), 2 * (REQUESTS // SESSIONS))
+                for user, assistant in zip(messages[::2], messages[1::2]):
+                    self.assertEqual(MARKER.findall(assistant["content"]), MARKER.findall(user["content"]))
+                turns.extend(session_turns)
+
+            # Exactement un échange stocké par requête, avec sa propre réponse
+            self.assertEqual(len(turns), REQUESTS)
+            self.assertEqual(
+                sorted(MARKER.findall(turn["user_message"])[0] for turn in turns),
+                sorted(f"demande-{i}" for i in range(REQUESTS))
+            )
+            for turn in turns:
+                self.assertEqual(MARKER.findall(turn["ai_message"]), MARKER.findall(turn["user_message"]))
+
+            # Les étapes tracées de chaque requête forment une séquence complète
+            for request_id, _, _ in requests:
+                sequence = orchestrator.tracking_agent.get_request_sequence(request_id)
+                self.assertEqual(sequence[-1]["action"], "Traitement complet de la demande")
+                for agent in ("intent_detection", "emotion_detection", "search", "threshold",
+                              "memory", "response_generator"):
+                    self.assertEqual(
+                        [step["status"] for step in sequence if step["agent"] == agent],
+                        ["démarrage", "succès"]
+                    )
+
+    def test_concurrent_search_cache_key_is_stable(self):
+        """En parallèle, la clé de cache de la recherche ne dépend pas de la fin de l'étape d'intention"""
+        overrides = {
+            "orchestrator": {"execution_mode": "concurrent"},
+            "cache": {"search": {"enabled": True, "persist": False, "ttl": 60}}
+        }
+        with MockBackend(latency=0.01, config_overrides=overrides) as backend:
+            orchestrator = AgentOrchestrator()
+            orchestrator._get_agent("search")._cache.clear()
+            for i in range(5):
+                orchestrator.process_message("Un restaurant pas cher à Dijon", f"cache-{i}")
+            stats = backend.fetch_stats()
+
+        self.assertEqual(stats["search_requests"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
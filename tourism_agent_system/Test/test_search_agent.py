@@ -0,0 +1,47 @@
+import unittest
+import sys
+import os
+
+# Ajouter le chemin du projet (et du backend simulé) au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+for path in (project_root, os.path.join(project_root, "Benchmark")):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from mock_backend import MockBackend
+from Agent.search_agent import SearchAgent
+
+OVERRIDES = {"cache": {"search": {"enabled": True, "persist": False, "ttl": 60}}}
+
+class TestSearchAgent(unittest.TestCase):
+    """Cache des recherches : seuls les résultats réels sont conservés"""
+
+    def test_fallback_results_are_not_cached(self):
+        """Sans résultat valide, le secours est retourné mais pas mis en cache"""
+        with MockBackend(latency=0, config_overrides=OVERRIDES):
+            agent = SearchAgent()
+            agent._cache.clear()
+            agent.search_web = lambda query: agent._extract_results({"results": []})
+            results = agent.search("Un restaurant pas cher à Lyon")
+            key = agent._cache_key("Un restaurant pas cher à Lyon")
+
+            self.assertEqual(len(results), 1)
+            self.assertIn("Lyon", results[0]["snippet"])
+            self.assertNotIn("Dijon", results[0]["snippet"] + results[0]["url"])
+            self.assertIsNone(agent._cache.get(key))
+
+    def test_results_are_cached(self):
+        """Des résultats valides sont servis par le cache à la recherche suivante"""
+        with MockBackend(latency=0, config_overrides=OVERRIDES) as backend:
+            agent = SearchAgent()
+            agent._cache.clear()
+            first = agent.search("Un restaurant pas cher à Dijon")
+            second = agent.search("Un restaurant pas cher à Dijon")
+            stats = backend.fetch_stats()
+
+        self.assertEqual(first, second)
+        self.assertEqual(stats["search_requests"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import sys
+import os
+import time
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.session_manager import SessionManager
+
+class FakeSession:
+    """État de session minimal : une liste de messages"""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.messages = []
+
+    def memory_usage(self):
+        return sum(len(message) for message in self.messages)
+
+class TestSessionManager(unittest.TestCase):
+    """Tests pour le LRU des sessions actives"""
+
+    def test_sessions_are_isolated(self):
+        """Chaque session a son propre état, réutilisé d'un accès à l'autre"""
+        manager = SessionManager(FakeSession)
+        manager.get("a").messages.append("bonjour")
+        self.assertEqual(manager.get("b").messages, [])
+        self.assertEqual(manager.get("a").messages, ["bonjour"])
+        stats = manager.get_stats()
+        self.assertEqual(stats["active"], 2)
+        self.assertEqual(stats["created"], 2)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_capacity_evicts_least_recent(self):
+        """Au-delà de max_sessions, la session la moins récemment utilisée est évincée"""
+        manager = SessionManager(FakeSession, max_sessions=2)
+        manager.get("a")
+        manager.get("b")
+        manager.get("a")
+        manager.get("c")
+        self.assertIn("a", manager)
+        self.assertNotIn("b", manager)
+        self.assertEqual(manager.get_stats()["evicted_capacity"], 1)
+
+    def test_idle_sessions_are_evicted(self):
+        """Une session inactive depuis idle_timeout est évincée"""
+        manager = SessionManager(FakeSession, idle_timeout=0.05)
+        manager.get("a")
+        time.sleep(0.1)
+        manager.get("b")
+        self.assertNotIn("a", manager)
+        self.assertEqual(manager.get_stats()["evicted_idle"], 1)
+
+    def test_memory_cap(self):
+        """La taille d'une session est remesurée à chaque accès et bornée au total"""
+        manager = SessionManager(FakeSession, max_memory_bytes=10)
+        manager.get("a").messages.append("x" * 8)
+        manager.get("b").messages.append("y" * 8)
+        manager.get("a")
+        self.assertEqual(manager.get_stats()["memory_bytes"], 8)
+        manager.get("b")
+        self.assertNotIn("a", manager)
+        self.assertEqual(manager.get_stats()["evicted_memory"], 1)
+        self.assertEqual(manager.get_stats()["memory_bytes"], 8)
+
+    def test_discard_rebuilds_session(self):
+        """Une session oubliée est reconstruite au prochain accès"""
+        manager = SessionManager(FakeSession)
+        manager.get("a").messages.append("bonjour")
+        self.assertTrue(manager.discard("a"))
+        self.assertFalse(manager.discard("a"))
+        self.assertEqual(manager.get("a").messages, [])
+        manager.clear()
+        self.assertEqual(len(manager), 0)
+
+    def test_pinned_sessions_are_not_evicted(self):
+        """Une session dont une requête est en cours n'est évincée ni pour inactivité ni pour capacité"""
+        manager = SessionManager(FakeSession, max_sessions=1, idle_timeout=0.05)
+        pinned = manager.get("a", pin=True)
+        time.sleep(0.1)
+        manager.get("b")
+        self.assertIn("a", manager)
+        self.assertEqual(manager.get_stats()["pinned"], 1)
+        manager.release("a", pinned)
+        manager.get("b")
+        self.assertNotIn("a", manager)
+        self.assertEqual(manager.get_stats()["pinned"], 0)
+
+    def test_release_after_discard(self):
+        """Libérer une session oubliée puis reconstruite ne désépingle pas le nouvel état"""
+        manager = SessionManager(FakeSession, max_sessions=1)
+        old = manager.get("a", pin=True)
+        manager.discard("a")
+        manager.get("a", pin=True)
+        manager.release("a", old)
+        manager.get("b")
+        self.assertIn("a", manager)
+
+if __name__ == '__main__':
+    unittest.main()
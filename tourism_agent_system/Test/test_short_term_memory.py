@@ -0,0 +1,49 @@
+import unittest
+import sys
+import os
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.short_term_memory import Message, ShortTermMemory
+
+class TestShortTermMemory(unittest.TestCase):
+    """Tests pour la mémoire à court terme (tampon circulaire + résumé glissant)"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.memory = ShortTermMemory(capacity=4)
+        for i in range(6):
+            self.memory.append(Message("user" if i % 2 == 0 else "assistant", f"message {i}"))
+
+    def test_window_is_bounded(self):
+        """Seuls les derniers messages restent dans la fenêtre"""
+        self.assertEqual(len(self.memory), 4)
+        self.assertEqual([m["content"] for m in self.memory.messages()], ["message 2", "message 3", "message 4", "message 5"])
+
+    def test_evicted_messages_wait_for_summary(self):
+        """Les messages sortis de la fenêtre sont mis en attente de résumé"""
+        self.assertEqual(self.memory.pending_count, 2)
+        self.assertEqual([m.content for m in self.memory.take_pending()], ["message 0", "message 1"])
+        self.assertEqual(self.memory.pending_count, 0)
+
+    def test_reloaded_messages_are_not_summarized(self):
+        """Les messages rechargés depuis ChromaDB ne déclenchent pas de résumé"""
+        memory = ShortTermMemory(capacity=2)
+        for i in range(5):
+            memory.append(Message("user", f"message {i}"), summarize=False)
+        self.assertEqual(memory.pending_count, 0)
+
+    def test_prompt_context(self):
+        """Le contexte contient le résumé puis les derniers messages demandés"""
+        self.memory.set_summary("L'utilisateur cherche un restaurant à Dijon.")
+        context = self.memory.prompt_context(last=2)
+        self.assertEqual(context[0]["role"], "system")
+        self.assertIn("Dijon", context[0]["content"])
+        self.assertEqual([m["content"] for m in context[1:]], ["message 4", "message 5"])
+
+if __name__ == '__main__':
+    unittest.main()
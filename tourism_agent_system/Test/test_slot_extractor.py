@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.slot_extractor import get_slot_extractor, merge_slots
+
+class TestSlotExtractor(unittest.TestCase):
+    """Tests pour l'extraction locale des slots (gazetteer + expressions régulières)"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.extractor = get_slot_extractor()
+
+    def test_restaurant_request(self):
+        """Lieu, budget et moment sont extraits et normalisés"""
+        slots = self.extractor.extract("Je cherche un restaurant pas cher à Dijon pour lundi soir")
+        self.assertEqual(slots, {"location": "Dijon", "budget": "pas cher", "time": "lundi soir"})
+
+    def test_cuisine_and_accents(self):
+        """Les cuisines sont ramenées à une forme canonique, avec ou sans accents"""
+        slots = self.extractor.extract("une creperie a Saint-Etienne")
+        self.assertEqual(slots["food_type"], "breton")
+        self.assertEqual(slots["location"], "Saint-Étienne")
+
+    def test_longest_match(self):
+        """La plus longue expression l'emporte ("Aix-en-Provence" plutôt que "Aix")"""
+        self.assertEqual(self.extractor.extract("un hôtel à Aix-en-Provence")["location"], "Aix-en-Provence")
+
+    def test_ambiguous_location_needs_preposition(self):
+        """Un nom de lieu ambigu n'est retenu qu'après une préposition de lieu"""
+        self.assertEqual(self.extractor.extract("un musée à Tours").get("location"), "Tours")
+        self.assertNotIn("location", self.extractor.extract("faire des tours de manège"))
+
+    def test_multi_word_cities(self):
+        """Les villes à article sont reconnues en entier ; l'article seul n'est pas un lieu"""
+        self.assertEqual(self.extractor.extract("Restaurant à La Rochelle").get("location"), "La Rochelle")
+        self.assertEqual(self.extractor.extract("Je veux visiter Le Havre").get("location"), "Le Havre")
+        self.assertNotIn("location", self.extractor.extract("Je cherche un restaurant près de la gare"))
+        self.assertNotIn("location", self.extractor.extract("Je vais à la plage"))
+
+    def test_amount_and_hour(self):
+        """Montants et heures sont reconnus par expressions régulières"""
+        slots = self.extractor.extract("un resto pour moins de 20 euros vers 20h30")
+        self.assertEqual(slots["budget"], "moins de 20 €")
+        self.assertEqual(slots["time"], "20h30")
+
+    def test_amount_with_euro_sign(self):
+        """Le symbole € est reconnu, accolé ou non au montant"""
+        self.assertEqual(self.extractor.extract("moins de 20€ à Dijon")["budget"], "moins de 20 €")
+        self.assertEqual(self.extractor.extract("menu à 15 € ce soir")["budget"], "15 €")
+        self.assertNotIn("budget", self.extractor.extract("20 europeens"))
+
+    def test_merge_keeps_llm_values(self):
+        """La fusion garde les slots du LLM et complète les slots vides"""
+        merged = merge_slots({"location": "Dijon centre", "budget": ""}, {"location": "Dijon", "budget": "pas cher"})
+        self.assertEqual(merged, {"location": "Dijon centre", "budget": "pas cher"})
+
+if __name__ == '__main__':
+    unittest.main()
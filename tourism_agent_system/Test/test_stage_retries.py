@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import asyncio
+
+# Ajouter le chemin du projet (et du backend simulé) au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+for path in (project_root, os.path.join(project_root, "Benchmark")):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from mock_backend import MockBackend
+from Agent.llm_client import RateLimitError
+from Agent.orchestrator import AgentOrchestrator
+
+MESSAGE = "Je cherche un restaurant pas cher à Dijon pour lundi soir"
+
+# Étapes d'analyse toujours confiées au backend simulé (premiers étages locaux désactivés)
+OVERRIDES = {
+    "orchestrator": {"execution_mode": "serial", "stage_retries": {"max_retries": 2, "backoff": 0.01}},
+    "emotion": {"fast_path": False},
+    "intent": {"classifier": {"enabled": False}, "slot_extractor": {"enabled": False}}
+}
+
+class TestStageRetries(unittest.TestCase):
+    """Rate limit (429) : seule l'étape en échec est rejouée"""
+
+    def test_only_failed_stage_is_retried(self):
+        """Deux 429 sur l'émotion : intention et recherche ne sont appelées qu'une fois"""
+        with MockBackend(latency=0, config_overrides=OVERRIDES, rate_limits={"emotion": 2}) as backend:
+            orchestrator = AgentOrchestrator()
+            result = orchestrator.process_message(MESSAGE, request_id="retry")
+            stats = backend.fetch_stats()
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["stage_retries"], {"emotion_detection": 2})
+        self.assertEqual(stats["emotion_calls"], 3)
+        self.assertEqual(stats["intent_calls"], 1)
+        self.assertEqual(stats["search_calls"], 1)
+        self.assertEqual(stats["response_calls"], 1)
+        sequence = orchestrator.tracking_agent.get_request_sequence("retry")
+        self.assertEqual(
+            [step["status"] for step in sequence if step["agent"] == "emotion_detection"],
+            ["démarrage", "tentative 1/2", "tentative 2/2", "succès"]
+        )
+        self.assertIn("emotion_detection=2", sequence[-1]["status"])
+
+    def test_exhausted_retries_propagate(self):
+        """Au-delà de max_retries, l'erreur remonte sans rejouer les étapes terminées"""
+        with MockBackend(latency=0, config_overrides=OVERRIDES, rate_limits={"response": 10}) as backend:
+            orchestrator = AgentOrchestrator()
+            with self.assertRaises(RateLimitError):
+                asyncio.run(orchestrator.process_message_async(MESSAGE, request_id="echec"))
+            stats = backend.fetch_stats()
+
+        self.assertEqual(stats["response_calls"], 3)
+        self.assertEqual(stats["intent_calls"], 1)
+        self.assertEqual(stats["emotion_calls"], 1)
+        self.assertEqual(stats["search_calls"], 1)
+        sequence = orchestrator.tracking_agent.get_request_sequence("echec")
+        self.assertEqual(sequence[-1]["action"], "Erreur lors du traitement")
+
+if __name__ == '__main__':
+    unittest.main()
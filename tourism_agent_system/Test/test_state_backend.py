@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.short_term_memory import Message, SharedShortTermMemory
+from Agent.state_backend import InProcessStateBackend, SQLiteStateBackend
+
+class StateBackendTests:
+    """Comportement commun aux backends d'état"""
+
+    def test_keys(self):
+        """Clés : lecture, écriture et fusion de dictionnaires"""
+        self.assertIsNone(self.state.get("absente"))
+        self.state.set("resume", "Dijon")
+        self.assertEqual(self.state.get("resume"), "Dijon")
+        self.state.merge("slots", {"location": "Dijon"})
+        self.assertEqual(self.state.merge("slots", {"budget": "pas cher"}),
+                         {"location": "Dijon", "budget": "pas cher"})
+
+    def test_bounded_stream(self):
+        """Un flux borné retourne les éléments les plus anciens qu'il retire"""
+        removed = [self.state.append("flux", i, max_len=3) for i in range(5)]
+        self.assertEqual(removed, [[], [], [], [0], [1]])
+        self.assertEqual(self.state.read("flux"), [2, 3, 4])
+        self.assertEqual(self.state.read("flux", last=2), [3, 4])
+        self.assertEqual(self.state.length("flux"), 3)
+
+    def test_tags(self):
+        """Les éléments étiquetés sont relus par étiquette, dans l'ordre"""
+        for i in range(6):
+            self.state.append("suivi", {"etape": i}, tag=f"req{i % 2}")
+        self.assertEqual([step["etape"] for step in self.state.read("suivi", tag="req1")], [1, 3, 5])
+
+    def test_prepend_and_pop(self):
+        """Les éléments remis en tête précèdent les nouveaux ; pop_all vide le flux"""
+        self.state.append("attente", "c")
+        self.state.prepend("attente", ["a", "b"])
+        self.state.append("attente", "d", max_len=3)
+        self.assertEqual(self.state.pop_all("attente"), ["b", "c", "d"])
+        self.assertEqual(self.state.read("attente"), [])
+
+    def test_extend_if_empty(self):
+        """Le chargement initial n'a lieu que dans un flux vide"""
+        self.assertTrue(self.state.extend("fenetre", [1, 2, 3], max_len=2, if_empty=True))
+        self.assertFalse(self.state.extend("fenetre", [4], if_empty=True))
+        self.assertEqual(self.state.read("fenetre"), [2, 3])
+
+    def test_delete_prefix(self):
+        """La suppression par préfixe touche clés et flux de ce seul préfixe"""
+        self.state.set("session:a:summary", "x")
+        self.state.append("session:a:messages", 1)
+        self.state.append("session:ab:messages", 2)
+        self.state.delete("session:a:")
+        self.assertIsNone(self.state.get("session:a:summary"))
+        self.assertEqual(self.state.read("session:a:messages"), [])
+        self.assertEqual(self.state.read("session:ab:messages"), [2])
+
+    def test_lease(self):
+        """Un seul preneur obtient le bail, qui n'est repris qu'à son expiration"""
+        self.assertTrue(self.state.acquire_lease("maintenance", "worker-a", 60))
+        self.assertFalse(self.state.acquire_lease("maintenance", "worker-b", 60))
+        self.assertFalse(self.state.acquire_lease("maintenance", "worker-a", 60))
+        self.state.set("maintenance", {"owner": "worker-a", "until": 0})
+        self.assertTrue(self.state.acquire_lease("maintenance", "worker-b", 60))
+        self.assertEqual(self.state.get("maintenance")["owner"], "worker-b")
+
+    def test_shared_short_term_memory(self):
+        """Fenêtre, attente de résumé et résumé d'une session dans le backend"""
+        memory = SharedShortTermMemory(self.state, "session:a", capacity=4)
+        for i in range(6):
+            memory.append(Message("user" if i % 2 == 0 else "assistant", f"message {i}"))
+        self.assertEqual([m["content"] for m in memory.messages()], [f"message {i}" for i in range(2, 6)])
+        pending = memory.take_pending()
+        self.assertEqual([m.content for m in pending], ["message 0", "message 1"])
+        memory.restore_pending(pending)
+        self.assertEqual(memory.pending_count, 2)
+        memory.set_summary("L'utilisateur cherche un restaurant.")
+        self.assertEqual(memory.prompt_context(last=1)[0]["role"], "system")
+        memory.clear()
+        self.assertEqual(len(memory), 0)
+        self.assertEqual(memory.summary, "")
+
+class TestInProcessStateBackend(StateBackendTests, unittest.TestCase):
+    """Backend d'état du processus"""
+
+    def setUp(self):
+        self.state = InProcessStateBackend()
+
+class TestSQLiteStateBackend(StateBackendTests, unittest.TestCase):
+    """Backend d'état SQLite partagé entre processus"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="tourism_state_")
+        self.path = os.path.join(self.directory, "state.db")
+        self.state = SQLiteStateBackend(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_state_is_shared_between_connections(self):
+        """Deux workers (connexions distinctes) voient la même fenêtre de session"""
+        worker_a = SharedShortTermMemory(self.state, "session:a", capacity=4)
+        worker_b = SharedShortTermMemory(SQLiteStateBackend(self.path), "session:a", capacity=4)
+        worker_a.append(Message("user", "Bonjour"))
+        worker_b.append(Message("assistant", "Bonjour !"))
+        self.assertEqual([m["content"] for m in worker_a.messages()], ["Bonjour", "Bonjour !"])
+        worker_b.load([Message("user", "ancien message")])
+        self.assertEqual(len(worker_a), 2)
+
+if __name__ == '__main__':
+    unittest.main()
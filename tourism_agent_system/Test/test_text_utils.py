@@ -0,0 +1,53 @@
+import unittest
+import sys
+import os
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.text_utils import fold_accents, normalize_query, normalize_value
+
+class TestTextUtils(unittest.TestCase):
+    """Tests pour la normalisation des requêtes utilisées comme clés de cache"""
+
+    def test_fold_accents(self):
+        """Les accents et cédilles sont supprimés"""
+        self.assertEqual(fold_accents("à côté du théâtre, garçon"), "a cote du theatre, garcon")
+
+    def test_near_identical_queries_share_a_key(self):
+        """Casse, accents, ponctuation et espaces n'affectent pas la requête normalisée"""
+        self.assertEqual(
+            normalize_query("Un restaurant pas cher à Dijon !"),
+            normalize_query("  un RESTAURANT pas cher a  Dijon")
+        )
+
+    def test_stopwords_are_removed(self):
+        """Les mots vides n'affectent pas la requête normalisée"""
+        self.assertEqual(normalize_query("Bonjour, un restaurant à Dijon"), normalize_query("restaurant Dijon"))
+
+    def test_word_order_is_kept(self):
+        """L'ordre des mots porte le sens de la négation"""
+        self.assertNotEqual(normalize_query("pas cher, pas italien"), normalize_query("italien, pas cher"))
+        self.assertNotEqual(
+            normalize_query("restaurant pas cher, pas italien"),
+            normalize_query("restaurant italien, pas cher")
+        )
+
+    def test_negation_is_kept(self):
+        """'pas' n'est pas un mot vide : 'pas cher' et 'cher' restent distincts"""
+        self.assertNotEqual(normalize_query("restaurant pas cher"), normalize_query("restaurant cher"))
+
+    def test_different_cities_differ(self):
+        """Deux villes différentes donnent deux requêtes différentes"""
+        self.assertNotEqual(normalize_query("musées à Dijon"), normalize_query("musées à Paris"))
+
+    def test_normalize_value(self):
+        """Les valeurs de slots sont normalisées"""
+        self.assertEqual(normalize_value("  Saint-Étienne "), "saint etienne")
+        self.assertEqual(normalize_value(None), "")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Agent.write_behind import WriteBehindQueue
+
+class TestWriteBehindQueue(unittest.TestCase):
+    """Tests pour la file d'écriture différée"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def _write(self, batch):
+        with self.lock:
+            self.batches.append(list(batch))
+
+    def test_batches_by_size(self):
+        """Un lot complet est écrit en un seul appel"""
+        queue = WriteBehindQueue("test-size", self._write, max_batch=4, flush_interval=60)
+        for i in range(8):
+            queue.put(i)
+        queue.close()
+        self.assertEqual(self.batches, [[0, 1, 2, 3], [4, 5, 6, 7]])
+
+    def test_flush_interval(self):
+        """Un lot incomplet est écrit après flush_interval"""
+        queue = WriteBehindQueue("test-interval", self._write, max_batch=100, flush_interval=0.05)
+        queue.put("a")
+        time.sleep(0.3)
+        self.assertEqual(self.batches, [["a"]])
+        queue.close()
+
+    def test_flush_and_stats(self):
+        """flush écrit les éléments en attente et met à jour les métriques"""
+        queue = WriteBehindQueue("test-flush", self._write, max_batch=100, flush_interval=60)
+        queue.put("a")
+        queue.put("b")
+        self.assertEqual(queue.get_stats()["queue_depth"], 2)
+        queue.flush()
+        stats = queue.get_stats()
+        self.assertEqual(self.batches, [["a", "b"]])
+        self.assertEqual((stats["queue_depth"], stats["written"], stats["flushes"]), (0, 2, 1))
+        queue.close()
+
+    def test_failed_batch_is_counted(self):
+        """Un lot en erreur est abandonné et compté"""
+        def fail(batch):
+            raise RuntimeError("base indisponible")
+        queue = WriteBehindQueue("test-error", fail, max_batch=2, flush_interval=60)
+        queue.put(1)
+        queue.put(2)
+        queue.close()
+        stats = queue.get_stats()
+        self.assertEqual((stats["errors"], stats["dropped"], stats["written"]), (1, 2, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,8 @@
-from .Agent import AgentOrchestrator
+def __getattr__(name):
+    # Import différé : importer le paquet ne charge pas les agents
+    if name == 'AgentOrchestrator':
+        from .Agent import AgentOrchestrator
+        return AgentOrchestrator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-__all__ = ['AgentOrchestrator']
\ No newline at end of file
+__all__ = ['AgentOrchestrator']
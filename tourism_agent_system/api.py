@@ -2,17 +2,36 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
-from tourism_agent_system.Agent.orchestrator import AgentOrchestrator
-from tourism_agent_system.Agent.TrackingAgent import TrackingAgent
+from tourism_agent_system.Agent import get_agent, warm_up
+from tourism_agent_system.Agent.config_registry import get_config
+from tourism_agent_system.Agent.conversation_schema import DEFAULT_SESSION_ID
+from tourism_agent_system.Agent.pipeline_context import new_request_id
+from tourism_agent_system.Agent.state_backend import get_state_backend
+from tourism_agent_system.Agent.llm_client import RateLimitError, get_http_metrics
+from tourism_agent_system.Agent.cache import get_cache_metrics
+from tourism_agent_system.Agent.write_behind import close_all as close_write_queues, get_write_behind_metrics
+from contextlib import asynccontextmanager
+import asyncio
 import os
-import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-app = FastAPI(title="Tourism Agent System API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Préchauffage optionnel (startup.warm_up dans config.json) : construit les
+    agents et ouvre ChromaDB au démarrage plutôt qu'à la première requête.
+    À l'arrêt, les écritures différées en attente sont vidées.
+    """
+    if get_config().get("startup", {}).get("warm_up", False):
+        timings = await asyncio.to_thread(warm_up)
+        print(f"Agents préchauffés en {sum(timings.values()):.2f} s")
+    yield
+    await asyncio.to_thread(close_write_queues)
+
+app = FastAPI(title="Tourism Agent System API", lifespan=lifespan)
 
 # Configuration
-MAX_RETRIES = 3
-RETRY_DELAY = 1  # secondes
+MAX_SESSION_ID_LENGTH = 128
 
 # 1) Activer CORS pour autoriser toutes les origines 
 app.add_middleware(
@@ -22,22 +41,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 2) Instancier l'orchestrateur et le tracking agent une seule fois
-orchestrator = AgentOrchestrator()
-tracking_agent = TrackingAgent()
+# 2) Orchestrateur et tracking agent partagés, construits au premier usage
+def get_orchestrator():
+    return get_agent("coordinator")
 
-def handle_rate_limit(retry_count: int) -> None:
-    """Gère le rate limiting en attendant avant de réessayer."""
-    if retry_count < MAX_RETRIES:
-        time.sleep(RETRY_DELAY * (retry_count + 1))  # Attente exponentielle
-    else:
-        raise Exception("Nombre maximum de tentatives atteint pour l'API Mistral")
+tracking_agent = get_agent("tracking")
 
 @app.post("/chat")
-def chat_endpoint(payload: dict) -> Dict[str, Any]:
+async def chat_endpoint(payload: dict) -> Dict[str, Any]:
     """
-    payload attend : { "message": "Bonjour !" }
-    Retourne : { "success": bool, "response": str, "error": str (optionnel) }
+    payload attend : { "message": "Bonjour !", "session_id": "..." (optionnel) }
+    Chaque session a sa propre mémoire de conversation ; sans session_id, le
+    message rejoint la session par défaut.
+    Retourne : { "success": bool, "response": str, "session_id": str, "error": str (optionnel) }
     """
     message = payload.get("message")
     if not message or not isinstance(message, str):
@@ -46,93 +62,109 @@ def chat_endpoint(payload: dict) -> Dict[str, Any]:
             "response": "Il faut fournir un champ 'message' de type string.",
             "error": "Invalid input"
         }
+    session_id = payload.get("session_id") or DEFAULT_SESSION_ID
+    if not isinstance(session_id, str) or len(session_id) > MAX_SESSION_ID_LENGTH:
+        return {
+            "success": False,
+            "response": f"Le champ 'session_id' doit être une chaîne d'au plus {MAX_SESSION_ID_LENGTH} caractères.",
+            "error": "Invalid input"
+        }
     
-    retry_count = 0
-    while retry_count < MAX_RETRIES:
-        try:
-            # Log de l'étape initiale
-            tracking_agent.log_execution(
-                agent_name="orchestrator",
-                action="Réception de la demande utilisateur",
-                status="succès"
-            )
-            
-            # Appel de l'orchestrator
-            result = orchestrator.process_message(message)
-            
-            # Log de l'interaction dans le tracking agent
-            tracking_agent.log(
-                agent_name="orchestrator",
-                input_data=message,
-                output_data=str(result)
-            )
-            
-            # Log de l'étape finale
-            tracking_agent.log_execution(
-                agent_name="orchestrator",
-                action="Génération de la réponse finale",
-                status="succès"
-            )
-            
-            # S'assurer que la réponse a la bonne structure
-            if isinstance(result, dict):
-                if "response" in result:
-                    return {
-                        "success": True,
-                        "response": result["response"]
-                    }
-                else:
-                    return {
-                        "success": True,
-                        "response": str(result)
-                    }
-            else:
+    # Identifiant de la requête : relie ses étapes dans les traces, même entrelacées avec d'autres
+    request_id = new_request_id()
+    try:
+        # Log de l'étape initiale
+        await tracking_agent.log_execution_async(
+            agent_name="orchestrator",
+            action="Réception de la demande utilisateur",
+            status="succès",
+            request_id=request_id
+        )
+        
+        # Appel de l'orchestrator (sur rate limit, seule l'étape en échec est rejouée,
+        # voir orchestrator.stage_retries)
+        result = await get_orchestrator().process_message_async(message, session_id, request_id)
+        
+        # Log de l'interaction dans le tracking agent
+        await tracking_agent.log_async(
+            agent_name="orchestrator",
+            input_data=message,
+            output_data=str(result),
+            request_id=request_id
+        )
+        
+        # Log de l'étape finale
+        await tracking_agent.log_execution_async(
+            agent_name="orchestrator",
+            action="Génération de la réponse finale",
+            status="succès",
+            request_id=request_id
+        )
+        
+        # S'assurer que la réponse a la bonne structure
+        if isinstance(result, dict):
+            if "response" in result:
                 return {
                     "success": True,
-                    "response": str(result)
+                    "response": result["response"],
+                    "session_id": session_id
                 }
-                
-        except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg:  # Rate limit
-                retry_count += 1
-                tracking_agent.log_execution(
-                    agent_name="orchestrator",
-                    action="Rate limit détecté, nouvelle tentative",
-                    status=f"tentative {retry_count}/{MAX_RETRIES}"
-                )
-                handle_rate_limit(retry_count)
-                continue
             else:
-                # Log de l'erreur
-                tracking_agent.log_execution(
-                    agent_name="orchestrator",
-                    action="Erreur lors du traitement",
-                    status=f"erreur: {error_msg}"
-                )
                 return {
-                    "success": False,
-                    "response": "Désolé, une erreur est survenue lors du traitement de votre message.",
-                    "error": error_msg
+                    "success": True,
+                    "response": str(result),
+                    "session_id": session_id
                 }
-    
-    # Si on arrive ici, c'est que toutes les tentatives ont échoué
-    return {
-        "success": False,
-        "response": "Désolé, le service est temporairement surchargé. Veuillez réessayer dans quelques instants.",
-        "error": "Rate limit exceeded after multiple retries"
-    }
+        else:
+            return {
+                "success": True,
+                "response": str(result),
+                "session_id": session_id
+            }
+            
+    except RateLimitError as e:
+        # Une étape a épuisé ses nouvelles tentatives : la requête est abandonnée
+        await tracking_agent.log_execution_async(
+            agent_name="orchestrator",
+            action="Abandon de la demande (quota dépassé)",
+            status=f"erreur: quota {e.service} dépassé après les nouvelles tentatives",
+            request_id=request_id
+        )
+        return {
+            "success": False,
+            "response": "Désolé, le service est temporairement surchargé. Veuillez réessayer dans quelques instants.",
+            "error": "Rate limit exceeded after multiple retries"
+        }
+    except Exception as e:
+        error_msg = str(e)
+        # Log de l'erreur
+        await tracking_agent.log_execution_async(
+            agent_name="orchestrator",
+            action="Erreur lors du traitement",
+            status=f"erreur: {error_msg}",
+            request_id=request_id
+        )
+        return {
+            "success": False,
+            "response": "Désolé, une erreur est survenue lors du traitement de votre message.",
+            "error": error_msg
+        }
 
 @app.post("/clear-memory")
-def clear_memory_endpoint() -> Dict[str, Any]:
+def clear_memory_endpoint(payload: Optional[dict] = None) -> Dict[str, Any]:
     """
     Endpoint pour effacer la mémoire de l'orchestrateur
+    payload optionnel : { "session_id": "...", "since": 1718000000, "until": 1718100000 }
+    pour n'effacer qu'une session (échanges stockés et mémoire vive) et/ou une
+    période (timestamps epoch)
     """
     try:
-        orchestrator.clear_memory()
+        scope = {key: (payload or {}).get(key) for key in ("session_id", "since", "until")}
+        get_orchestrator().clear_memory(**scope)
+        if any(value is not None for value in scope.values()):
+            return {"success": True, "message": "Échanges sélectionnés effacés avec succès"}
         # Effacer aussi les logs du tracking agent
-        tracking_agent.logs = []
-        tracking_agent.execution_sequence = []
+        tracking_agent.clear()
         return {"success": True, "message": "Mémoire et logs effacés avec succès"}
     except Exception as e:
         return {
@@ -142,12 +174,12 @@ def clear_memory_endpoint() -> Dict[str, Any]:
         }
 
 @app.get("/analysis")
-def get_analysis() -> Dict[str, Any]:
+async def get_analysis() -> Dict[str, Any]:
     """
     Endpoint pour obtenir l'analyse des interactions
     """
     try:
-        analysis = tracking_agent.analyze_interactions()
+        analysis = await tracking_agent.analyze_interactions_async()
         return analysis
     except Exception as e:
         return {
@@ -187,12 +219,32 @@ def get_logs() -> Dict[str, Any]:
     try:
         return {
             "success": True,
-            "logs": tracking_agent.logs,
-            "execution_sequence": tracking_agent.execution_sequence
+            **tracking_agent.snapshot()
         }
     except Exception as e:
         return {
             "success": False,
             "message": f"Erreur lors de la récupération des logs : {str(e)}",
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+@app.get("/metrics")
+def get_metrics() -> Dict[str, Any]:
+    """
+    Endpoint pour obtenir les métriques des appels HTTP sortants (Mistral, Tavily),
+    des caches (hits, misses, taux de succès), des écritures différées
+    (profondeur de file, latence des écritures), des embeddings, des sessions
+    (actives, évincées) et du backend d'état
+    """
+    # Import différé : numpy n'est chargé qu'avec MemoryAgent
+    from tourism_agent_system.Agent.embeddings import get_embedding_metrics
+    return {
+        "success": True,
+        "http": get_http_metrics(),
+        "cache": get_cache_metrics(),
+        "semantic_cache": get_orchestrator().get_semantic_cache_stats(),
+        "write_behind": get_write_behind_metrics(),
+        "embedding": get_embedding_metrics(),
+        "sessions": get_orchestrator().get_session_stats(),
+        "state": get_state_backend(get_config()).get_stats()
+    }
\ No newline at end of file
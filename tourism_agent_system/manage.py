@@ -0,0 +1,159 @@
+# manage.py
+"""
+Commandes d'administration du système d'agents touristiques.
+
+Usage :
+    python manage.py train-intent [--from-chroma] [--examples data/intent_examples.jsonl]
+    python manage.py migrate-memory
+    python manage.py dedup-memory
+    python manage.py compact-memory [--retention-weeks 26]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Ajouter le chemin du projet au PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from Agent.config_registry import get_config
+from Agent.intent_classifier import (
+    DEFAULT_EXAMPLES_PATH, DEFAULT_MODEL_PATH, IntentClassifier, evaluate, load_examples
+)
+
+
+def _split(examples, holdout: float, seed: int):
+    """Sépare les exemples en entraînement / validation, intention par intention."""
+    by_intent = {}
+    for text, intent in examples:
+        by_intent.setdefault(intent, []).append((text, intent))
+    rng = random.Random(seed)
+    train, test = [], []
+    for items in by_intent.values():
+        rng.shuffle(items)
+        n_test = int(len(items) * holdout)
+        test.extend(items[:n_test])
+        train.extend(items[n_test:])
+    return train, test
+
+
+def train_intent(args) -> None:
+    """Entraîne le classifieur d'intentions local, affiche le rapport et l'enregistre."""
+    examples = load_examples(args.examples)
+    labels = {intent for _, intent in examples}
+    print(f"{len(examples)} exemples annotés ({len(labels)} intentions) depuis {args.examples}")
+
+    if args.from_chroma:
+        from Agent.memory_agent import MemoryAgent
+        turns = [(text, intent) for text, intent in MemoryAgent().get_labelled_turns() if intent in labels]
+        print(f"{len(turns)} messages repris de la collection ChromaDB 'conversations'")
+        examples = examples + turns
+
+    config = get_config()
+    threshold = config.get("threshold", {}).get("intent_classifier", 0.7)
+
+    # Rapport sur un jeu de validation, puis entraînement final sur tous les exemples
+    train, test = _split(examples, args.holdout, args.seed)
+    if test:
+        classifier = IntentClassifier.train([t for t, _ in train], [i for _, i in train], epochs=args.epochs)
+        report = evaluate(classifier, test, threshold=threshold)
+        print(f"Validation ({len(test)} messages) :")
+        print(f"  exactitude : {report['accuracy'] * 100:.1f} %")
+        print(f"  seuil {threshold} : couverture {report['coverage'] * 100:.1f} %, précision {report['precision'] * 100:.1f} %")
+        print(f"  latence : moyenne {report['latency_avg'] * 1e6:.0f} µs, max {report['latency_max'] * 1e6:.0f} µs")
+        for error in report["errors"][:args.show_errors]:
+            print(f"  erreur : {error['text']!r} -> {error['predicted']} ({error['probability']:.2f}), attendu {error['expected']}")
+
+    start = time.perf_counter()
+    classifier = IntentClassifier.train([t for t, _ in examples], [i for _, i in examples], epochs=args.epochs)
+    train_time = time.perf_counter() - start
+    classifier.save(args.output)
+
+    start = time.perf_counter()
+    IntentClassifier.load(args.output)
+    load_time = time.perf_counter() - start
+    print(f"Modèle entraîné en {train_time * 1000:.0f} ms, enregistré dans {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.0f} Ko, chargement {load_time * 1000:.1f} ms)")
+
+
+def migrate_memory(args) -> None:
+    """Convertit les échanges stockés dans ChromaDB au schéma de métadonnées courant."""
+    from Agent.memory_agent import MemoryAgent
+    agent = MemoryAgent()
+    total = agent._store.count()
+    start = time.perf_counter()
+    migrated = agent.migrate_metadata()
+    print(f"{migrated} échange(s) sur {total} converti(s) au schéma courant "
+          f"en {time.perf_counter() - start:.1f} s")
+
+
+def dedup_memory(args) -> None:
+    """Supprime les échanges en double, donne aux anciens échanges leur ID dérivé du contenu et leur partition."""
+    from Agent.memory_agent import MemoryAgent
+    agent = MemoryAgent()
+    start = time.perf_counter()
+    stats = agent.deduplicate()
+    print(f"{stats['scanned']} échange(s) lus : {stats['duplicates']} doublon(s) supprimé(s), "
+          f"{stats['moved']} échange(s) renommé(s) ou déplacé(s) en {time.perf_counter() - start:.1f} s "
+          f"({agent._store.count()} échange(s) restants)")
+
+
+def compact_memory(args) -> None:
+    """Supprime les partitions et les réponses en cache expirées, puis récupère la place libérée sur disque."""
+    from Agent.memory_agent import MemoryAgent
+    from Agent.partitions import compact_store
+    agent = MemoryAgent()
+    retention_weeks = args.retention_weeks
+    if retention_weeks is None:
+        retention_weeks = get_config().get("memory", {}).get("partitions", {}).get("retention_weeks")
+    start = time.perf_counter()
+    dropped = agent._store.enforce_retention(retention_weeks)
+    purged = agent.purge_semantic_cache()
+    stats = compact_store(agent.persist_directory)
+    print(f"{len(dropped)} partition(s) expirée(s) supprimée(s), {purged} réponse(s) en cache expirée(s), "
+          f"{stats['removed_segments']} index orphelin(s) effacé(s)")
+    print(f"Taille sur disque : {stats['size_before'] / 2**20:.1f} Mo -> {stats['size_after'] / 2**20:.1f} Mo "
+          f"en {time.perf_counter() - start:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train-intent", help="Entraîner le classifieur d'intentions local")
+    train_parser.add_argument("--examples", default=DEFAULT_EXAMPLES_PATH, help="Exemples annotés (JSON Lines)")
+    train_parser.add_argument("--from-chroma", action="store_true",
+                              help="Ajouter les messages passés de la collection 'conversations'")
+    train_parser.add_argument("--output", default=DEFAULT_MODEL_PATH, help="Fichier .npz du modèle")
+    train_parser.add_argument("--epochs", type=int, default=300, help="Nombre d'itérations")
+    train_parser.add_argument("--holdout", type=float, default=0.2, help="Part des exemples gardés pour la validation")
+    train_parser.add_argument("--seed", type=int, default=0, help="Graine du découpage")
+    train_parser.add_argument("--show-errors", type=int, default=5, help="Nombre d'erreurs de validation affichées")
+    train_parser.set_defaults(func=train_intent)
+
+    migrate_parser = subparsers.add_parser(
+        "migrate-memory", help="Convertir les échanges stockés au schéma de métadonnées courant"
+    )
+    migrate_parser.set_defaults(func=migrate_memory)
+
+    dedup_parser = subparsers.add_parser(
+        "dedup-memory", help="Supprimer les échanges en double et passer aux IDs dérivés du contenu"
+    )
+    dedup_parser.set_defaults(func=dedup_memory)
+
+    compact_parser = subparsers.add_parser(
+        "compact-memory", help="Supprimer les partitions et les réponses en cache expirées, puis compacter la base ChromaDB"
+    )
+    compact_parser.add_argument("--retention-weeks", type=float, default=None,
+                                help="Horizon de rétention (par défaut memory.partitions.retention_weeks)")
+    compact_parser.set_defaults(func=compact_memory)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()